@@ -1,6 +1,18 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import snippets, categories, tags, collections
+from app.api.endpoints import (
+    snippets,
+    categories,
+    tags,
+    collections,
+    changes,
+    events,
+    bootstrap,
+    batch,
+    debug,
+    stats,
+)
+from app.config import settings
 
 
 api_router = APIRouter()
@@ -12,3 +24,12 @@ api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
 api_router.include_router(
     collections.router, prefix="/collections", tags=["collections"]
 )
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(bootstrap.router, prefix="/bootstrap", tags=["bootstrap"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+
+# Diagnostics such as the slow-query log are only served when enabled
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
@@ -0,0 +1,139 @@
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.schemas.batch import BatchRequest, BatchResponse, SubRequest
+from app.utils.error_handling import format_error_response
+from app.utils.instrumentation import TimedRoute
+
+logger = logging.getLogger("app.batch")
+
+router = APIRouter(route_class=TimedRoute)
+
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"}
+# Endpoints that cannot run inside a batch: itself and the endless event stream
+_EXCLUDED = ("/batch", "/events")
+
+
+def _query_items(query: Dict[str, Any]) -> List[Tuple[str, str]]:
+    items = []
+    for key, value in query.items():
+        for item in value if isinstance(value, list) else [value]:
+            if item is None:
+                continue
+            items.append((key, str(item).lower() if isinstance(item, bool) else item))
+    return items
+
+
+async def _dispatch(request: Request, db: Session, sub: SubRequest) -> Dict[str, Any]:
+    """Run one sub-request through the application in-process."""
+    method = sub.method.upper()
+    path, _, query_string = ("/" + sub.path.lstrip("/")).partition("?")
+    if method not in _METHODS or path.startswith(_EXCLUDED):
+        return {
+            "status": status.HTTP_400_BAD_REQUEST,
+            "body": format_error_response(
+                status.HTTP_400_BAD_REQUEST,
+                f"{method} {path} is not allowed in a batch",
+            ),
+        }
+    if sub.query:
+        extra = urlencode(_query_items(sub.query))
+        query_string = f"{query_string}&{extra}" if query_string else extra
+
+    full_path = settings.API_PREFIX + path
+    body = json.dumps(sub.body).encode("utf-8") if sub.body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": full_path,
+        "raw_path": full_path.encode("utf-8"),
+        "query_string": query_string.encode("utf-8"),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+        # Picked up by get_db, so every sub-request shares the batch session
+        "state": {"db": db},
+    }
+
+    received = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response: Dict[str, Any] = {"status": 500, "headers": {}, "chunks": []}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                key.decode("latin-1").lower(): value.decode("latin-1")
+                for key, value in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error middleware re-raises after sending its 500; the failure
+        # is this sub-request's, the rest of the batch still runs
+        logger.exception("Batch sub-request %s %s failed", method, path)
+        response["status"] = status.HTTP_500_INTERNAL_SERVER_ERROR
+        if not response["chunks"]:
+            response["headers"] = {"content-type": "application/json"}
+            response["chunks"] = [
+                json.dumps(
+                    format_error_response(
+                        status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error"
+                    )
+                ).encode("utf-8")
+            ]
+
+    if response["status"] >= 500:
+        db.rollback()
+    content = b"".join(response["chunks"])
+    if not content:
+        parsed = None
+    elif response["headers"].get("content-type", "").startswith("application/json"):
+        parsed = json.loads(content)
+    else:
+        parsed = content.decode("utf-8", errors="replace")
+    return {"status": response["status"], "body": parsed}
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Run several API requests over one session and return their responses.
+
+    Sub-requests run one after another in the order sent, so later ones see
+    the writes of earlier ones. Running reads concurrently would not help:
+    the endpoints are ``async def`` and make blocking database calls on the
+    event loop, so gathered sub-requests would still run one at a time.
+    A sub-request that fails with a 500 is rolled back and the batch goes on.
+    """
+    responses = []
+    for sub in batch.requests:
+        responses.append(await _dispatch(request, db, sub))
+    return {"responses": responses}
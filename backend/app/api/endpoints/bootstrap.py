@@ -0,0 +1,46 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.crud import bootstrap as bootstrap_crud
+from app.crud import changes as changes_crud
+from app.database import get_db
+from app.schemas.bootstrap import BootstrapResponse
+from app.utils.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+def _etag(seq: int, snippet_limit: int) -> str:
+    return f'"bootstrap-{seq}-{snippet_limit}"'
+
+
+@router.get("", response_model=BootstrapResponse)
+async def get_bootstrap(
+    snippet_limit: int = Query(
+        100,
+        ge=1,
+        le=1000,
+        alias="snippetLimit",
+        description="Maximum number of snippets to include",
+    ),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Get categories, tags, collections and snippets in one response."""
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    etag = _etag(changes_crud.get_latest_seq(db), snippet_limit)
+    if if_none_match and etag in if_none_match:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": etag}
+        )
+
+    seq, body, gzipped = bootstrap_crud.get_bootstrap(db, snippet_limit)
+    headers["ETag"] = _etag(seq, snippet_limit)
+    if accept_encoding and "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        body = gzipped
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Query, Path, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -7,13 +9,16 @@ from app.schemas.category import (
     CategoryUpdate,
     CategoryResponse,
     CategoriesResponse,
+    CategoryTreeResponse,
 )
 from app.schemas.snippet import SnippetsResponse
 from app.crud import category as category_crud
-from app.utils.error_handling import NotFoundError, format_error_response
+from app.crud.sorting import DEFAULT_SORT, next_cursor
+from app.utils.error_handling import BadRequestError, NotFoundError, format_error_response
+from app.utils.instrumentation import TimedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=CategoriesResponse)
@@ -23,17 +28,24 @@ async def get_categories(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Get all categories."""
     categories = category_crud.get_categories(db, skip=skip, limit=limit)
     return {"categories": categories}
 
 
+@router.get("/tree", response_model=CategoryTreeResponse)
+async def get_category_tree(db: Session = Depends(get_db)) -> Response:
+    """Get the whole category tree with direct and subtree snippet counts."""
+    body = category_crud.get_category_tree_json(db)
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: str = Path(..., description="Category ID"),
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Get a category by ID."""
     try:
         category = category_crud.get_category(db, category_id)
@@ -52,26 +64,49 @@ async def get_snippets_by_category(
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    include_descendants: bool = Query(
+        False,
+        description="Include snippets of all subcategories",
+        alias="includeDescendants",
+    ),
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Get snippets by category."""
     try:
         snippets = category_crud.get_snippets_by_category(
-            db, category_id, skip=skip, limit=limit
+            db,
+            category_id,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            cursor=cursor,
+            include_descendants=include_descendants,
         )
-        return {"snippets": snippets}
+        return {
+            "snippets": snippets,
+            "next_cursor": next_cursor(snippets, sort, limit),
+        }
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
         )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
 
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     category_data: CategoryCreate,
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Create a new category."""
     category = category_crud.create_category(db, category_data)
     return {"category": category}
@@ -82,7 +117,7 @@ async def update_category(
     category_data: CategoryUpdate,
     category_id: str = Path(..., description="Category ID"),
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Update a category."""
     try:
         category = category_crud.update_category(db, category_id, category_data)
@@ -98,7 +133,7 @@ async def update_category(
 async def delete_category(
     category_id: str = Path(..., description="Category ID"),
     db: Session = Depends(get_db),
-):
+) -> Dict[str, Any]:
     """Delete a category."""
     try:
         category_crud.delete_category(db, category_id)
@@ -0,0 +1,24 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.crud import changes as changes_crud
+from app.database import get_db
+from app.schemas.change import ChangesResponse
+from app.utils.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("", response_model=ChangesResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Last sequence number already applied"),
+    limit: int = Query(
+        500, ge=1, le=5000, description="Maximum number of log entries to read"
+    ),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get the changes after a sequence number, tombstones included."""
+    changes, cursor, has_more = changes_crud.get_changes(db, since=since, limit=limit)
+    return {"changes": changes, "cursor": cursor, "has_more": has_more}
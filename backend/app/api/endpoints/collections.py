@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -10,10 +12,12 @@ from app.schemas.collection import (
 )
 from app.schemas.snippet import SnippetsResponse
 from app.crud import collection as collection_crud
-from app.utils.error_handling import NotFoundError, format_error_response
+from app.crud.sorting import DEFAULT_SORT, next_cursor
+from app.utils.error_handling import BadRequestError, NotFoundError, format_error_response
+from app.utils.instrumentation import TimedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=CollectionsResponse)
@@ -52,19 +56,31 @@ async def get_snippets_in_collection(
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     db: Session = Depends(get_db),
 ):
     """Get snippets in a collection."""
     try:
         snippets = collection_crud.get_snippets_in_collection(
-            db, collection_id, skip=skip, limit=limit
+            db, collection_id, skip=skip, limit=limit, sort=sort, cursor=cursor
         )
-        return {"snippets": snippets}
+        return {
+            "snippets": snippets,
+            "next_cursor": next_cursor(snippets, sort, limit),
+        }
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
         )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
 
 @router.post("", response_model=CollectionResponse, status_code=status.HTTP_201_CREATED)
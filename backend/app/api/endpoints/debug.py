@@ -0,0 +1,49 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Path, Response, status
+
+from app.schemas.debug import SlowQueriesResponse
+from app.utils.error_handling import format_error_response
+from app.utils.instrumentation import TimedRoute
+from app.utils.profiler import get_profile
+from app.utils.slow_queries import slow_query_log
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/slow-queries", response_model=SlowQueriesResponse)
+async def get_slow_queries() -> Dict[str, Any]:
+    """Get the most recent queries slower than the configured threshold."""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.entries(),
+    }
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries() -> Dict[str, bool]:
+    """Empty the slow-query log."""
+    slow_query_log.clear()
+    return {"success": True}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str = Path(..., description="Profile ID")
+) -> Response:
+    """Download a request profile as collapsed stacks for flamegraph tools."""
+    collapsed = get_profile(profile_id)
+    if collapsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=format_error_response(
+                status.HTTP_404_NOT_FOUND, f"Profile with ID {profile_id} not found"
+            ),
+        )
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'
+        },
+    )
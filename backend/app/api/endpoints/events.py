@@ -0,0 +1,63 @@
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.crud import events as events_crud
+from app.database import SessionLocal
+from app.utils.broadcast import Subscriber
+from app.utils.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+async def _event_stream(
+    subscriber: Subscriber, backlog: Optional[List[Tuple[int, bytes]]]
+) -> AsyncIterator[bytes]:
+    """Yield missed events, then live ones, with keepalive comments between."""
+    try:
+        yield b"retry: 3000\n\n"
+        if backlog is None:
+            yield b"event: reset\ndata: {}\n\n"
+            backlog = []
+        replayed = 0
+        for seq, message in backlog:
+            replayed = seq
+            yield message
+        while True:
+            item = await subscriber.get(timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+            if item is None:
+                yield b": keepalive\n\n"
+                continue
+            seq, message = item
+            if seq > replayed:
+                yield message
+    except EOFError:
+        # Evicted for falling behind; the client reconnects with Last-Event-ID
+        return
+    finally:
+        events_crud.broadcaster.unsubscribe(subscriber)
+
+
+@router.get("")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """Stream change notifications as server-sent events.
+
+    The backlog is read in a session closed before streaming starts; a
+    ``get_db`` session would stay checked out of the pool until the client
+    disconnects.
+    """
+    # Subscribe before reading the backlog so nothing falls in between
+    subscriber = events_crud.broadcaster.subscribe()
+    backlog: Optional[List[Tuple[int, bytes]]] = []
+    if last_event_id and last_event_id.isdigit():
+        with SessionLocal() as db:
+            backlog = events_crud.get_missed_events(db, int(last_event_id))
+    return StreamingResponse(
+        _event_stream(subscriber, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import registry
+
+router = APIRouter()
+
+# Version 0.0.4 of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Expose process metrics for Prometheus to scrape."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
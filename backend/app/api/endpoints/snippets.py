@@ -1,34 +1,71 @@
 from typing import Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    status,
+)
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.snippet import Snippet as SnippetModel
 from app.schemas.snippet import (
+    Snippet,
+    SnippetSummary,
     SnippetCreate,
     SnippetFavoriteToggleQuery,
     SnippetUpdate,
     SnippetResponse,
     SnippetsResponse,
+    SimilarSnippetsResponse,
+    SnippetCreateResponse,
+    DuplicateGroupsResponse,
     BatchOperation,
     SuccessResponse,
 )
+from app.schemas.revision import SnippetRevisionResponse, SnippetRevisionsResponse
+from app.schemas.suggestion import SuggestionsResponse
+from app.crud import duplicates as duplicates_crud
+from app.crud import revision as revision_crud
+from app.crud import similar as similar_crud
 from app.crud import snippet as snippet_crud
-from app.utils.error_handling import NotFoundError, format_error_response
+from app.crud import suggest as suggest_crud
+from app.crud.sorting import DEFAULT_SORT, next_cursor
+from app.utils.error_handling import (
+    BadRequestError,
+    NotFoundError,
+    format_error_response,
+)
+from app.utils.instrumentation import TimedRoute
 
 
-def convert_tags_to_names(snippet_obj: SnippetModel) -> Dict[str, Any]:
-    """Convert a Snippet model to a dictionary with tag names."""
+def convert_tags_to_names(
+    snippet_obj: SnippetModel, summary: bool = False
+) -> Dict[str, Any]:
+    """Convert a Snippet model to a dictionary with tag names.
+
+    With ``summary``, compressed code bodies are left out as in
+    ``SnippetSummary``.
+    """
+    code_fields = (
+        SnippetSummary.code_fields(snippet_obj)
+        if summary
+        else Snippet.code_fields(snippet_obj)
+    )
     snippet_dict = {
         "id": snippet_obj.id,
         "title": snippet_obj.title,
         "description": snippet_obj.description,
-        "code": snippet_obj.code,
+        **code_fields,
         "language": snippet_obj.language,
         "category_id": snippet_obj.category_id,
         "is_favorite": snippet_obj.is_favorite,
         "is_deleted": snippet_obj.is_deleted,
+        "access_count": snippet_obj.access_count,
         "created_at": snippet_obj.created_at,
         "updated_at": snippet_obj.updated_at,
         "tags": [tag.name for tag in snippet_obj.tags] if snippet_obj.tags else [],
@@ -36,7 +73,7 @@ def convert_tags_to_names(snippet_obj: SnippetModel) -> Dict[str, Any]:
     return snippet_dict
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=SnippetsResponse)
@@ -49,28 +86,61 @@ async def get_snippets(
     language: Optional[str] = Query(None, description="Filter by programming language"),
     category_id: Optional[str] = Query(None, description="Filter by category ID", alias="categoryId"),
     tag: Optional[str] = Query(None, description="Filter by tag name"),
+    tags: Optional[str] = Query(
+        None,
+        description="Filter by tag expression with AND, OR and NOT",
+    ),
+    include_descendants: bool = Query(
+        False,
+        description="Include snippets of subcategories of categoryId",
+        alias="includeDescendants",
+    ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    facets: bool = Query(
+        False, description="Include language, category and tag facet counts"
+    ),
     db: Session = Depends(get_db),
 ):
     """Get snippets with filters."""
-    snippet_models = snippet_crud.get_snippets(
-        db,
-        deleted=deleted,
-        favorite=favorite,
-        search=search,
-        language=language,
-        category_id=category_id,
-        tag=tag,
-        skip=skip,
-        limit=limit,
-    )
+    filters = {
+        "deleted": deleted,
+        "favorite": favorite,
+        "search": search,
+        "language": language,
+        "category_id": category_id,
+        "tag": tag,
+        "tags": tags,
+        "include_descendants": include_descendants,
+    }
+    try:
+        snippet_models = snippet_crud.get_snippets(
+            db, **filters, sort=sort, cursor=cursor, skip=skip, limit=limit
+        )
+        facet_counts = (
+            snippet_crud.get_snippet_facets(db, **filters) if facets else None
+        )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
     # Convert each snippet model to a dictionary with tag names
-    snippet_dicts = [convert_tags_to_names(snippet) for snippet in snippet_models]
-    return {"snippets": snippet_dicts}
+    snippet_dicts = [
+        convert_tags_to_names(snippet, summary=True) for snippet in snippet_models
+    ]
+    return {
+        "snippets": snippet_dicts,
+        "facets": facet_counts,
+        "next_cursor": next_cursor(snippet_models, sort, limit),
+    }
 
 
 @router.get("/search", response_model=SnippetsResponse)
@@ -81,28 +151,106 @@ async def search_snippets(
     language: Optional[str] = Query(None, description="Filter by programming language"),
     category_id: Optional[str] = Query(None, description="Filter by category ID", alias="categoryId"),
     tag: Optional[str] = Query(None, description="Filter by tag name"),
+    tags: Optional[str] = Query(
+        None,
+        description="Filter by tag expression with AND, OR and NOT",
+    ),
+    include_descendants: bool = Query(
+        False,
+        description="Include snippets of subcategories of categoryId",
+        alias="includeDescendants",
+    ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    facets: bool = Query(
+        False, description="Include language, category and tag facet counts"
+    ),
     db: Session = Depends(get_db),
 ):
     """Search snippets."""
-    snippet_models = snippet_crud.get_snippets(
-        db,
-        deleted=deleted,
-        favorite=favorite,
-        search=q,
-        language=language,
-        category_id=category_id,
-        tag=tag,
-        skip=skip,
-        limit=limit,
-    )
+    filters = {
+        "deleted": deleted,
+        "favorite": favorite,
+        "search": q,
+        "language": language,
+        "category_id": category_id,
+        "tag": tag,
+        "tags": tags,
+        "include_descendants": include_descendants,
+    }
+    try:
+        snippet_models = snippet_crud.get_snippets(
+            db, **filters, sort=sort, cursor=cursor, skip=skip, limit=limit
+        )
+        facet_counts = (
+            snippet_crud.get_snippet_facets(db, **filters) if facets else None
+        )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
     # Convert each snippet model to a dictionary with tag names
-    snippet_dicts = [convert_tags_to_names(snippet) for snippet in snippet_models]
-    return {"snippets": snippet_dicts}
+    snippet_dicts = [
+        convert_tags_to_names(snippet, summary=True) for snippet in snippet_models
+    ]
+    return {
+        "snippets": snippet_dicts,
+        "facets": facet_counts,
+        "next_cursor": next_cursor(snippet_models, sort, limit),
+    }
+
+
+@router.get("/suggest", response_model=SuggestionsResponse)
+async def suggest_titles(
+    prefix: str = Query("", description="Snippet title prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Suggest snippet titles by prefix, most used first."""
+    suggestions = suggest_crud.suggest_titles(db, prefix, limit=limit)
+    return {
+        "suggestions": [
+            {"value": title, "count": count} for title, count in suggestions
+        ]
+    }
+
+
+@router.get("/duplicates", response_model=DuplicateGroupsResponse)
+async def get_duplicate_snippets(
+    threshold: float = Query(
+        0.8, ge=0.7, le=1.0, description="Minimum code similarity (Jaccard)"
+    ),
+    limit: int = Query(
+        100, ge=1, le=100, description="Maximum number of groups to return"
+    ),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Report groups of snippets with near-duplicate code."""
+    groups = duplicates_crud.get_duplicate_groups(db, threshold=threshold)[:limit]
+    snippets = snippet_crud.get_snippets_by_ids(
+        db, [snippet_id for snippet_ids, _ in groups for snippet_id in snippet_ids]
+    )
+    return {
+        "groups": [
+            {
+                "similarity": similarity,
+                "snippets": [
+                    convert_tags_to_names(snippets[snippet_id], summary=True)
+                    for snippet_id in snippet_ids
+                    if snippet_id in snippets
+                ],
+            }
+            for snippet_ids, similarity in groups
+        ]
+    }
 
 
 @router.get("/favorites", response_model=SnippetsResponse)
@@ -111,14 +259,31 @@ async def get_favorite_snippets(
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     db: Session = Depends(get_db),
 ):
     """Get favorite snippets."""
-    snippet_models = snippet_crud.get_favorite_snippets(db, skip=skip, limit=limit)
+    try:
+        snippet_models = snippet_crud.get_favorite_snippets(
+            db, skip=skip, limit=limit, sort=sort, cursor=cursor
+        )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
     # Convert each snippet model to a dictionary with tag names
-    snippet_dicts = [convert_tags_to_names(snippet) for snippet in snippet_models]
-    return {"snippets": snippet_dicts}
+    snippet_dicts = [
+        convert_tags_to_names(snippet, summary=True) for snippet in snippet_models
+    ]
+    return {
+        "snippets": snippet_dicts,
+        "next_cursor": next_cursor(snippet_models, sort, limit),
+    }
 
 
 @router.get("/recycle-bin", response_model=SnippetsResponse)
@@ -127,14 +292,31 @@ async def get_recycle_bin_snippets(
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     db: Session = Depends(get_db),
 ):
     """Get snippets in recycle bin."""
-    snippet_models = snippet_crud.get_recycle_bin_snippets(db, skip=skip, limit=limit)
+    try:
+        snippet_models = snippet_crud.get_recycle_bin_snippets(
+            db, skip=skip, limit=limit, sort=sort, cursor=cursor
+        )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
     # Convert each snippet model to a dictionary with tag names
-    snippet_dicts = [convert_tags_to_names(snippet) for snippet in snippet_models]
-    return {"snippets": snippet_dicts}
+    snippet_dicts = [
+        convert_tags_to_names(snippet, summary=True) for snippet in snippet_models
+    ]
+    return {
+        "snippets": snippet_dicts,
+        "next_cursor": next_cursor(snippet_models, sort, limit),
+    }
 
 
 @router.post("/batch", response_model=SuccessResponse)
@@ -153,6 +335,7 @@ async def batch_operation(
 
 @router.get("/{snippet_id}", response_model=SnippetResponse)
 async def get_snippet(
+    background_tasks: BackgroundTasks,
     snippet_id: str = Path(..., description="Snippet ID"),
     db: Session = Depends(get_db),
 ):
@@ -160,6 +343,7 @@ async def get_snippet(
     try:
         snippet_model = snippet_crud.get_snippet(db, snippet_id)
         snippet_dict = convert_tags_to_names(snippet_model)
+        background_tasks.add_task(snippet_crud.record_access, snippet_id)
         return {"snippet": snippet_dict}
     except NotFoundError as e:
         raise HTTPException(
@@ -168,15 +352,108 @@ async def get_snippet(
         )
 
 
-@router.post("", response_model=SnippetResponse, status_code=status.HTTP_201_CREATED)
+@router.get("/{snippet_id}/similar", response_model=SimilarSnippetsResponse)
+async def get_similar_snippets(
+    snippet_id: str = Path(..., description="Snippet ID"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get the snippets most similar to a snippet by title and code."""
+    try:
+        snippet_model = snippet_crud.get_snippet(db, snippet_id)
+    except NotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
+        )
+
+    matches = similar_crud.get_similar_snippets(db, snippet_model, limit=limit)
+    snippets = snippet_crud.get_snippets_by_ids(
+        db, [match_id for match_id, _ in matches]
+    )
+    snippet_dicts = [
+        {**convert_tags_to_names(snippets[match_id], summary=True), "score": score}
+        for match_id, score in matches
+        if match_id in snippets
+    ]
+    return {"snippets": snippet_dicts}
+
+
+@router.get("/{snippet_id}/revisions", response_model=SnippetRevisionsResponse)
+async def get_snippet_revisions(
+    snippet_id: str = Path(..., description="Snippet ID"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get the saved versions of a snippet, newest first."""
+    try:
+        revisions = revision_crud.get_revisions(db, snippet_id)
+        return {"revisions": revisions}
+    except NotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
+        )
+
+
+@router.get(
+    "/{snippet_id}/revisions/{number}", response_model=SnippetRevisionResponse
+)
+async def get_snippet_revision(
+    snippet_id: str = Path(..., description="Snippet ID"),
+    number: int = Path(..., ge=1, description="Revision number"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get one saved version of a snippet with its full code."""
+    try:
+        revision, code = revision_crud.get_revision(db, snippet_id, number)
+    except NotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
+        )
+    return {
+        "revision": {
+            "number": revision.number,
+            "title": revision.title,
+            "description": revision.description,
+            "language": revision.language,
+            "is_keyframe": revision.is_keyframe,
+            "created_at": revision.created_at,
+            "code": code,
+        }
+    }
+
+
+@router.post(
+    "", response_model=SnippetCreateResponse, status_code=status.HTTP_201_CREATED
+)
 async def create_snippet(
     snippet_data: SnippetCreate,
+    check_duplicates: bool = Query(
+        False,
+        description="Report existing snippets with near-duplicate code",
+        alias="checkDuplicates",
+    ),
     db: Session = Depends(get_db),
 ):
     """Create a new snippet."""
     snippet_model = snippet_crud.create_snippet(db, snippet_data)
     snippet_dict = convert_tags_to_names(snippet_model)
-    return {"snippet": snippet_dict}
+
+    duplicates = None
+    if check_duplicates:
+        matches = duplicates_crud.find_duplicates(
+            db, snippet_model.code, exclude=snippet_model.id
+        )
+        snippets = snippet_crud.get_snippets_by_ids(
+            db, [match_id for match_id, _ in matches]
+        )
+        duplicates = [
+            {"id": match_id, "title": snippets[match_id].title, "similarity": score}
+            for match_id, score in matches
+            if match_id in snippets
+        ]
+    return {"snippet": snippet_dict, "duplicates": duplicates}
 
 
 @router.put("/{snippet_id}", response_model=SnippetResponse)
@@ -0,0 +1,26 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import stats as stats_crud
+from app.database import get_db
+from app.schemas.stats import StatsResponse
+from app.utils.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("", response_model=StatsResponse)
+async def get_stats(
+    limit: int = Query(
+        20,
+        ge=1,
+        le=100,
+        description="Maximum number of languages, categories and tags",
+    ),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get snippet totals, the largest groups and recent activity."""
+    return stats_crud.get_stats(db, days=settings.STATS_ACTIVITY_DAYS, limit=limit)
@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional
+
 from fastapi import APIRouter, Depends, Query, Path, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -9,11 +11,20 @@ from app.schemas.tag import (
     TagsResponse,
 )
 from app.schemas.snippet import SnippetsResponse
+from app.schemas.suggestion import SuggestionsResponse
+from app.crud import suggest as suggest_crud
 from app.crud import tag as tag_crud
-from app.utils.error_handling import NotFoundError, ConflictError, format_error_response
+from app.crud.sorting import DEFAULT_SORT, next_cursor
+from app.utils.error_handling import (
+    BadRequestError,
+    ConflictError,
+    NotFoundError,
+    format_error_response,
+)
+from app.utils.instrumentation import TimedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("", response_model=TagsResponse)
@@ -29,6 +40,21 @@ async def get_tags(
     return {"tags": tags}
 
 
+@router.get("/suggest", response_model=SuggestionsResponse)
+async def suggest_tags(
+    prefix: str = Query("", description="Tag name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Suggest tag names by prefix, most used first."""
+    suggestions = suggest_crud.suggest_tags(db, prefix, limit=limit)
+    return {
+        "suggestions": [
+            {"value": name, "count": count} for name, count in suggestions
+        ]
+    }
+
+
 @router.get("/{tag_id}", response_model=TagResponse)
 async def get_tag(
     tag_id: str = Path(..., description="Tag ID"),
@@ -52,17 +78,31 @@ async def get_snippets_by_tag(
     limit: int = Query(
         100, ge=1, le=100, description="Maximum number of records to return"
     ),
+    sort: str = Query(
+        DEFAULT_SORT, description="Sort order: updated, created, title or usage"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     db: Session = Depends(get_db),
 ):
     """Get snippets by tag."""
     try:
-        snippets = tag_crud.get_snippets_by_tag(db, tag_id, skip=skip, limit=limit)
-        return {"snippets": snippets}
+        snippets = tag_crud.get_snippets_by_tag(
+            db, tag_id, skip=skip, limit=limit, sort=sort, cursor=cursor
+        )
+        return {
+            "snippets": snippets,
+            "next_cursor": next_cursor(snippets, sort, limit),
+        }
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=format_error_response(status.HTTP_404_NOT_FOUND, str(e)),
         )
+    except BadRequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=format_error_response(status.HTTP_400_BAD_REQUEST, e.message),
+        )
 
 
 @router.post("", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -12,6 +13,31 @@ class Settings(BaseSettings):
 
     # Database settings
     DATABASE_URL: str = f"sqlite:///{Path(__file__).parent.parent}/snippets.db"
+    # Code bodies larger than this many bytes are stored zlib-compressed
+    CODE_COMPRESSION_THRESHOLD: int = 8 * 1024
+    # Every n-th snippet revision stores the full code instead of a delta
+    REVISION_KEYFRAME_INTERVAL: int = 16
+
+    # Server-sent events settings
+    EVENTS_BUFFER_SIZE: int = 256
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    EVENTS_REPLAY_LIMIT: int = 1000
+
+    # Days of activity history returned by GET /api/stats
+    STATS_ACTIVITY_DAYS: int = 30
+
+    # Per-request query counts and timings in Server-Timing headers and logs
+    REQUEST_METRICS_ENABLED: bool = True
+    # Prometheus metrics at GET /metrics
+    METRICS_ENABLED: bool = True
+    # Queries slower than this are logged with their plan; None disables it
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    # Profiler and slow-query endpoints under /api/debug; keep off in production
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+    # Sampling profiler for requests sent with X-Profile: 1
+    PROFILER_INTERVAL_MS: float = 1.0
+    PROFILER_KEEP: int = 20
 
     # CORS settings
     CORS_ORIGINS: list[str] = ["*"]
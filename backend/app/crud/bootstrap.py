@@ -0,0 +1,114 @@
+import gzip
+import threading
+from typing import Dict, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from app.crud.changes import get_latest_seq
+from app.crud.snippet import build_snippets_query
+from app.crud.sorting import order_snippets
+from app.models import Category, Collection, Snippet, Tag, snippet_tag
+from app.schemas.bootstrap import BootstrapResponse
+from app.utils.metrics import record_cache_lookup
+
+# Attempts at reading all lists without a write landing in between
+_SNAPSHOT_ATTEMPTS = 3
+
+# (seq, snippet_limit) -> (json, gzipped json); only entries of the newest seq
+_cache: Dict[Tuple[int, int], Tuple[bytes, bytes]] = {}
+_cache_lock = threading.Lock()
+
+
+def reset_bootstrap_cache() -> None:
+    """Drop cached payloads."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_bootstrap(db: Session, snippet_limit: int = 100) -> Tuple[int, bytes, bytes]:
+    """Get the initial UI state: categories, tags, collections and snippets.
+
+    The payload is tied to the change-feed sequence number it was read at, so
+    it doubles as the ETag and clients can follow ``/api/changes`` from it.
+    Payloads are cached per sequence number; any write moves it on.
+
+    Args:
+        db: Database session
+        snippet_limit: Maximum number of live snippets to include
+
+    Returns:
+        ``(seq, json, gzipped_json)``
+    """
+    seq = get_latest_seq(db)
+    with _cache_lock:
+        cached = _cache.get((seq, snippet_limit))
+    record_cache_lookup("bootstrap", cached is not None)
+    if cached is not None:
+        return (seq, *cached)
+
+    for attempt in range(_SNAPSHOT_ATTEMPTS):
+        payload = _gather(db, snippet_limit)
+        latest = get_latest_seq(db)
+        stable = latest == seq
+        if stable or attempt == _SNAPSHOT_ATTEMPTS - 1:
+            break
+        # A write landed while reading; read again so all lists agree
+        seq = latest
+
+    # Without a stable read the lists hold all changes up to ``seq`` and
+    # maybe some after it; clients replaying the feed from ``seq`` catch up,
+    # but the payload is not what ``seq`` stands for, so it is not cached
+    body = (
+        BootstrapResponse(seq=seq, **payload)
+        .model_dump_json(by_alias=True)
+        .encode("utf-8")
+    )
+    entry = (body, gzip.compress(body, compresslevel=6))
+    if not stable:
+        return (seq, *entry)
+    with _cache_lock:
+        for key in [key for key in _cache if key[0] != seq]:
+            del _cache[key]
+        _cache[(seq, snippet_limit)] = entry
+    return (seq, *entry)
+
+
+def _gather(db: Session, snippet_limit: int) -> Dict[str, list]:
+    """Read all four lists with one query each plus two grouped counts."""
+    live = Snippet.is_deleted == False
+
+    category_counts = dict(
+        db.query(Snippet.category_id, func.count(Snippet.id))
+        .filter(live, Snippet.category_id.isnot(None))
+        .group_by(Snippet.category_id)
+        .all()
+    )
+    categories = db.query(Category).all()
+    for category in categories:
+        setattr(category, "snippet_count", category_counts.get(category.id, 0))
+
+    tag_counts = dict(
+        db.query(snippet_tag.c.tag_id, func.count(Snippet.id))
+        .join(Snippet, Snippet.id == snippet_tag.c.snippet_id)
+        .filter(live)
+        .group_by(snippet_tag.c.tag_id)
+        .all()
+    )
+    tags = db.query(Tag).all()
+    for tag in tags:
+        setattr(tag, "snippet_count", tag_counts.get(tag.id, 0))
+
+    collections = db.query(Collection).all()
+    snippets = (
+        order_snippets(build_snippets_query(db))
+        .options(selectinload(Snippet.tags))
+        .limit(snippet_limit)
+        .all()
+    )
+    return {
+        "categories": categories,
+        "tags": tags,
+        "collections": collections,
+        "snippets": snippets,
+    }
@@ -1,11 +1,27 @@
+import threading
 import uuid
-from typing import List
-
-from sqlalchemy.orm import Session
-
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.crud import stats
+from app.crud.sorting import (
+    DEFAULT_SORT,
+    order_snippets,
+    reads_sort_index,
+    unindexed,
+)
 from app.models import Category, Snippet
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.models.change import log_change
+from app.schemas.category import (
+    CategoryCreate,
+    CategoryTreeResponse,
+    CategoryUpdate,
+)
 from app.utils.error_handling import NotFoundError
+from app.utils.metrics import record_cache_lookup
 
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
@@ -25,17 +41,189 @@ def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Categor
     # 获取所有分类
     categories = db.query(Category).offset(skip).limit(limit).all()
     
-    # 为每个分类计算代码片段数量
+    # 用一个分组查询计算本页分类的代码片段数量
+    snippet_counts: Dict[str, int] = dict(
+        db.query(Snippet.category_id, func.count(Snippet.id))
+        .filter(
+            Snippet.category_id.in_([category.id for category in categories]),
+            Snippet.is_deleted == False,
+        )
+        .group_by(Snippet.category_id)
+        .all()
+    )
     for category in categories:
-        snippet_count = db.query(func.count(Snippet.id)).filter(
-            Snippet.category_id == category.id,
-            Snippet.is_deleted == False
-        ).scalar()
-        setattr(category, "snippet_count", snippet_count or 0)
+        setattr(category, "snippet_count", snippet_counts.get(category.id, 0))
     
     return categories
 
 
+def subtree_ids_select(category_id: str) -> Select:
+    """Build a SELECT yielding the IDs of a category and all its descendants.
+
+    The subtree is resolved inside SQLite with a recursive CTE, so the cost is
+    one statement regardless of the depth of the tree.
+
+    Args:
+        category_id: ID of the subtree root
+
+    Returns:
+        SELECT statement usable in ``IN`` filters
+    """
+    subtree = (
+        select(Category.id.label("id"))
+        .where(Category.id == category_id)
+        .cte("category_subtree", recursive=True)
+    )
+    # UNION (rather than UNION ALL) also stops the recursion on parent cycles
+    subtree = subtree.union(
+        select(Category.id).where(Category.parent_id == subtree.c.id)
+    )
+    return select(subtree.c.id)
+
+
+# Serialized category tree, valid until the next category or snippet write
+_tree_cache: Optional[bytes] = None
+_tree_generation = 0
+_tree_lock = threading.Lock()
+
+
+def invalidate_category_tree() -> None:
+    """Drop the cached category tree.
+
+    Must be called after every write that changes categories or snippet
+    counts, i.e. any category or snippet write.
+    """
+    global _tree_cache, _tree_generation
+    with _tree_lock:
+        _tree_generation += 1
+        _tree_cache = None
+
+
+def get_category_tree(db: Session) -> List[Dict[str, Any]]:
+    """Get the whole category tree with direct and subtree snippet counts.
+
+    The tree is assembled in memory from one flat category query and one
+    grouped count query, so its cost does not depend on the tree depth.
+
+    Args:
+        db: Database session
+
+    Returns:
+        List of root category nodes, each with nested ``children``
+    """
+    categories = db.query(Category).order_by(Category.name).all()
+    counts: Dict[str, int] = dict(
+        db.query(Snippet.category_id, func.count(Snippet.id))
+        .filter(Snippet.is_deleted == False, Snippet.category_id.is_not(None))
+        .group_by(Snippet.category_id)
+        .all()
+    )
+    return build_category_tree(categories, counts)
+
+
+def get_category_tree_json(db: Session) -> bytes:
+    """Get the category tree as a ready-to-serve JSON response body.
+
+    The serialized tree is cached until ``invalidate_category_tree`` is
+    called, so repeated requests neither query nor serialize.
+
+    Args:
+        db: Database session
+
+    Returns:
+        JSON encoded ``CategoryTreeResponse``
+    """
+    with _tree_lock:
+        cached, generation = _tree_cache, _tree_generation
+    record_cache_lookup("category_tree", cached is not None)
+    if cached is not None:
+        return cached
+
+    body = (
+        CategoryTreeResponse.model_validate({"categories": get_category_tree(db)})
+        .model_dump_json(by_alias=True)
+        .encode()
+    )
+
+    return _store_tree_cache(body, generation)
+
+
+def _store_tree_cache(body: bytes, generation: int) -> bytes:
+    """Cache a serialized tree unless a write happened while it was built."""
+    global _tree_cache
+    with _tree_lock:
+        if generation == _tree_generation:
+            _tree_cache = body
+    return body
+
+
+def build_category_tree(
+    categories: Iterable[Category], counts: Dict[str, int]
+) -> List[Dict[str, Any]]:
+    """Nest flat categories into a tree and aggregate subtree counts.
+
+    Categories whose parent does not exist, or that are part of a parent
+    cycle, are treated as roots.
+
+    Args:
+        categories: All categories
+        counts: Number of live snippets per category ID
+
+    Returns:
+        List of root category nodes
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for category in categories:
+        category_id = str(category.id)
+        nodes[category_id] = {
+            "id": category_id,
+            "name": category.name,
+            "description": category.description,
+            "parent_id": category.parent_id,
+            "created_at": category.created_at,
+            "snippet_count": counts.get(category_id, 0),
+            "subtree_snippet_count": 0,
+            "children": [],
+        }
+
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        if parent is not None and not _is_ancestor(nodes, node, parent):
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+
+    # Iterative post-order walk: children are summed before their parents
+    stack = [(root, False) for root in roots]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            node["subtree_snippet_count"] = node["snippet_count"] + sum(
+                child["subtree_snippet_count"] for child in node["children"]
+            )
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node["children"])
+    return roots
+
+
+def _is_ancestor(
+    nodes: Dict[str, Dict[str, Any]],
+    node: Dict[str, Any],
+    candidate: Dict[str, Any],
+) -> bool:
+    """Check whether ``node`` is reachable from ``candidate`` via parent links."""
+    seen = set()
+    current: Optional[Dict[str, Any]] = candidate
+    while current is not None and current["id"] not in seen:
+        if current is node:
+            return True
+        seen.add(current["id"])
+        current = nodes.get(current["parent_id"])
+    return False
+
+
 def get_category(db: Session, category_id: str) -> Category:
     """Get a category by ID.
 
@@ -86,6 +274,7 @@ def create_category(db: Session, category_data: CategoryCreate) -> Category:
     db.add(category)
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     return category
 
 
@@ -115,6 +304,7 @@ def update_category(
 
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     return category
 
 
@@ -133,7 +323,18 @@ def delete_category(db: Session, category_id: str) -> bool:
     """
     category = get_category(db, category_id)
 
+    # Bulk updates bypass the ORM, so log the rows they touch explicitly
+    for (snippet_id,) in db.query(Snippet.id).filter(
+        Snippet.category_id == category_id
+    ):
+        log_change(db, "snippet", snippet_id)
+    for (child_id,) in db.query(Category.id).filter(
+        Category.parent_id == category_id
+    ):
+        log_change(db, "category", child_id)
+
     # Update snippets to remove category reference
+    stats.category_deleted(db, category_id)
     db.query(Snippet).filter(Snippet.category_id == category_id).update(
         {"category_id": None}
     )
@@ -145,11 +346,52 @@ def delete_category(db: Session, category_id: str) -> bool:
 
     db.delete(category)
     db.commit()
+    invalidate_category_tree()
     return True
 
 
+def category_filter(
+    db: Session,
+    category_id: str,
+    include_descendants: bool = False,
+    page_end: Optional[int] = None,
+) -> ColumnElement:
+    """Filter snippets by category, for a query ordered by a sort index.
+
+    The planner only knows the average size of a category. A category
+    holding many snippets is therefore hidden from the category index so the
+    page is read in the order of the sort index; a small one is looked up
+    through ``ix_snippets_category_id`` and sorted.
+
+    Args:
+        db: Database session
+        category_id: Category ID
+        include_descendants: Also match snippets of all subcategories
+        page_end: Offset plus limit of the page; None if the query is not
+            paginated, leaving the choice to the planner
+
+    Returns:
+        Filter on ``Snippet``
+    """
+    keys: Union[List[str], Select] = [category_id]
+    if include_descendants:
+        keys = subtree_ids_select(category_id)
+    column: ColumnElement = Snippet.category_id
+    if page_end is not None and reads_sort_index(
+        *stats.count_live_snippets(db, "category", keys), page_end
+    ):
+        column = unindexed(column)
+    return column.in_(keys)
+
+
 def get_snippets_by_category(
-    db: Session, category_id: str, skip: int = 0, limit: int = 100
+    db: Session,
+    category_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    include_descendants: bool = False,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
 ) -> List[Snippet]:
     """Get snippets by category.
 
@@ -158,19 +400,28 @@ def get_snippets_by_category(
         category_id: Category ID
         skip: Number of records to skip
         limit: Maximum number of records to return
+        include_descendants: Also include snippets of all subcategories
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
 
     Returns:
         List of snippets in the category
 
     Raises:
         NotFoundError: If category not found
+        BadRequestError: If the sort order or cursor is invalid
     """
-    # Verify category exists
-    get_category(db, category_id)
+    # Verify category exists, without counting its snippets
+    if db.query(Category.id).filter(Category.id == category_id).first() is None:
+        raise NotFoundError("category", category_id)
 
+    query = db.query(Snippet).filter(
+        category_filter(db, category_id, include_descendants, skip + limit),
+        Snippet.is_deleted == False,
+    )
     return (
-        db.query(Snippet)
-        .filter(Snippet.category_id == category_id, Snippet.is_deleted == False)
+        order_snippets(query, sort, cursor)
+        .options(selectinload(Snippet.tags))
         .offset(skip)
         .limit(limit)
         .all()
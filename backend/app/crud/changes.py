@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Category, Change, CodeBlob, Collection, Snippet, Tag
+from app.models.change import DELETE, UPSERT
+from app.schemas.category import Category as CategorySchema
+from app.schemas.collection import Collection as CollectionSchema
+from app.schemas.snippet import Snippet as SnippetSchema
+from app.schemas.tag import Tag as TagSchema
+
+# Entity name -> (model, schema used for its feed data)
+_ENTITIES: Dict[str, Tuple[Any, Type[BaseModel]]] = {
+    "snippet": (Snippet, SnippetSchema),
+    "tag": (Tag, TagSchema),
+    "category": (Category, CategorySchema),
+    "collection": (Collection, CollectionSchema),
+}
+
+# Entity name -> loader options for the relationships its schema reads
+_LOAD_OPTIONS = {
+    "snippet": [
+        selectinload(Snippet.tags),
+        # The feed carries full code bodies, compressed ones included
+        selectinload(Snippet.blob).undefer(CodeBlob.data),
+    ],
+}
+
+
+def get_latest_seq(db: Session) -> int:
+    """Get the sequence number of the newest change, 0 if there is none."""
+    return db.query(func.max(Change.seq)).scalar() or 0
+
+
+def get_changes(
+    db: Session, since: int = 0, limit: int = 500
+) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Get what changed after a sequence number.
+
+    Several changes to the same entity collapse into its latest one. Upserts
+    carry the entity's current state; tombstones only the entity and ID.
+
+    Args:
+        db: Database session
+        since: Last sequence number the client has applied
+        limit: Maximum number of log entries to read
+
+    Returns:
+        ``(changes, cursor, has_more)``: the compacted changes ordered by
+        sequence number, the sequence number to resume from, and whether
+        more entries follow it
+    """
+    rows: List[Any] = (
+        db.query(Change.seq, Change.entity, Change.entity_id, Change.op)
+        .filter(Change.seq > since)
+        .order_by(Change.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    cursor = rows[-1].seq if rows else since
+
+    latest: Dict[Tuple[str, str], Tuple[int, str]] = {}
+    for row in rows:
+        latest[(row.entity, row.entity_id)] = (row.seq, row.op)
+
+    # Load the current state of every upserted entity, one query per type
+    wanted: Dict[str, List[str]] = {}
+    for (entity, entity_id), (_, op) in latest.items():
+        if op == UPSERT and entity in _ENTITIES:
+            wanted.setdefault(entity, []).append(entity_id)
+    found: Dict[Tuple[str, str], Any] = {}
+    for entity, ids in wanted.items():
+        model, _ = _ENTITIES[entity]
+        query = db.query(model).options(*_LOAD_OPTIONS.get(entity, []))
+        for obj in query.filter(model.id.in_(ids)):
+            found[(entity, obj.id)] = obj
+
+    changes = []
+    for (entity, entity_id), (seq, op) in sorted(
+        latest.items(), key=lambda item: item[1][0]
+    ):
+        data = _entity_data(entity, entity_id, found.get((entity, entity_id)))
+        if op == UPSERT and data is None:
+            # Deleted again after this window; its tombstone follows later
+            op = DELETE
+        changes.append(
+            {
+                "seq": seq,
+                "entity": entity,
+                "id": entity_id,
+                "op": op,
+                "data": data if op == UPSERT else None,
+            }
+        )
+    return changes, cursor, has_more
+
+
+def _entity_data(entity: str, entity_id: str, obj: Any) -> Optional[Dict[str, Any]]:
+    if entity == "collection_snippet":
+        collection_id, snippet_id = entity_id.split("/", 1)
+        return {"collectionId": collection_id, "snippetId": snippet_id}
+    if obj is None:
+        return None
+    _, schema = _ENTITIES[entity]
+    data: Dict[str, Any] = schema.model_validate(obj).model_dump(
+        by_alias=True, mode="json", exclude={"snippet_count"}
+    )
+    return data
@@ -1,8 +1,10 @@
 import uuid
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
+from app.crud.sorting import DEFAULT_SORT, order_snippets
 from app.models import Collection, Snippet, collection_snippet
 from app.schemas.collection import CollectionCreate, CollectionUpdate
 from app.utils.error_handling import NotFoundError
@@ -112,7 +114,12 @@ def delete_collection(db: Session, collection_id: str) -> bool:
 
 
 def get_snippets_in_collection(
-    db: Session, collection_id: str, skip: int = 0, limit: int = 100
+    db: Session,
+    collection_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
 ) -> List[Snippet]:
     """Get snippets in a collection.
 
@@ -121,23 +128,32 @@ def get_snippets_in_collection(
         collection_id: Collection ID
         skip: Number of records to skip
         limit: Maximum number of records to return
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
 
     Returns:
         List of snippets in the collection
 
     Raises:
         NotFoundError: If collection not found
+        BadRequestError: If the sort order or cursor is invalid
     """
     # Verify collection exists
     get_collection(db, collection_id)
 
+    # A membership test rather than a join, so the snippets are read in
+    # the order of the sort index
+    query = db.query(Snippet).filter(
+        Snippet.id.in_(
+            select(collection_snippet.c.snippet_id).where(
+                collection_snippet.c.collection_id == collection_id
+            )
+        ),
+        Snippet.is_deleted == False,
+    )
     return (
-        db.query(Snippet)
-        .join(collection_snippet, Snippet.id == collection_snippet.c.snippet_id)
-        .filter(
-            collection_snippet.c.collection_id == collection_id,
-            Snippet.is_deleted == False,
-        )
+        order_snippets(query, sort, cursor)
+        .options(selectinload(Snippet.tags))
         .offset(skip)
         .limit(limit)
         .all()
@@ -0,0 +1,116 @@
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Snippet
+from app.utils.minhash import MinHashLSH
+
+# MinHash signatures of the code of all live snippets, built on first use
+_index = MinHashLSH()
+_loaded = False
+_load_lock = threading.Lock()
+
+# Writes committed while the index is loading, applied once it is loaded;
+# None when no load is running
+_pending: Optional[List[Tuple[str, Optional[str]]]] = None
+_pending_lock = threading.Lock()
+
+
+def _apply(snippet_id: str, code: Optional[str]) -> None:
+    if code is None:
+        _index.remove(snippet_id)
+    else:
+        _index.add(snippet_id, code)
+
+
+def _ensure_loaded(db: Session) -> None:
+    """Build the index from the database on first use."""
+    global _loaded, _pending
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        with _pending_lock:
+            _pending = []
+        rows = (
+            db.query(Snippet.id, Snippet.code)
+            .filter(Snippet.is_deleted == False)
+            .yield_per(1000)
+        )
+        _index.load(rows)
+        # The load may have read the rows of these writes before they
+        # committed; replaying them is harmless if it did not
+        with _pending_lock:
+            for snippet_id, code in _pending:
+                _apply(snippet_id, code)
+            _pending = None
+            _loaded = True
+
+
+def _changed(snippet_id: str, code: Optional[str]) -> None:
+    if not _loaded:
+        with _pending_lock:
+            if _pending is not None:
+                _pending.append((snippet_id, code))
+                return
+            if not _loaded:
+                return
+    _apply(snippet_id, code)
+
+
+def reset_duplicate_index() -> None:
+    """Drop the index; it is rebuilt from the database on next use."""
+    global _loaded
+    with _load_lock:
+        _index.clear()
+        _loaded = False
+
+
+def find_duplicates(
+    db: Session, code: str, threshold: float = 0.8, exclude: str = ""
+) -> List[Tuple[str, float]]:
+    """Find live snippets whose code is a near-duplicate of some code.
+
+    Args:
+        db: Database session, only used to build the index on first use
+        code: Code to look up
+        threshold: Minimum estimated Jaccard similarity of the code shingles
+        exclude: Snippet ID to leave out
+
+    Returns:
+        ``(snippet_id, similarity)`` pairs, most similar first
+    """
+    _ensure_loaded(db)
+    return _index.query(code, threshold, exclude=exclude)
+
+
+def get_duplicate_groups(
+    db: Session, threshold: float = 0.8
+) -> List[Tuple[List[str], float]]:
+    """Group all live snippets into near-duplicate clusters.
+
+    Args:
+        db: Database session, only used to build the index on first use
+        threshold: Minimum estimated Jaccard similarity of linked snippets
+
+    Returns:
+        ``(snippet_ids, min_similarity)`` per group, largest groups first
+    """
+    _ensure_loaded(db)
+    return _index.groups(threshold)
+
+
+def snippet_code_changed(snippet: Snippet) -> None:
+    """Apply a committed snippet write to the index.
+
+    Args:
+        snippet: Snippet after the write
+    """
+    _changed(snippet.id, None if snippet.is_deleted else snippet.code)
+
+
+def snippet_removed(snippet_id: str) -> None:
+    """Drop a permanently deleted snippet from the index."""
+    _changed(snippet_id, None)
@@ -0,0 +1,68 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction, UOWTransaction
+
+from app.config import settings
+from app.models import Change
+from app.utils.broadcast import Broadcaster
+
+# Live subscribers of GET /api/events; messages are ``(seq, sse_bytes)``
+broadcaster = Broadcaster(buffer_size=settings.EVENTS_BUFFER_SIZE)
+
+
+def encode_event(seq: int, entity: str, entity_id: str, op: str) -> bytes:
+    """Encode one change notification as a server-sent event."""
+    data = json.dumps(
+        {"entity": entity, "id": entity_id, "op": op, "revision": seq},
+        separators=(",", ":"),
+    )
+    return f"id: {seq}\nevent: change\ndata: {data}\n\n".encode("utf-8")
+
+
+def get_missed_events(db: Session, last_seq: int) -> Optional[List[Tuple[int, bytes]]]:
+    """Get the notifications a reconnecting client missed.
+
+    Args:
+        db: Database session
+        last_seq: Last event ID the client received
+
+    Returns:
+        ``(seq, event)`` pairs, or None if the gap is too large to replay and
+        the client should resync through ``GET /api/changes`` instead
+    """
+    rows: List[Any] = (
+        db.query(Change.seq, Change.entity, Change.entity_id, Change.op)
+        .filter(Change.seq > last_seq)
+        .order_by(Change.seq)
+        .limit(settings.EVENTS_REPLAY_LIMIT + 1)
+        .all()
+    )
+    if len(rows) > settings.EVENTS_REPLAY_LIMIT:
+        return None
+    return [(row.seq, encode_event(*row)) for row in rows]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context: UOWTransaction) -> None:
+    flushed = [
+        (obj.seq, obj.entity, obj.entity_id, obj.op)
+        for obj in session.new
+        if isinstance(obj, Change)
+    ]
+    if flushed:
+        session.info.setdefault("flushed_changes", []).extend(flushed)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    for change in session.info.pop("flushed_changes", []):
+        broadcaster.publish((change[0], encode_event(*change)))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back_changes(
+    session: Session, previous_transaction: SessionTransaction
+) -> None:
+    session.info.pop("flushed_changes", None)
@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, lazyload
+
+from app.config import settings
+from app.models import Snippet, SnippetRevision
+from app.utils.delta import apply_delta, make_delta
+from app.utils.error_handling import NotFoundError
+
+_FIELDS = ("title", "description", "language", "code")
+
+
+def snapshot(snippet: Snippet) -> Dict[str, Optional[str]]:
+    """Capture the versioned fields of a snippet before it is edited."""
+    return {field: getattr(snippet, field) for field in _FIELDS}
+
+
+def _new_revision(
+    snippet_id: str,
+    number: int,
+    state: Dict[str, Optional[str]],
+    base_code: Optional[str] = None,
+) -> SnippetRevision:
+    """Build a revision, as a delta against ``base_code`` when that pays off."""
+    revision = SnippetRevision(
+        snippet_id=snippet_id,
+        number=number,
+        title=state["title"],
+        description=state["description"],
+        language=state["language"],
+    )
+    code = state["code"]
+    if base_code is not None and (number - 1) % settings.REVISION_KEYFRAME_INTERVAL:
+        delta = make_delta(base_code, code)
+        # A delta that saves little is not worth the longer reconstruction chain
+        if len(delta) * 2 < len(code.encode("utf-8")):
+            revision.delta = delta
+            return revision
+    revision.code = code
+    return revision
+
+
+def record_revision(
+    db: Session, snippet: Snippet, previous: Optional[Dict[str, Optional[str]]] = None
+) -> Optional[SnippetRevision]:
+    """Add a revision for the current state of a snippet, without committing.
+
+    Every ``REVISION_KEYFRAME_INTERVAL``-th revision stores the full code; the
+    ones in between store a delta against their predecessor, so rebuilding any
+    version applies a bounded number of deltas.
+
+    Args:
+        db: Database session
+        snippet: Snippet after the edit
+        previous: Snapshot taken before the edit, None for a new snippet
+
+    Returns:
+        The new revision, or None if no versioned field changed
+    """
+    current = snapshot(snippet)
+    if previous is not None and previous == current:
+        return None
+
+    latest = (
+        db.query(SnippetRevision.number)
+        .filter(SnippetRevision.snippet_id == snippet.id)
+        .order_by(SnippetRevision.number.desc())
+        .first()
+    )
+    number = latest.number + 1 if latest else 1
+    if latest is None and previous is not None:
+        # Snippet saved before revisions existed: keep its old state as the base
+        db.add(_new_revision(snippet.id, number, previous))
+        number += 1
+
+    revision = _new_revision(
+        snippet.id,
+        number,
+        current,
+        previous["code"] if previous is not None else None,
+    )
+    db.add(revision)
+    return revision
+
+
+def get_revisions(db: Session, snippet_id: str) -> List[SnippetRevision]:
+    """Get the revisions of a snippet, newest first.
+
+    Args:
+        db: Database session
+        snippet_id: Snippet ID
+
+    Returns:
+        Revisions without their code
+
+    Raises:
+        NotFoundError: If snippet not found
+    """
+    if not db.query(Snippet.id).filter(Snippet.id == snippet_id).first():
+        raise NotFoundError("snippet", snippet_id)
+    return (
+        db.query(SnippetRevision)
+        .options(lazyload(SnippetRevision.blob))
+        .filter(SnippetRevision.snippet_id == snippet_id)
+        .order_by(SnippetRevision.number.desc())
+        .all()
+    )
+
+
+def get_revision(
+    db: Session, snippet_id: str, number: int
+) -> Tuple[SnippetRevision, str]:
+    """Reconstruct one revision of a snippet.
+
+    Loads the nearest keyframe at or before the revision and replays the
+    deltas after it.
+
+    Args:
+        db: Database session
+        snippet_id: Snippet ID
+        number: Revision number, starting at 1
+
+    Returns:
+        The revision and its full code
+
+    Raises:
+        NotFoundError: If the revision does not exist
+    """
+    keyframe = (
+        db.query(func.max(SnippetRevision.number))
+        .filter(
+            SnippetRevision.snippet_id == snippet_id,
+            SnippetRevision.number <= number,
+            SnippetRevision.code_hash.isnot(None),
+        )
+        .scalar()
+    )
+    chain = []
+    if keyframe is not None:
+        chain = (
+            db.query(SnippetRevision)
+            .filter(
+                SnippetRevision.snippet_id == snippet_id,
+                SnippetRevision.number.between(keyframe, number),
+            )
+            .order_by(SnippetRevision.number)
+            .all()
+        )
+    if not chain or chain[-1].number != number:
+        raise NotFoundError("revision", f"{snippet_id}/{number}")
+
+    code = chain[0].code
+    for revision in chain[1:]:
+        code = apply_delta(code, revision.delta)
+    return chain[-1], code
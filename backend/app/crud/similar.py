@@ -0,0 +1,102 @@
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Snippet
+from app.utils.tfidf import TfidfIndex
+
+# TF-IDF vectors of all live snippets, built on first use
+_index = TfidfIndex()
+_loaded = False
+_load_lock = threading.Lock()
+
+# Writes committed while the index is loading, applied once it is loaded;
+# None when no load is running
+_pending: Optional[List[Tuple[str, Optional[Tuple[str, str]]]]] = None
+_pending_lock = threading.Lock()
+
+
+def _apply(snippet_id: str, content: Optional[Tuple[str, str]]) -> None:
+    if content is None:
+        _index.remove(snippet_id)
+    else:
+        _index.add(snippet_id, *content)
+
+
+def _ensure_loaded(db: Session) -> None:
+    """Build the index from the database on first use."""
+    global _loaded, _pending
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        with _pending_lock:
+            _pending = []
+        rows = (
+            db.query(Snippet.id, Snippet.title, Snippet.code)
+            .filter(Snippet.is_deleted == False)
+            .yield_per(1000)
+        )
+        _index.load(rows)
+        # The load may have read the rows of these writes before they
+        # committed; replaying them is harmless if it did not
+        with _pending_lock:
+            for snippet_id, content in _pending:
+                _apply(snippet_id, content)
+            _pending = None
+            _loaded = True
+
+
+def _changed(snippet_id: str, content: Optional[Tuple[str, str]]) -> None:
+    if not _loaded:
+        with _pending_lock:
+            if _pending is not None:
+                _pending.append((snippet_id, content))
+                return
+            if not _loaded:
+                return
+    _apply(snippet_id, content)
+
+
+def reset_similarity_index() -> None:
+    """Drop the index; it is rebuilt from the database on next use."""
+    global _loaded
+    with _load_lock:
+        _index.clear()
+        _loaded = False
+
+
+def get_similar_snippets(
+    db: Session, snippet: Snippet, limit: int = 10
+) -> List[Tuple[str, float]]:
+    """Find the live snippets whose title and code are closest to a snippet.
+
+    Args:
+        db: Database session, only used to build the index on first use
+        snippet: Snippet to compare against
+        limit: Maximum number of results
+
+    Returns:
+        ``(snippet_id, cosine_similarity)`` pairs, most similar first
+    """
+    _ensure_loaded(db)
+    return _index.similar(snippet.title, snippet.code, limit, exclude=snippet.id)
+
+
+def snippet_content_changed(snippet: Snippet) -> None:
+    """Apply a committed snippet write to the index.
+
+    Args:
+        snippet: Snippet after the write
+    """
+    if snippet.is_deleted:
+        _changed(snippet.id, None)
+    else:
+        _changed(snippet.id, (snippet.title, snippet.code))
+
+
+def snippet_removed(snippet_id: str) -> None:
+    """Drop a permanently deleted snippet from the index."""
+    _changed(snippet_id, None)
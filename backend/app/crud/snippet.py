@@ -1,16 +1,163 @@
+import logging
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict, Union
-
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
-
-from app.models import Snippet, Tag, snippet_tag
+from typing import Any, List, Optional, Dict, Tuple, Union
+
+from sqlalchemy import and_, exists, false, func, not_, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.crud.category import category_filter, invalidate_category_tree
+from app.crud import duplicates, similar, stats
+from app.crud.sorting import DEFAULT_SORT, order_snippets, reads_sort_index
+from app.crud.revision import record_revision, snapshot
+from app.crud.suggest import snippet_changed, snippet_terms
+from app.crud.tag import tag_filter
+from app.database import SessionLocal
+from app.models import Category, Snippet, Tag, snippet_tag
 from app.schemas.snippet import SnippetCreate, SnippetUpdate
 from app.utils.error_handling import NotFoundError
+from app.utils.tag_query import TagExpression, parse_tag_expression, tag_names
 
+logger = logging.getLogger("app.snippets")
 
-def get_snippets(
+
+def _tag_selectivity(db: Session, names: List[str]) -> Dict[str, Tuple[str, int]]:
+    """Resolve tag names to their IDs and posting-list sizes in one query."""
+    rows = (
+        db.query(Tag.name, Tag.id, func.count(snippet_tag.c.snippet_id))
+        .outerjoin(snippet_tag, snippet_tag.c.tag_id == Tag.id)
+        .filter(Tag.name.in_(names))
+        .group_by(Tag.id)
+        .all()
+    )
+    return {name: (tag_id, count) for name, tag_id, count in rows}
+
+
+def _order_conjunction(
+    terms: List[TagExpression], tags: Dict[str, Tuple[str, int]]
+) -> List[TagExpression]:
+    """Order the terms of a conjunction: most selective positive terms first,
+    negations last."""
+
+    def cost(child: TagExpression) -> Tuple[int, int]:
+        if child[0] == "tag":
+            return (0, tags[child[1]][1] if child[1] in tags else 0)
+        if child[0] == "not":
+            return (2, 0)
+        return (1, 0)
+
+    return sorted(terms, key=cost)
+
+
+def _driving_tag_ids(
+    node: TagExpression, tags: Dict[str, Tuple[str, int]]
+) -> List[str]:
+    """Get the IDs of the tags whose posting list drives a tag expression."""
+    kind, value = node
+    if kind == "tag":
+        return [tags[value][0]] if value in tags else []
+    if kind == "or":
+        if all(child[0] == "tag" for child in value):
+            return [tags[child[1]][0] for child in value if child[1] in tags]
+        return []
+    if kind == "and":
+        first = _order_conjunction(value, tags)[0]
+        return [] if first[0] == "not" else _driving_tag_ids(first, tags)
+    return []
+
+
+def _compile_tag_expression(
+    node: TagExpression, tags: Dict[str, Tuple[str, int]], drive: bool = False
+) -> ColumnElement:
+    """Translate a parsed tag expression into a filter on ``Snippet``.
+
+    Plain terms become correlated ``EXISTS`` probes on the ``snippet_tags``
+    primary key. The driving term (the rarest positive term of the top-level
+    conjunction) becomes ``Snippet.id IN (...)`` over the tag index instead,
+    so only its posting list is scanned and every other term costs one index
+    lookup per candidate, independent of how common the other tags are.
+    """
+    kind, value = node
+
+    if kind == "tag":
+        if value not in tags:
+            return false()
+        tag_id = tags[value][0]
+        if drive:
+            return Snippet.id.in_(
+                select(snippet_tag.c.snippet_id).where(snippet_tag.c.tag_id == tag_id)
+            )
+        return exists().where(
+            snippet_tag.c.snippet_id == Snippet.id, snippet_tag.c.tag_id == tag_id
+        )
+
+    if kind == "not":
+        return not_(_compile_tag_expression(value, tags))
+
+    if kind == "or":
+        if all(child[0] == "tag" for child in value):
+            # A union of plain tags is a single probe with tag_id IN (...)
+            tag_ids = [tags[child[1]][0] for child in value if child[1] in tags]
+            if not tag_ids:
+                return false()
+            if drive:
+                return Snippet.id.in_(
+                    select(snippet_tag.c.snippet_id).where(
+                        snippet_tag.c.tag_id.in_(tag_ids)
+                    )
+                )
+            return exists().where(
+                snippet_tag.c.snippet_id == Snippet.id,
+                snippet_tag.c.tag_id.in_(tag_ids),
+            )
+        return or_(*(_compile_tag_expression(child, tags) for child in value))
+
+    ordered = _order_conjunction(value, tags)
+    driving = drive and ordered[0][0] != "not"
+    return and_(
+        *(
+            _compile_tag_expression(child, tags, drive=driving and index == 0)
+            for index, child in enumerate(ordered)
+        )
+    )
+
+
+def filter_by_tag_expression(
+    db: Session, query: Query, expression: str, page_end: Optional[int] = None
+) -> Query:
+    """Apply a boolean tag expression to a snippet query.
+
+    When the driving term matches many snippets, it is probed like every
+    other term instead, so a paginated query is read in the order of its
+    sort index.
+
+    Args:
+        db: Database session
+        query: Snippet query
+        expression: Tag expression, e.g. ``python AND asyncio AND NOT deprecated``
+        page_end: Offset plus limit of the page; None if the query is not
+            paginated
+
+    Returns:
+        Filtered query
+
+    Raises:
+        BadRequestError: If the expression is malformed
+    """
+    node = parse_tag_expression(expression)
+    tags = _tag_selectivity(db, tag_names(node))
+    drive = True
+    if page_end is not None:
+        tag_ids = _driving_tag_ids(node, tags)
+        drive = not tag_ids or not reads_sort_index(
+            *stats.count_live_snippets(db, "tag", tag_ids), page_end
+        )
+    return query.filter(_compile_tag_expression(node, tags, drive=drive))
+
+
+def build_snippets_query(
     db: Session,
     *,
     deleted: Optional[bool] = False,
@@ -19,10 +166,11 @@ def get_snippets(
     language: Optional[str] = None,
     category_id: Optional[str] = None,
     tag: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> List[Snippet]:
-    """Get snippets with filters.
+    tags: Optional[str] = None,
+    include_descendants: bool = False,
+    page_end: Optional[int] = None,
+) -> Query:
+    """Build the unpaginated snippet query for a set of filters.
 
     Args:
         db: Database session
@@ -32,11 +180,17 @@ def get_snippets(
         language: Filter by programming language
         category_id: Filter by category ID
         tag: Filter by tag name
-        skip: Number of records to skip
-        limit: Maximum number of records to return
+        tags: Filter by boolean tag expression with AND, OR and NOT
+        include_descendants: Match snippets in subcategories of ``category_id``
+        page_end: Offset plus limit of the page the query will be sorted and
+            paginated for, so broad category and tag filters leave the sort
+            index to drive it
 
     Returns:
-        List of snippets
+        Filtered snippet query
+
+    Raises:
+        BadRequestError: If the tag expression is malformed
     """
     query = db.query(Snippet)
 
@@ -47,10 +201,13 @@ def get_snippets(
         query = query.filter(Snippet.is_favorite == favorite)
 
     if search:
+        # SQLite tests terms with correlated subqueries after the others and
+        # stops an OR at its first match, so code bodies are only read for
+        # rows that pass every other filter and miss on title and description
         search_filter = or_(
             Snippet.title.ilike(f"%{search}%"),
             Snippet.description.ilike(f"%{search}%"),
-            Snippet.code.ilike(f"%{search}%"),
+            Snippet.code_contains(search),
         )
         query = query.filter(search_filter)
 
@@ -58,17 +215,181 @@ def get_snippets(
         query = query.filter(Snippet.language == language)
 
     if category_id:
-        query = query.filter(Snippet.category_id == category_id)
+        query = query.filter(
+            category_filter(db, category_id, include_descendants, page_end)
+        )
 
     if tag:
-        tag_obj = db.query(Tag).filter(Tag.name == tag).first()
-        if tag_obj:
-            query = query.join(snippet_tag).filter(snippet_tag.c.tag_id == tag_obj.id)
+        query = query.filter(
+            tag_filter(db, select(Tag.id).where(Tag.name == tag), page_end)
+        )
+
+    if tags:
+        query = filter_by_tag_expression(db, query, tags, page_end)
 
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    return query
 
-    return query.all()
+
+def get_snippets(
+    db: Session,
+    *,
+    deleted: Optional[bool] = False,
+    favorite: Optional[bool] = None,
+    search: Optional[str] = None,
+    language: Optional[str] = None,
+    category_id: Optional[str] = None,
+    tag: Optional[str] = None,
+    tags: Optional[str] = None,
+    include_descendants: bool = False,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Snippet]:
+    """Get snippets with filters.
+
+    Args:
+        db: Database session
+        deleted: Filter by deleted status
+        favorite: Filter by favorite status
+        search: Search query
+        language: Filter by programming language
+        category_id: Filter by category ID
+        tag: Filter by tag name
+        tags: Filter by boolean tag expression with AND, OR and NOT
+        include_descendants: Match snippets in subcategories of ``category_id``
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+
+    Returns:
+        List of snippets
+
+    Raises:
+        BadRequestError: If the tag expression, sort order or cursor is invalid
+    """
+    query = build_snippets_query(
+        db,
+        deleted=deleted,
+        favorite=favorite,
+        search=search,
+        language=language,
+        category_id=category_id,
+        tag=tag,
+        tags=tags,
+        include_descendants=include_descendants,
+        page_end=skip + limit,
+    )
+
+    # Apply sorting and pagination
+    query = order_snippets(query, sort, cursor).offset(skip).limit(limit)
+
+    # Load the tags of the whole page in one query
+    return query.options(selectinload(Snippet.tags)).all()
+
+
+def get_snippet_facets(
+    db: Session,
+    *,
+    deleted: Optional[bool] = False,
+    favorite: Optional[bool] = None,
+    search: Optional[str] = None,
+    language: Optional[str] = None,
+    category_id: Optional[str] = None,
+    tag: Optional[str] = None,
+    tags: Optional[str] = None,
+    include_descendants: bool = False,
+    limit: int = 20,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Count the filtered snippets by language, category and tag.
+
+    Each facet is one grouped aggregate over the filtered set, evaluated
+    inside SQLite without loading any snippet rows, and only the ``limit``
+    largest buckets are returned so the response size stays bounded however
+    large the result set is.
+
+    Args:
+        db: Database session
+        deleted: Filter by deleted status
+        favorite: Filter by favorite status
+        search: Search query
+        language: Filter by programming language
+        category_id: Filter by category ID
+        tag: Filter by tag name
+        tags: Filter by boolean tag expression with AND, OR and NOT
+        include_descendants: Match snippets in subcategories of ``category_id``
+        limit: Maximum number of buckets per facet
+
+    Returns:
+        Facet buckets keyed by ``language``, ``category`` and ``tag``
+
+    Raises:
+        BadRequestError: If the tag expression is malformed
+    """
+    query = build_snippets_query(
+        db,
+        deleted=deleted,
+        favorite=favorite,
+        search=search,
+        language=language,
+        category_id=category_id,
+        tag=tag,
+        tags=tags,
+        include_descendants=include_descendants,
+    )
+    count = func.count(Snippet.id)
+
+    languages = (
+        query.with_entities(Snippet.language, count)
+        .group_by(Snippet.language)
+        .order_by(count.desc(), Snippet.language)
+        .limit(limit)
+        .all()
+    )
+
+    categories = (
+        query.join(Category, Category.id == Snippet.category_id)
+        .with_entities(Category.id, Category.name, count)
+        .group_by(Category.id)
+        .order_by(count.desc(), Category.name)
+        .limit(limit)
+        .all()
+    )
+
+    matching_ids = query.with_entities(Snippet.id).subquery()
+    tag_count = func.count(snippet_tag.c.snippet_id)
+    tag_buckets = (
+        db.query(Tag.name, tag_count)
+        .join(snippet_tag, snippet_tag.c.tag_id == Tag.id)
+        .filter(snippet_tag.c.snippet_id.in_(select(matching_ids.c.id)))
+        .group_by(Tag.id)
+        .order_by(tag_count.desc(), Tag.name)
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "language": [
+            {"value": value, "label": value, "count": n} for value, n in languages
+        ],
+        "category": [
+            {"value": value, "label": name, "count": n} for value, name, n in categories
+        ],
+        "tag": [{"value": name, "label": name, "count": n} for name, n in tag_buckets],
+    }
+
+
+def _content_changed(snippet: Snippet) -> None:
+    """Update the in-memory content indexes after a committed write."""
+    similar.snippet_content_changed(snippet)
+    duplicates.snippet_code_changed(snippet)
+
+
+def _content_removed(snippet_id: str) -> None:
+    """Drop a permanently deleted snippet from the in-memory content indexes."""
+    similar.snippet_removed(snippet_id)
+    duplicates.snippet_removed(snippet_id)
 
 
 def get_snippet(db: Session, snippet_id: str) -> Snippet:
@@ -90,6 +411,58 @@ def get_snippet(db: Session, snippet_id: str) -> Snippet:
     return snippet
 
 
+def record_access(snippet_id: str) -> None:
+    """Count an opening of a snippet for the "usage" sort order.
+
+    Runs after the response, in a session of its own, so reading a snippet
+    never waits on a write. The count is best-effort: if the database is
+    busy, the opening is not counted. Opening a snippet is not an edit, so
+    ``updated_at`` is kept and neither the change feed nor the bootstrap
+    cache move on; the counts they carry catch up with the snippet's next
+    change.
+
+    Args:
+        snippet_id: Snippet ID
+    """
+    db = SessionLocal()
+    try:
+        # A single UPDATE, so concurrent openings are all counted
+        db.query(Snippet).filter(Snippet.id == snippet_id).update(
+            {
+                Snippet.access_count: Snippet.access_count + 1,
+                Snippet.updated_at: Snippet.updated_at,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.warning("Could not count an opening of snippet %s", snippet_id)
+    finally:
+        db.close()
+
+
+def get_snippets_by_ids(db: Session, snippet_ids: List[str]) -> Dict[str, Snippet]:
+    """Get several snippets by ID in one query.
+
+    Args:
+        db: Database session
+        snippet_ids: Snippet IDs
+
+    Returns:
+        Found snippets keyed by ID
+    """
+    if not snippet_ids:
+        return {}
+    snippets = (
+        db.query(Snippet)
+        .options(selectinload(Snippet.tags))
+        .filter(Snippet.id.in_(snippet_ids))
+        .all()
+    )
+    return {snippet.id: snippet for snippet in snippets}
+
+
 def create_snippet(db: Session, snippet_data: SnippetCreate) -> Snippet:
     """Create a new snippet.
 
@@ -121,8 +494,13 @@ def create_snippet(db: Session, snippet_data: SnippetCreate) -> Snippet:
                 db.add(tag)
             snippet.tags.append(tag)
 
+    record_revision(db, snippet)
+    stats.snippet_changed(db, None, stats.snippet_footprint(snippet), "created")
     db.commit()
+    invalidate_category_tree()
     db.refresh(snippet)
+    snippet_changed(None, snippet_terms(snippet))
+    _content_changed(snippet)
     return snippet
 
 
@@ -143,6 +521,9 @@ def update_snippet(
         NotFoundError: If snippet not found
     """
     snippet = get_snippet(db, snippet_id)
+    before = snippet_terms(snippet)
+    previous = snapshot(snippet)
+    footprint = stats.snippet_footprint(snippet)
 
     # Update fields if provided
     update_data = snippet_data.dict(exclude_unset=True)
@@ -166,9 +547,14 @@ def update_snippet(
                 db.add(tag)
             snippet.tags.append(tag)
 
+    record_revision(db, snippet, previous)
     snippet.updated_at = datetime.utcnow()
+    stats.snippet_changed(db, footprint, stats.snippet_footprint(snippet), "updated")
     db.commit()
+    invalidate_category_tree()
     db.refresh(snippet)
+    snippet_changed(before, snippet_terms(snippet))
+    _content_changed(snippet)
     return snippet
 
 
@@ -186,9 +572,15 @@ def delete_snippet(db: Session, snippet_id: str) -> bool:
         NotFoundError: If snippet not found
     """
     snippet = get_snippet(db, snippet_id)
+    before = snippet_terms(snippet)
+    footprint = stats.snippet_footprint(snippet)
     snippet.is_deleted = True
     snippet.updated_at = datetime.utcnow()
+    stats.snippet_changed(db, footprint, stats.snippet_footprint(snippet), "deleted")
     db.commit()
+    invalidate_category_tree()
+    snippet_changed(before, snippet_terms(snippet))
+    _content_changed(snippet)
     return True
 
 
@@ -206,10 +598,16 @@ def restore_snippet(db: Session, snippet_id: str) -> Snippet:
         NotFoundError: If snippet not found
     """
     snippet = get_snippet(db, snippet_id)
+    before = snippet_terms(snippet)
+    footprint = stats.snippet_footprint(snippet)
     snippet.is_deleted = False
     snippet.updated_at = datetime.utcnow()
+    stats.snippet_changed(db, footprint, stats.snippet_footprint(snippet))
     db.commit()
+    invalidate_category_tree()
     db.refresh(snippet)
+    snippet_changed(before, snippet_terms(snippet))
+    _content_changed(snippet)
     return snippet
 
 
@@ -227,8 +625,18 @@ def permanently_delete_snippet(db: Session, snippet_id: str) -> bool:
         NotFoundError: If snippet not found
     """
     snippet = get_snippet(db, snippet_id)
+    before = snippet_terms(snippet)
+    stats.snippet_changed(
+        db,
+        stats.snippet_footprint(snippet),
+        None,
+        None if snippet.is_deleted else "deleted",
+    )
     db.delete(snippet)
     db.commit()
+    invalidate_category_tree()
+    snippet_changed(before, None)
+    _content_removed(snippet_id)
     return True
 
 
@@ -247,15 +655,22 @@ def toggle_favorite(db: Session, snippet_id: str, is_favorite: bool) -> Snippet:
         NotFoundError: If snippet not found
     """
     snippet = get_snippet(db, snippet_id)
+    footprint = stats.snippet_footprint(snippet)
     snippet.is_favorite = is_favorite
     snippet.updated_at = datetime.utcnow()
+    stats.snippet_changed(db, footprint, stats.snippet_footprint(snippet))
     db.commit()
+    invalidate_category_tree()
     db.refresh(snippet)
     return snippet
 
 
 def get_favorite_snippets(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
 ) -> List[Snippet]:
     """Get favorite snippets.
 
@@ -263,13 +678,21 @@ def get_favorite_snippets(
         db: Database session
         skip: Number of records to skip
         limit: Maximum number of records to return
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
 
     Returns:
         List of favorite snippets
+
+    Raises:
+        BadRequestError: If the sort order or cursor is invalid
     """
+    query = db.query(Snippet).filter(
+        Snippet.is_favorite == True, Snippet.is_deleted == False
+    )
     return (
-        db.query(Snippet)
-        .filter(Snippet.is_favorite == True, Snippet.is_deleted == False)
+        order_snippets(query, sort, cursor)
+        .options(selectinload(Snippet.tags))
         .offset(skip)
         .limit(limit)
         .all()
@@ -277,7 +700,11 @@ def get_favorite_snippets(
 
 
 def get_recycle_bin_snippets(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
 ) -> List[Snippet]:
     """Get snippets in recycle bin.
 
@@ -285,13 +712,19 @@ def get_recycle_bin_snippets(
         db: Database session
         skip: Number of records to skip
         limit: Maximum number of records to return
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
 
     Returns:
         List of deleted snippets
+
+    Raises:
+        BadRequestError: If the sort order or cursor is invalid
     """
+    query = db.query(Snippet).filter(Snippet.is_deleted == True)
     return (
-        db.query(Snippet)
-        .filter(Snippet.is_deleted == True)
+        order_snippets(query, sort, cursor)
+        .options(selectinload(Snippet.tags))
         .offset(skip)
         .limit(limit)
         .all()
@@ -0,0 +1,159 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
+
+from app.models import Snippet
+from app.utils.error_handling import BadRequestError
+
+
+class SortOrder(NamedTuple):
+    """A sort order of snippet lists."""
+
+    column: ColumnElement
+    descending: bool
+    collation: Optional[str] = None
+
+    def collated(self, expression: ColumnElement) -> ColumnElement:
+        if self.collation is None:
+            return expression
+        return expression.collate(self.collation)
+
+
+# Every order ends with the snippet ID so it is total and can be resumed
+# from a cursor. Each has an ``ix_snippets_sort_*`` index starting with
+# ``is_deleted``, which every list filters on, so SQLite can read rows in
+# order and stop after one page. For a selective filter, such as a rarely
+# used tag, reading the matches and sorting them is much cheaper than
+# walking the whole index. The planner only knows the average size of a
+# category or tag, so filters that match many snippets are steered to the
+# sort index with ``reads_sort_index`` and ``unindexed``.
+SORTS: Dict[str, SortOrder] = {
+    "updated": SortOrder(Snippet.updated_at, True),
+    "created": SortOrder(Snippet.created_at, True),
+    "title": SortOrder(Snippet.title, False, "NOCASE"),
+    "usage": SortOrder(Snippet.access_count, True),
+}
+
+DEFAULT_SORT = "updated"
+
+
+def _sort_value(snippet: Snippet, sort: str) -> Any:
+    if sort == "updated":
+        return snippet.updated_at.isoformat()
+    if sort == "created":
+        return snippet.created_at.isoformat()
+    if sort == "title":
+        return snippet.title
+    return snippet.access_count
+
+
+def encode_cursor(snippet: Snippet, sort: str) -> str:
+    """Encode the position after ``snippet`` in a sort order."""
+    payload = json.dumps(
+        {"sort": sort, "key": [_sort_value(snippet, sort), snippet.id]},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """Decode a cursor into the sort key and ID of the last snippet seen.
+
+    Raises:
+        BadRequestError: If the cursor is malformed or from another sort order
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        value, snippet_id = payload["key"]
+        if payload["sort"] != sort or not isinstance(snippet_id, str):
+            raise ValueError(payload["sort"])
+        if sort in ("updated", "created"):
+            value = datetime.fromisoformat(value)
+        elif sort == "title" and not isinstance(value, str):
+            raise ValueError(value)
+        elif sort == "usage" and not isinstance(value, int):
+            raise ValueError(value)
+    except (binascii.Error, KeyError, TypeError, UnicodeError, ValueError):
+        raise BadRequestError("Invalid cursor", {"cursor": cursor})
+    return [value, snippet_id]
+
+
+def reads_sort_index(matching: int, total: int, page_end: int) -> bool:
+    """Whether a filtered page is cheaper read in the order of the sort index.
+
+    Walking the index reads about ``page_end * total / matching`` rows to
+    fill the page; reading the matches first reads all of them and sorts
+    them in a temporary B-tree. The walk wins once ``matching`` exceeds
+    about ``sqrt(page_end * total)``, which also bounds the number of rows
+    ever sorted in memory.
+
+    Args:
+        matching: Live snippets the filter matches
+        total: All live snippets
+        page_end: Offset plus limit of the page
+    """
+    return matching * matching > page_end * total
+
+
+def unindexed(column: ColumnElement) -> ColumnElement:
+    """Hide a column from SQLite's index choice with a unary ``+``.
+
+    A filter on the result cannot drive the query, so the sort index does.
+    """
+    return UnaryExpression(column, operator=operators.custom_op("+"), type_=column.type)
+
+
+def order_snippets(
+    query: Query, sort: str = DEFAULT_SORT, cursor: Optional[str] = None
+) -> Query:
+    """Order a snippet query, optionally starting after a cursor.
+
+    The query must filter on ``Snippet.is_deleted`` for SQLite to be able to
+    read it in the order of the sort index.
+
+    Args:
+        query: Snippet query
+        sort: One of ``SORTS``
+        cursor: ``next_cursor`` of the previous page
+
+    Returns:
+        Ordered query
+
+    Raises:
+        BadRequestError: If the sort order or the cursor is invalid
+    """
+    if sort not in SORTS:
+        raise BadRequestError(f"Unknown sort order '{sort}'", {"sorts": sorted(SORTS)})
+    order = SORTS[sort]
+    key = order.collated(order.column)
+
+    if cursor:
+        value, snippet_id = decode_cursor(cursor, sort)
+        # SQLite only searches the index by a row value if the collation is
+        # on the right-hand side
+        position = tuple_(order.column, Snippet.id)
+        after = tuple_(
+            order.collated(literal(value, order.column.type)),
+            literal(snippet_id, Snippet.id.type),
+        )
+        query = query.filter(position < after if order.descending else position > after)
+
+    if order.descending:
+        query = query.order_by(key.desc(), Snippet.id.desc())
+    else:
+        query = query.order_by(key, Snippet.id)
+    return query
+
+
+def next_cursor(snippets: List[Snippet], sort: str, limit: int) -> Optional[str]:
+    """Get the cursor of the page after ``snippets``, None on the last page."""
+    if len(snippets) < limit:
+        return None
+    return encode_cursor(snippets[-1], sort)
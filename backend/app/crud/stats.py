@@ -0,0 +1,278 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import Select, and_, func, or_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models import Category, CodeBlob, Snippet, SnippetStat, Tag, snippet_tag
+
+# Counters a snippet contributes to, keyed by (dimension, key)
+Footprint = Dict[Tuple[str, str], int]
+
+# Dimensions counting writes per day, keyed by ISO date
+ACTIVITY = ("created", "updated", "deleted")
+
+# Dimensions holding one overall counter
+TOTALS = ("total", "favorites", "recycle_bin", "code_bytes")
+
+
+def _code_size(snippet: Snippet) -> int:
+    blob = snippet.blob
+    if blob is not None and blob.hash == snippet.code_hash:
+        return blob.size
+    return len((snippet.code or "").encode("utf-8"))
+
+
+def snippet_footprint(snippet: Snippet) -> Footprint:
+    """Capture the counters a snippet adds to in its current state.
+
+    Take one before and one after a write and pass both to
+    ``snippet_changed``; the difference is applied to the counters.
+    """
+    if snippet.is_deleted:
+        return {("recycle_bin", ""): 1}
+    footprint = {
+        ("total", ""): 1,
+        ("code_bytes", ""): _code_size(snippet),
+        ("language", snippet.language): 1,
+        ("category", snippet.category_id or ""): 1,
+    }
+    if snippet.is_favorite:
+        footprint[("favorites", "")] = 1
+    for tag in snippet.tags:
+        footprint[("tag", tag.id)] = 1
+    return footprint
+
+
+def _add(db: Session, deltas: Dict[Tuple[str, str], int]) -> None:
+    rows = [
+        {"dimension": dimension, "key": key, "value": value}
+        for (dimension, key), value in deltas.items()
+        if value
+    ]
+    if not rows:
+        return
+    statement = insert(SnippetStat).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[SnippetStat.dimension, SnippetStat.key],
+            set_={"value": SnippetStat.value + statement.excluded.value},
+        )
+    )
+
+
+def snippet_changed(
+    db: Session,
+    before: Optional[Footprint],
+    after: Optional[Footprint],
+    activity: Optional[str] = None,
+) -> None:
+    """Apply a snippet write to the counters, without committing.
+
+    Args:
+        db: Database session
+        before: Footprint before the write, None for a new snippet
+        after: Footprint after the write, None for a removed snippet
+        activity: One of ``ACTIVITY`` to count the write for today
+    """
+    deltas = Counter(after or {})
+    deltas.subtract(before or {})
+    if activity is not None:
+        deltas[(activity, datetime.utcnow().date().isoformat())] += 1
+    _add(db, deltas)
+
+
+def tag_deleted(db: Session, tag_id: str) -> None:
+    """Drop the counter of a tag that is being deleted, without committing."""
+    db.query(SnippetStat).filter(
+        SnippetStat.dimension == "tag", SnippetStat.key == tag_id
+    ).delete(synchronize_session=False)
+
+
+def category_deleted(db: Session, category_id: str) -> None:
+    """Count the snippets of a deleted category as uncategorized, without committing."""
+    stats = db.query(SnippetStat).filter(
+        SnippetStat.dimension == "category", SnippetStat.key == category_id
+    )
+    count = stats.with_entities(SnippetStat.value).scalar()
+    if count is None:
+        return
+    stats.delete(synchronize_session=False)
+    _add(db, {("category", ""): count})
+
+
+def rebuild_stats(db: Session) -> None:
+    """Recompute every counter from the tables, without committing.
+
+    Only needed for databases written without the CRUD functions, e.g. by
+    ``scripts/generate_data.py``. Past updates and deletions are not
+    recorded anywhere else, so their activity history starts empty.
+    """
+    live = Snippet.is_deleted == False
+    deltas: Counter = Counter()
+
+    deltas[("total", "")] = db.query(func.count(Snippet.id)).filter(live).scalar()
+    deltas[("recycle_bin", "")] = (
+        db.query(func.count(Snippet.id)).filter(Snippet.is_deleted == True).scalar()
+    )
+    deltas[("favorites", "")] = (
+        db.query(func.count(Snippet.id))
+        .filter(live, Snippet.is_favorite == True)
+        .scalar()
+    )
+    deltas[("code_bytes", "")] = (
+        db.query(func.coalesce(func.sum(CodeBlob.size), 0))
+        .join(Snippet, Snippet.code_hash == CodeBlob.hash)
+        .filter(live)
+        .scalar()
+    )
+    for language, count in (
+        db.query(Snippet.language, func.count(Snippet.id))
+        .filter(live)
+        .group_by(Snippet.language)
+    ):
+        deltas[("language", language)] = count
+    for category_id, count in (
+        db.query(func.coalesce(Snippet.category_id, ""), func.count(Snippet.id))
+        .filter(live)
+        .group_by(Snippet.category_id)
+    ):
+        deltas[("category", category_id)] = count
+    for tag_id, count in (
+        db.query(snippet_tag.c.tag_id, func.count(Snippet.id))
+        .join(Snippet, Snippet.id == snippet_tag.c.snippet_id)
+        .filter(live)
+        .group_by(snippet_tag.c.tag_id)
+    ):
+        deltas[("tag", tag_id)] = count
+    for day, count in db.query(
+        func.date(Snippet.created_at), func.count(Snippet.id)
+    ).group_by(func.date(Snippet.created_at)):
+        if day is not None:
+            deltas[("created", day)] = count
+
+    db.query(SnippetStat).delete(synchronize_session=False)
+    _add(db, deltas)
+
+
+def ensure_stats(db: Session) -> None:
+    """Build the counters of a database that has snippets but none yet."""
+    if db.query(SnippetStat.dimension).first() is not None:
+        return
+    if db.query(Snippet.id).first() is None:
+        return
+    rebuild_stats(db)
+    db.commit()
+
+
+def _largest(counts: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+    ranked = sorted(
+        ((key, count) for key, count in counts.items() if count > 0),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return ranked[:limit]
+
+
+def _buckets(
+    ranked: List[Tuple[str, int]], labels: Dict[str, str], by_label: bool = False
+) -> List[Dict[str, Any]]:
+    buckets = []
+    for key, count in ranked:
+        label = labels.get(key, key)
+        buckets.append(
+            {"value": label if by_label else key, "label": label, "count": count}
+        )
+    return buckets
+
+
+def count_live_snippets(
+    db: Session, dimension: str, keys: Union[List[str], Select]
+) -> Tuple[int, int]:
+    """Count the live snippets under some counters, and all live snippets.
+
+    Args:
+        db: Database session
+        dimension: Counter dimension, e.g. ``"category"`` or ``"tag"``
+        keys: Counter keys, or a query selecting them
+
+    Returns:
+        ``(matching, total)``; a snippet under several keys, such as a
+        snippet with two of the tags, is counted once per key
+    """
+    matching = and_(SnippetStat.dimension == dimension, SnippetStat.key.in_(keys))
+    is_total = and_(SnippetStat.dimension == "total", SnippetStat.key == "")
+    row = (
+        db.query(
+            func.coalesce(func.sum(SnippetStat.value).filter(matching), 0),
+            func.coalesce(func.sum(SnippetStat.value).filter(is_total), 0),
+        )
+        .filter(or_(matching, is_total))
+        .one()
+    )
+    return int(row[0]), int(row[1])
+
+
+def get_stats(db: Session, days: int = 30, limit: int = 20) -> Dict[str, Any]:
+    """Get the dashboard statistics from the precomputed counters.
+
+    Args:
+        db: Database session
+        days: Number of days of activity history, ending today
+        limit: Maximum number of languages, categories and tags
+
+    Returns:
+        Totals, the largest language, category and tag buckets, and the
+        number of snippets created, updated and deleted per day
+    """
+    today = datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+    rows = db.query(SnippetStat.dimension, SnippetStat.key, SnippetStat.value).filter(
+        or_(
+            SnippetStat.dimension.notin_(ACTIVITY),
+            SnippetStat.key >= first_day.isoformat(),
+        )
+    )
+
+    totals = dict.fromkeys(TOTALS, 0)
+    groups: Dict[str, Dict[str, int]] = {
+        "language": {},
+        "category": {},
+        "tag": {},
+        **{kind: {} for kind in ACTIVITY},
+    }
+    for dimension, key, value in rows:
+        if dimension in totals:
+            totals[dimension] = value
+        elif dimension in groups:
+            groups[dimension][key] = value
+
+    # Only the buckets returned need their names
+    categories = _largest(groups["category"], limit)
+    category_labels = dict(
+        db.query(Category.id, Category.name).filter(
+            Category.id.in_([key for key, _ in categories])
+        )
+    )
+    category_labels[""] = "Uncategorized"
+    tags = _largest(groups["tag"], limit)
+    tag_labels = dict(
+        db.query(Tag.id, Tag.name).filter(Tag.id.in_([key for key, _ in tags]))
+    )
+
+    activity = []
+    for offset in range(days):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        activity.append(
+            {"day": day, **{kind: groups[kind].get(day, 0) for kind in ACTIVITY}}
+        )
+
+    return {
+        **totals,
+        "languages": _buckets(_largest(groups["language"], limit), {}),
+        "categories": _buckets(categories, category_labels),
+        # Tags are filtered by name, like the facets of GET /api/snippets
+        "tags": _buckets(tags, tag_labels, by_label=True),
+        "activity": activity,
+    }
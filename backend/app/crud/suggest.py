@@ -0,0 +1,143 @@
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Snippet, Tag, snippet_tag
+from app.utils.prefix_index import PrefixIndex
+
+# Title and tag names of a live snippet; None for deleted or missing snippets
+SnippetTerms = Optional[Tuple[str, Sequence[str]]]
+
+# Tags stay suggestable while unused; titles disappear with their last snippet
+_tag_index = PrefixIndex(keep_empty=True)
+_title_index = PrefixIndex()
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def _ensure_loaded(db: Session) -> None:
+    """Build both indexes from the database on first use."""
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+
+        tag_counts = (
+            db.query(Tag.name, func.count(Snippet.id))
+            .outerjoin(snippet_tag, snippet_tag.c.tag_id == Tag.id)
+            .outerjoin(
+                Snippet,
+                (Snippet.id == snippet_tag.c.snippet_id)
+                & (Snippet.is_deleted == False),
+            )
+            .group_by(Tag.id)
+            .all()
+        )
+        title_counts = (
+            db.query(Snippet.title, func.count(Snippet.id))
+            .filter(Snippet.is_deleted == False)
+            .group_by(Snippet.title)
+            .all()
+        )
+
+        for name, count in tag_counts:
+            _tag_index.set(name, count)
+        for title, count in title_counts:
+            _title_index.set(title, count)
+        _loaded = True
+
+
+def reset_suggestions() -> None:
+    """Drop both indexes; they are rebuilt from the database on next use."""
+    global _loaded
+    with _load_lock:
+        _tag_index.clear()
+        _title_index.clear()
+        _loaded = False
+
+
+def suggest_tags(db: Session, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+    """Suggest tag names starting with a prefix.
+
+    Args:
+        db: Database session, only used to build the index on first use
+        prefix: Case-insensitive name prefix
+        limit: Maximum number of suggestions
+
+    Returns:
+        ``(name, snippet_count)`` pairs, most used first
+    """
+    _ensure_loaded(db)
+    return _tag_index.suggest(prefix, limit)
+
+
+def suggest_titles(db: Session, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+    """Suggest snippet titles starting with a prefix.
+
+    Args:
+        db: Database session, only used to build the index on first use
+        prefix: Case-insensitive title prefix
+        limit: Maximum number of suggestions
+
+    Returns:
+        ``(title, snippet_count)`` pairs, most used first
+    """
+    _ensure_loaded(db)
+    return _title_index.suggest(prefix, limit)
+
+
+def snippet_terms(snippet: Snippet) -> SnippetTerms:
+    """Capture the indexed terms of a snippet before or after a write.
+
+    Args:
+        snippet: Snippet model
+
+    Returns:
+        Title and tag names, or None if the snippet is in the recycle bin
+    """
+    if snippet.is_deleted:
+        return None
+    return snippet.title, [tag.name for tag in snippet.tags]
+
+
+def snippet_changed(before: SnippetTerms, after: SnippetTerms) -> None:
+    """Apply a committed snippet write to the indexes.
+
+    Args:
+        before: Terms of the snippet before the write
+        after: Terms of the snippet after the write
+    """
+    if not _loaded or before == after:
+        return
+    if before is not None:
+        _title_index.add(before[0], -1)
+        for name in before[1]:
+            _tag_index.add(name, -1)
+    if after is not None:
+        _title_index.add(after[0], 1)
+        for name in after[1]:
+            _tag_index.add(name, 1)
+
+
+def tag_created(name: str) -> None:
+    """Add a committed new tag to the index."""
+    if _loaded and name not in _tag_index:
+        _tag_index.set(name, 0)
+
+
+def tag_renamed(old_name: str, new_name: str) -> None:
+    """Move the usage count of a committed tag rename."""
+    if _loaded and old_name != new_name:
+        count = _tag_index.weight(old_name)
+        _tag_index.remove(old_name)
+        _tag_index.set(new_name, count)
+
+
+def tag_deleted(name: str) -> None:
+    """Remove a committed tag deletion from the index."""
+    if _loaded:
+        _tag_index.remove(name)
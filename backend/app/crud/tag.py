@@ -1,13 +1,26 @@
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, exists, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.elements import ColumnElement
 
+from app.crud import stats
+from app.crud.sorting import DEFAULT_SORT, order_snippets, reads_sort_index
+from app.crud.suggest import tag_created, tag_deleted, tag_renamed
 from app.models import Tag, Snippet, snippet_tag
+from app.models.change import log_change
 from app.schemas.tag import TagCreate, TagUpdate
 from app.utils.error_handling import NotFoundError, ConflictError
 
 
+def _log_tagged_snippets(db: Session, tag_id: str) -> None:
+    """Log the snippets whose tag names change with a tag rename or delete."""
+    rows = db.query(snippet_tag.c.snippet_id).filter(snippet_tag.c.tag_id == tag_id)
+    for (snippet_id,) in rows:
+        log_change(db, "snippet", snippet_id)
+
+
 def get_tags(db: Session, skip: int = 0, limit: int = 100) -> List[Tag]:
     """Get all tags.
 
@@ -24,15 +37,19 @@ def get_tags(db: Session, skip: int = 0, limit: int = 100) -> List[Tag]:
     # 获取所有标签
     tags = db.query(Tag).offset(skip).limit(limit).all()
     
-    # 为每个标签计算代码片段数量
+    # 用一个分组查询计算本页标签的代码片段数量
+    snippet_counts = dict(
+        db.query(snippet_tag.c.tag_id, func.count(Snippet.id))
+        .join(Snippet, Snippet.id == snippet_tag.c.snippet_id)
+        .filter(
+            snippet_tag.c.tag_id.in_([tag.id for tag in tags]),
+            Snippet.is_deleted == False,
+        )
+        .group_by(snippet_tag.c.tag_id)
+        .all()
+    )
     for tag in tags:
-        snippet_count = db.query(func.count(Snippet.id)).join(
-            snippet_tag, Snippet.id == snippet_tag.c.snippet_id
-        ).filter(
-            snippet_tag.c.tag_id == tag.id,
-            Snippet.is_deleted == False
-        ).scalar()
-        setattr(tag, "snippet_count", snippet_count or 0)
+        setattr(tag, "snippet_count", snippet_counts.get(tag.id, 0))
     
     return tags
 
@@ -107,6 +124,7 @@ def create_tag(db: Session, tag_data: TagCreate) -> Tag:
     db.add(tag)
     db.commit()
     db.refresh(tag)
+    tag_created(tag.name)
     return tag
 
 
@@ -133,9 +151,13 @@ def update_tag(db: Session, tag_id: str, tag_data: TagUpdate) -> Tag:
         if existing_tag:
             raise ConflictError(f"Tag with name '{tag_data.name}' already exists")
 
+    old_name = tag.name
+    if tag_data.name != old_name:
+        _log_tagged_snippets(db, tag.id)
     tag.name = tag_data.name
     db.commit()
     db.refresh(tag)
+    tag_renamed(old_name, tag.name)
     return tag
 
 
@@ -153,13 +175,52 @@ def delete_tag(db: Session, tag_id: str) -> bool:
         NotFoundError: If tag not found
     """
     tag = get_tag(db, tag_id)
+    name = tag.name
+    _log_tagged_snippets(db, tag.id)
+    stats.tag_deleted(db, tag.id)
     db.delete(tag)
     db.commit()
+    tag_deleted(name)
     return True
 
 
+def tag_filter(
+    db: Session, tag_ids: Union[List[str], Select], page_end: Optional[int] = None
+) -> ColumnElement:
+    """Filter snippets by tag, for a query ordered by a sort index.
+
+    A membership test rather than a join, so no snippet is listed twice.
+    The planner only knows the average size of a tag, so a tag on many
+    snippets is probed once per row read from the sort index; a rare one
+    drives the query with its posting list, which is then sorted.
+
+    Args:
+        db: Database session
+        tag_ids: Tag IDs, or a query selecting them; any of them matches
+        page_end: Offset plus limit of the page; None if the query is not
+            paginated, so the posting list drives it
+
+    Returns:
+        Filter on ``Snippet``
+    """
+    if page_end is not None and reads_sort_index(
+        *stats.count_live_snippets(db, "tag", tag_ids), page_end
+    ):
+        return exists().where(
+            snippet_tag.c.snippet_id == Snippet.id, snippet_tag.c.tag_id.in_(tag_ids)
+        )
+    return Snippet.id.in_(
+        select(snippet_tag.c.snippet_id).where(snippet_tag.c.tag_id.in_(tag_ids))
+    )
+
+
 def get_snippets_by_tag(
-    db: Session, tag_id: str, skip: int = 0, limit: int = 100
+    db: Session,
+    tag_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
 ) -> List[Snippet]:
     """Get snippets by tag.
 
@@ -168,20 +229,26 @@ def get_snippets_by_tag(
         tag_id: Tag ID
         skip: Number of records to skip
         limit: Maximum number of records to return
+        sort: Sort order, one of ``app.crud.sorting.SORTS``
+        cursor: Continue after this cursor from the previous page
 
     Returns:
         List of snippets with the tag
 
     Raises:
         NotFoundError: If tag not found
+        BadRequestError: If the sort order or cursor is invalid
     """
-    # Verify tag exists
-    get_tag(db, tag_id)
+    # Verify tag exists, without counting its snippets
+    if db.query(Tag.id).filter(Tag.id == tag_id).first() is None:
+        raise NotFoundError("tag", tag_id)
 
+    query = db.query(Snippet).filter(
+        tag_filter(db, [tag_id], skip + limit), Snippet.is_deleted == False
+    )
     return (
-        db.query(Snippet)
-        .join(snippet_tag, Snippet.id == snippet_tag.c.snippet_id)
-        .filter(snippet_tag.c.tag_id == tag_id, Snippet.is_deleted == False)
+        order_snippets(query, sort, cursor)
+        .options(selectinload(Snippet.tags))
         .offset(skip)
         .limit(limit)
         .all()
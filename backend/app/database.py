@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine
+import logging
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateColumn
 
 from app.config import settings
 
@@ -16,14 +20,24 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+logger = logging.getLogger("app.database")
+
 
-def get_db() -> Session:
+def get_db(request: Request) -> Session:
     """
     Dependency for getting database session.
 
+    Sub-requests of ``POST /api/batch`` reuse the session of the batch, which
+    it passes in the request state.
+
     Yields:
         Session: Database session
     """
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -31,6 +45,52 @@ def get_db() -> Session:
         db.close()
 
 
+def upgrade_schema(bind: Engine) -> None:
+    """Add the columns and indexes of the models that an existing database lacks.
+
+    ``create_all`` skips tables that already exist, with their columns and
+    indexes. Only columns that are nullable or have a server default can be
+    added this way; required columns without one, such as
+    ``snippets.code_hash``, need a migration script to fill them in, and are
+    skipped along with their indexes until it has run. When an index is
+    built, or the database has never been analyzed, ANALYZE gathers the
+    statistics the query planner picks indexes by.
+    """
+    inspector = inspect(bind)
+    analyze = not inspector.has_table("sqlite_stat1")
+    with bind.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for table in Base.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    logger.warning(
+                        "Column %s.%s is missing; run its migration script",
+                        table.name,
+                        column.name,
+                    )
+                    continue
+                definition = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {definition}"
+                )
+                columns.add(column.name)
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in indexes:
+                    continue
+                if not all(column.name in columns for column in index.columns):
+                    continue
+                index.create(bind=conn)
+                analyze = True
+        if analyze:
+            conn.exec_driver_sql("ANALYZE")
+
+
 def create_tables() -> None:
-    """Create all tables in the database."""
+    """Create all tables in the database and upgrade existing ones."""
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
@@ -4,8 +4,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api import api_router
+from app.api.endpoints import metrics
 from app.config import settings
-from app.database import create_tables
+from app.crud import stats as stats_crud
+from app.database import SessionLocal, create_tables, engine
+from app.utils.instrumentation import RequestMetricsMiddleware, instrument_engine
+from app.utils.metrics import MetricsMiddleware, observe_engine
+from app.utils.profiler import ProfilerMiddleware
+from app.utils.slow_queries import watch_slow_queries
 
 
 # Create FastAPI app
@@ -24,6 +30,25 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
+# Report query counts and timings per request
+if settings.REQUEST_METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(RequestMetricsMiddleware)
+
+# Keep recent slow queries with their plans
+if settings.SLOW_QUERY_THRESHOLD_MS is not None:
+    watch_slow_queries(engine)
+
+# Profile single requests on demand while debugging
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Export Prometheus metrics; added last so it also times the other middleware
+if settings.METRICS_ENABLED:
+    observe_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -45,6 +70,8 @@ async def generic_exception_handler(request, exc):
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    with SessionLocal() as db:
+        stats_crud.ensure_stats(db)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,22 @@
+from app.models.blob import CodeBlob, CodeDictionary
 from app.models.snippet import Snippet, snippet_tag
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.collection import Collection, collection_snippet
+from app.models.revision import SnippetRevision
+from app.models.change import Change
+from app.models.stats import SnippetStat
 
 __all__ = [
+    "CodeBlob",
+    "CodeDictionary",
     "Snippet",
     "Category",
     "Tag",
     "Collection",
+    "SnippetRevision",
+    "Change",
+    "SnippetStat",
     "snippet_tag",
     "collection_snippet",
 ]
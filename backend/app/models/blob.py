@@ -0,0 +1,312 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    and_,
+    delete,
+    event,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    UOWTransaction,
+    attributes,
+    declared_attr,
+    deferred,
+    relationship,
+)
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import ScalarSelect
+
+from app.config import settings
+from app.database import Base
+from app.utils.compression import compress, decompress, train_dictionary
+
+# Samples needed before a language gets its own compression dictionary
+_MIN_TRAINING_SAMPLES = 4
+_MAX_TRAINING_SAMPLES = 64
+
+
+def hash_code(code: str) -> str:
+    """Content address of a code body."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class CodeDictionary(Base):
+    """zlib preset dictionary trained on the code of one language."""
+
+    __tablename__ = "code_dictionaries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    language = Column(String, nullable=False, index=True)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CodeBlob(Base):
+    """Content-addressed code body shared by every row that references it.
+
+    Bodies up to ``CODE_COMPRESSION_THRESHOLD`` bytes are kept as text in
+    ``code``; larger ones are deflated into ``data``, against the dictionary
+    of their language when there is one. ``data`` is only read when a body
+    is inflated, so loading blobs for a list of rows stays cheap.
+    """
+
+    __tablename__ = "code_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    code = Column(Text, nullable=True)
+    data = deferred(Column(LargeBinary, nullable=True))
+    dictionary_id = Column(Integer, ForeignKey("code_dictionaries.id"), nullable=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    dictionary = relationship(CodeDictionary)
+
+    @property
+    def text(self) -> str:
+        """The code body, inflated on first access."""
+        if self.code is not None:
+            return self.code
+        # The body behind a hash never changes, so the inflated text can be kept
+        text = self.__dict__.get("_text")
+        if text is None:
+            dictionary = self.dictionary.data if self.dictionary is not None else None
+            text = decompress(self.data, dictionary)
+            self.__dict__["_text"] = text
+        return text
+
+
+class BlobReference:
+    """Mixin for models whose ``code_hash`` column points at a ``CodeBlob``.
+
+    Assigning ``code`` only records the new content address; the referenced
+    blob is created or its reference count adjusted when the session flushes,
+    in the same transaction as the row itself. Reference counts are changed
+    in SQL, so concurrent sessions neither lose updates nor collide on new
+    blobs.
+    """
+
+    @declared_attr
+    def blob(cls) -> Mapped[CodeBlob]:
+        return relationship(CodeBlob, lazy="selectin")
+
+    @hybrid_property
+    def code(self) -> Optional[str]:
+        pending = self.__dict__.get("_pending_code")
+        if pending is not None:
+            return pending
+        return self.blob.text if self.blob is not None else None
+
+    @property
+    def code_preview(self) -> Optional[str]:
+        """The code body if it is stored as text, None if it is compressed.
+
+        Never inflates, so lists can read it for every row.
+        """
+        pending = self.__dict__.get("_pending_code")
+        if pending is not None:
+            return pending
+        return self.blob.code if self.blob is not None else None
+
+    @code.inplace.setter
+    def _code_setter(self, value: str) -> None:
+        self.__dict__["_pending_code"] = value
+        self.code_hash = hash_code(value)
+
+    @code.inplace.expression
+    @classmethod
+    def _code_expression(cls) -> ScalarSelect[Optional[str]]:
+        return (
+            select(
+                func.coalesce(
+                    CodeBlob.code, func.code_inflate(CodeBlob.data, CodeDictionary.data)
+                )
+            )
+            .outerjoin(CodeDictionary, CodeDictionary.id == CodeBlob.dictionary_id)
+            .where(CodeBlob.hash == cls.code_hash)
+            .scalar_subquery()
+        )
+
+    @classmethod
+    def code_contains(cls, text: str) -> ColumnElement[bool]:
+        """Case-insensitive substring match on the code body.
+
+        Bodies stored as text are matched directly; compressed ones are only
+        inflated when they are at least as long as ``text``.
+        """
+        pattern = f"%{text}%"
+        inflated = func.code_inflate(CodeBlob.data, CodeDictionary.data)
+        return (
+            select(CodeBlob.hash)
+            .outerjoin(CodeDictionary, CodeDictionary.id == CodeBlob.dictionary_id)
+            .where(
+                CodeBlob.hash == cls.code_hash,
+                or_(
+                    CodeBlob.code.ilike(pattern),
+                    and_(
+                        CodeBlob.code.is_(None),
+                        CodeBlob.size >= len(text.encode("utf-8")),
+                        inflated.ilike(pattern),
+                    ),
+                ),
+            )
+            .exists()
+        )
+
+
+def _language_dictionary(
+    session: Session, obj: BlobReference
+) -> Optional[Tuple[int, bytes]]:
+    """ID and data of the latest dictionary of an object's language.
+
+    The dictionary is trained and stored on first need.
+    """
+    language = getattr(obj, "language", None)
+    if not language:
+        return None
+    dictionary = (
+        session.query(CodeDictionary.id, CodeDictionary.data)
+        .filter(CodeDictionary.language == language)
+        .order_by(CodeDictionary.id.desc())
+        .first()
+    )
+    if dictionary is not None:
+        return dictionary.id, dictionary.data
+
+    model = type(obj)
+    samples = [
+        code
+        for (code,) in session.query(model.code)
+        .filter(model.language == language)
+        .limit(_MAX_TRAINING_SAMPLES)
+    ]
+    if len(samples) < _MIN_TRAINING_SAMPLES:
+        return None
+    data = train_dictionary(samples)
+    if not data:
+        return None
+    result = session.execute(
+        insert(CodeDictionary).values(
+            language=language, data=data, created_at=datetime.utcnow()
+        )
+    )
+    return result.inserted_primary_key[0], data
+
+
+def _blob_values(session: Session, obj: BlobReference, code: str) -> Dict[str, Any]:
+    size = len(code.encode("utf-8"))
+    values: Dict[str, Any] = {"hash": obj.code_hash, "size": size, "code": code}
+    if size <= settings.CODE_COMPRESSION_THRESHOLD:
+        return values
+
+    dictionary = _language_dictionary(session, obj)
+    data = compress(code, dictionary[1] if dictionary is not None else None)
+    if len(data) >= size:
+        return values
+    values.update(
+        code=None,
+        data=data,
+        dictionary_id=dictionary[0] if dictionary is not None else None,
+    )
+    return values
+
+
+def _acquire(session: Session, obj: BlobReference) -> None:
+    code = obj.__dict__.pop("_pending_code", None)
+    code_hash = obj.code_hash
+    result = session.execute(
+        update(CodeBlob)
+        .where(CodeBlob.hash == code_hash)
+        .values(ref_count=CodeBlob.ref_count + 1)
+    )
+    if result.rowcount == 0:
+        if code is None:
+            return
+        # Another session may insert the same body first; count it then
+        statement = insert(CodeBlob).values(
+            **_blob_values(session, obj, code), ref_count=1
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[CodeBlob.hash],
+                set_={"ref_count": CodeBlob.ref_count + 1},
+            )
+        )
+    blob = session.get(CodeBlob, code_hash, populate_existing=True)
+    if blob is not None and code is not None:
+        blob.__dict__["_text"] = code
+    obj.blob = blob
+
+
+def _release(session: Session, code_hash: str) -> None:
+    session.execute(
+        update(CodeBlob)
+        .where(CodeBlob.hash == code_hash)
+        .values(ref_count=CodeBlob.ref_count - 1)
+    )
+    session.execute(
+        delete(CodeBlob).where(CodeBlob.hash == code_hash, CodeBlob.ref_count <= 0)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _count_blob_references(
+    session: Session,
+    flush_context: UOWTransaction,
+    instances: Optional[Sequence[Any]],
+) -> None:
+    """Keep ``CodeBlob.ref_count`` in step with the rows referencing it."""
+    for obj in list(session.new):
+        if isinstance(obj, BlobReference) and obj.code_hash is not None:
+            _acquire(session, obj)
+
+    for obj in list(session.dirty):
+        if not isinstance(obj, BlobReference):
+            continue
+        history = attributes.get_history(obj, "code_hash")
+        if not history.has_changes():
+            obj.__dict__.pop("_pending_code", None)
+            continue
+        for old_hash in history.deleted:
+            if old_hash is not None:
+                _release(session, old_hash)
+        _acquire(session, obj)
+
+    for obj in list(session.deleted):
+        if isinstance(obj, BlobReference):
+            history = attributes.get_history(obj, "code_hash")
+            for old_hash in history.unchanged or history.deleted:
+                if old_hash is not None:
+                    _release(session, old_hash)
+
+
+def _inflate(data: Optional[bytes], dictionary: Optional[bytes]) -> Optional[str]:
+    return decompress(data, dictionary) if data is not None else None
+
+
+@event.listens_for(Engine, "connect")
+def _register_code_functions(
+    dbapi_connection: DBAPIConnection, connection_record: ConnectionPoolEntry
+) -> None:
+    """Let SQL read compressed bodies, e.g. for code search filters."""
+    create_function = getattr(dbapi_connection, "create_function", None)
+    if create_function is not None:
+        create_function("code_inflate", 2, _inflate, deterministic=True)
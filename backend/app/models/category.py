@@ -15,7 +15,7 @@ class Category(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    parent_id = Column(String, ForeignKey("categories.id"), nullable=True)
+    parent_id = Column(String, ForeignKey("categories.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
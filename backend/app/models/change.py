@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, Set, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, String, event, inspect
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.database import Base
+from app.models.category import Category
+from app.models.collection import Collection
+from app.models.snippet import Snippet
+from app.models.tag import Tag
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+class Change(Base):
+    """One entry of the change feed.
+
+    ``seq`` only ever grows, so clients can resume from the last one they saw.
+    Membership of a snippet in a collection is logged as its own entity,
+    ``collection_snippet``, with ``"<collection_id>/<snippet_id>"`` as ID.
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    op = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Logged models, and the attributes whose changes do not alter their feed entry
+_TRACKED: Dict[type, Tuple[str, Set[str]]] = {
+    Snippet: ("snippet", {"category", "collections", "revisions", "blob"}),
+    Tag: ("tag", {"snippets"}),
+    Category: ("category", {"snippets", "children", "parent"}),
+    Collection: ("collection", {"snippets"}),
+}
+
+
+def log_change(session: Session, entity: str, entity_id: str, op: str = UPSERT) -> None:
+    """Log a change the ORM cannot see, such as a bulk ``Query.update``."""
+    session.add(Change(entity=entity, entity_id=entity_id, op=op))
+
+
+def _modified(obj: Any, ignored: Set[str]) -> bool:
+    return any(
+        attr.history.has_changes()
+        for attr in inspect(obj).attrs
+        if attr.key not in ignored
+    )
+
+
+def _membership_changes(
+    obj: Any, key: str, seen: Set[Tuple[str, str]]
+) -> Iterator[Tuple[str, str]]:
+    history = inspect(obj).attrs[key].history
+    for op, others in ((UPSERT, history.added), (DELETE, history.deleted)):
+        for other in others:
+            collection, snippet = (obj, other) if key == "snippets" else (other, obj)
+            entity_id = f"{collection.id}/{snippet.id}"
+            if (entity_id, op) not in seen:
+                seen.add((entity_id, op))
+                yield entity_id, op
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context: UOWTransaction) -> None:
+    """Note every tracked write; history and generated IDs are both final here."""
+    changes = session.info.setdefault("pending_changes", [])
+    memberships: Set[Tuple[str, str]] = set()
+
+    for obj in list(session.new) + list(session.dirty):
+        tracked = _TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        entity, ignored = tracked
+        if obj in session.new or _modified(obj, ignored):
+            changes.append((entity, obj.id, UPSERT))
+        if isinstance(obj, Collection):
+            key = "snippets"
+        elif isinstance(obj, Snippet):
+            key = "collections"
+        else:
+            continue
+        for entity_id, op in _membership_changes(obj, key, memberships):
+            changes.append(("collection_snippet", entity_id, op))
+
+    for obj in session.deleted:
+        tracked = _TRACKED.get(type(obj))
+        if tracked is not None:
+            changes.append((tracked[0], obj.id, DELETE))
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _log_changes(session: Session, flush_context: UOWTransaction) -> None:
+    """Add the noted changes; commit flushes them in the same transaction."""
+    for entity, entity_id, op in session.info.pop("pending_changes", []):
+        log_change(session, entity, entity_id, op)
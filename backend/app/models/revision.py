@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+from app.models.blob import BlobReference
+
+
+class SnippetRevision(BlobReference, Base):
+    """One saved version of a snippet.
+
+    Keyframes reference the full code blob through ``code_hash``; the other
+    revisions only store ``delta`` against the revision before them.
+    """
+
+    __tablename__ = "snippet_revisions"
+    __table_args__ = (UniqueConstraint("snippet_id", "number"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    snippet_id = Column(String, ForeignKey("snippets.id"), nullable=False)
+    number = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    language = Column(String, nullable=False)
+    code_hash = Column(String(64), ForeignKey("code_blobs.hash"), nullable=True)
+    delta = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    snippet = relationship("Snippet", back_populates="revisions")
+
+    @property
+    def is_keyframe(self) -> bool:
+        return self.code_hash is not None
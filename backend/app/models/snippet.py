@@ -1,10 +1,21 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Table
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models.blob import BlobReference
 
 
 # Junction table for snippet-tag relationship
@@ -13,22 +24,42 @@ snippet_tag = Table(
     Base.metadata,
     Column("snippet_id", String, ForeignKey("snippets.id"), primary_key=True),
     Column("tag_id", String, ForeignKey("tags.id"), primary_key=True),
+    # The primary key only serves lookups by snippet; tag filters need the reverse
+    Index("ix_snippet_tags_tag_id", "tag_id", "snippet_id"),
 )
 
 
-class Snippet(Base):
-    """Snippet model."""
+class Snippet(BlobReference, Base):
+    """Snippet model.
+
+    The code body lives in ``code_blobs``; the row only keeps its hash.
+    """
 
     __tablename__ = "snippets"
+    __table_args__ = (
+        # One index per sort order of snippet lists, see app.crud.sorting.SORTS
+        Index("ix_snippets_sort_updated", "is_deleted", "updated_at", "id"),
+        Index("ix_snippets_sort_created", "is_deleted", "created_at", "id"),
+        Index(
+            "ix_snippets_sort_title", "is_deleted", text("title COLLATE NOCASE"), "id"
+        ),
+        Index("ix_snippets_sort_usage", "is_deleted", "access_count", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    code = Column(String, nullable=False)
+    code_hash = Column(
+        String(64), ForeignKey("code_blobs.hash"), nullable=False, index=True
+    )
     language = Column(String, nullable=False)
-    category_id = Column(String, ForeignKey("categories.id"), nullable=True)
+    category_id = Column(
+        String, ForeignKey("categories.id"), nullable=True, index=True
+    )
     is_favorite = Column(Boolean, default=False)
     is_deleted = Column(Boolean, default=False)
+    # Times the snippet was opened, for the "most used" sort order
+    access_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -38,3 +69,9 @@ class Snippet(Base):
     collections = relationship(
         "Collection", secondary="collection_snippets", back_populates="snippets"
     )
+    revisions = relationship(
+        "SnippetRevision",
+        back_populates="snippet",
+        cascade="all, delete-orphan",
+        order_by="SnippetRevision.number",
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.database import Base
+
+
+class SnippetStat(Base):
+    """One precomputed counter of the statistics dashboard.
+
+    Counters are keyed by ``dimension`` and ``key``, e.g. ``("language",
+    "python")`` or ``("created", "2024-05-01")``, and are adjusted by the
+    CRUD write functions in the same transaction as the write itself.
+    """
+
+    __tablename__ = "snippet_stats"
+
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True, default="")
+    value = Column(BigInteger, nullable=False, default=0)
@@ -1,10 +1,19 @@
 from app.schemas.snippet import (
     Snippet,
+    SnippetSummary,
     SnippetBase,
     SnippetCreate,
     SnippetUpdate,
     SnippetResponse,
     SnippetsResponse,
+    FacetCount,
+    SnippetFacets,
+    SimilarSnippet,
+    SimilarSnippetsResponse,
+    SnippetCreateResponse,
+    DuplicateMatch,
+    DuplicateGroup,
+    DuplicateGroupsResponse,
     BatchOperation,
     SuccessResponse,
 )
@@ -15,6 +24,8 @@ from app.schemas.category import (
     CategoryUpdate,
     CategoryResponse,
     CategoriesResponse,
+    CategoryTreeNode,
+    CategoryTreeResponse,
 )
 from app.schemas.tag import (
     Tag,
@@ -32,6 +43,18 @@ from app.schemas.collection import (
     CollectionResponse,
     CollectionsResponse,
 )
+from app.schemas.suggestion import Suggestion, SuggestionsResponse
+from app.schemas.change import Change, ChangesResponse
+from app.schemas.bootstrap import BootstrapResponse
+from app.schemas.batch import SubRequest, BatchRequest, SubResponse, BatchResponse
+from app.schemas.debug import SlowQuery, SlowQueriesResponse
+from app.schemas.stats import ActivityDay, StatsResponse
+from app.schemas.revision import (
+    SnippetRevision,
+    SnippetRevisionDetail,
+    SnippetRevisionsResponse,
+    SnippetRevisionResponse,
+)
 
 __all__ = [
     # Snippet schemas
@@ -41,6 +64,14 @@ __all__ = [
     "SnippetUpdate",
     "SnippetResponse",
     "SnippetsResponse",
+    "FacetCount",
+    "SnippetFacets",
+    "SimilarSnippet",
+    "SimilarSnippetsResponse",
+    "SnippetCreateResponse",
+    "DuplicateMatch",
+    "DuplicateGroup",
+    "DuplicateGroupsResponse",
     "BatchOperation",
     "SuccessResponse",
     # Category schemas
@@ -50,6 +81,8 @@ __all__ = [
     "CategoryUpdate",
     "CategoryResponse",
     "CategoriesResponse",
+    "CategoryTreeNode",
+    "CategoryTreeResponse",
     # Tag schemas
     "Tag",
     "TagBase",
@@ -64,4 +97,28 @@ __all__ = [
     "CollectionUpdate",
     "CollectionResponse",
     "CollectionsResponse",
+    # Suggestion schemas
+    "Suggestion",
+    "SuggestionsResponse",
+    # Revision schemas
+    "SnippetRevision",
+    "SnippetRevisionDetail",
+    "SnippetRevisionsResponse",
+    "SnippetRevisionResponse",
+    # Change feed schemas
+    "Change",
+    "ChangesResponse",
+    # Bootstrap schemas
+    "BootstrapResponse",
+    # Batch schemas
+    "SubRequest",
+    "BatchRequest",
+    "SubResponse",
+    "BatchResponse",
+    # Debug schemas
+    "SlowQuery",
+    "SlowQueriesResponse",
+    # Stats schemas
+    "ActivityDay",
+    "StatsResponse",
 ]
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import Field
+
+from app.schemas.camel_model import CamelModel
+
+
+class SubRequest(CamelModel):
+    """Schema for one request inside a batch."""
+
+    method: str = "GET"
+    path: str = Field(..., description="Path below /api, e.g. /snippets/{id}")
+    query: Optional[Dict[str, Any]] = None
+    body: Optional[Any] = None
+
+
+class BatchRequest(CamelModel):
+    """Schema for a batch of API requests."""
+
+    requests: List[SubRequest] = Field(..., max_length=50)
+
+
+class SubResponse(CamelModel):
+    """Schema for the response to one request inside a batch."""
+
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(CamelModel):
+    """Schema for batch response, in request order."""
+
+    responses: List[SubResponse]
@@ -0,0 +1,17 @@
+from typing import List
+
+from app.schemas.camel_model import CamelModel
+from app.schemas.category import Category
+from app.schemas.collection import Collection
+from app.schemas.snippet import SnippetSummary
+from app.schemas.tag import Tag
+
+
+class BootstrapResponse(CamelModel):
+    """Schema for the initial UI state response."""
+
+    seq: int
+    categories: List[Category]
+    tags: List[Tag]
+    collections: List[Collection]
+    snippets: List[SnippetSummary]
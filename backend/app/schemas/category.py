@@ -43,6 +43,14 @@ class Category(CategoryBase):
         from_attributes = True
 
 
+# Schema for a node of the category tree
+class CategoryTreeNode(Category):
+    """Schema for a category with its nested subcategories."""
+
+    subtree_snippet_count: int = 0
+    children: List["CategoryTreeNode"] = []
+
+
 # Response schemas
 class CategoryResponse(CamelModel):
     """Schema for category response."""
@@ -54,3 +62,9 @@ class CategoriesResponse(CamelModel):
     """Schema for categories list response."""
 
     categories: List[Category]
+
+
+class CategoryTreeResponse(CamelModel):
+    """Schema for category tree response."""
+
+    categories: List[CategoryTreeNode]
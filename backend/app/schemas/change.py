@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional
+
+from app.schemas.camel_model import CamelModel
+
+
+class Change(CamelModel):
+    """Schema for one compacted entry of the change feed."""
+
+    seq: int
+    entity: str
+    id: str
+    op: str
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangesResponse(CamelModel):
+    """Schema for change feed response."""
+
+    changes: List[Change]
+    cursor: int
+    has_more: bool
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from app.schemas.camel_model import CamelModel
+
+
+class SlowQuery(CamelModel):
+    """Schema for one entry of the slow-query log."""
+
+    sql: str
+    parameters: Any = None
+    duration_ms: float
+    caller: str
+    plan: List[str]
+    recorded_at: datetime
+
+
+class SlowQueriesResponse(CamelModel):
+    """Schema for slow-query log response, most recent first."""
+
+    threshold_ms: Optional[float] = None
+    queries: List[SlowQuery]
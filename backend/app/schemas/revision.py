@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.schemas.camel_model import CamelModel
+
+
+class SnippetRevision(CamelModel):
+    """Schema for one saved version of a snippet."""
+
+    number: int
+    title: str
+    description: Optional[str] = None
+    language: str
+    is_keyframe: bool
+    created_at: datetime
+
+    class Config:
+        """Pydantic config."""
+
+        from_attributes = True
+
+
+class SnippetRevisionDetail(SnippetRevision):
+    """Schema for a snippet version with its reconstructed code."""
+
+    code: str
+
+
+class SnippetRevisionsResponse(CamelModel):
+    """Schema for snippet revisions list response."""
+
+    revisions: List[SnippetRevision]
+
+
+class SnippetRevisionResponse(CamelModel):
+    """Schema for single snippet revision response."""
+
+    revision: SnippetRevisionDetail
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 
 from pydantic import Field, model_validator
 
@@ -50,6 +50,7 @@ class Snippet(SnippetBase):
     id: str
     is_favorite: bool = False
     is_deleted: bool = False
+    access_count: int = 0
     created_at: datetime
     updated_at: datetime
     tags: List[str] = []
@@ -68,13 +69,37 @@ class Snippet(SnippetBase):
             if data["tags"] and hasattr(data["tags"][0], "name"):
                 data["tags"] = [tag.name for tag in data["tags"]]
         # 处理ORM模型情况（通常是从数据库查询返回的对象）
-        elif hasattr(data, "tags") and data.tags:
-            # 确保tags属性存在且非空
-            if hasattr(data.tags[0], "name"):
-                data = dict(data.__dict__)
-                data["tags"] = [tag.name for tag in data["tags"]]
+        elif hasattr(data, "code_hash"):
+            snippet = data
+            data = dict(snippet.__dict__)
+            # code is read through the blob, it is not in the instance dict
+            data.update(cls.code_fields(snippet))
+            data["tags"] = [tag.name for tag in snippet.tags]
         return data
 
+    @classmethod
+    def code_fields(cls, snippet: Any) -> Dict[str, Any]:
+        """Code fields of a Snippet model."""
+        return {"code": snippet.code}
+
+
+# Schema for returning a snippet in a list
+class SnippetSummary(Snippet):
+    """Schema for returning a snippet in a list.
+
+    Compressed code bodies are left out so a page is never inflated; for
+    those ``code`` is empty and ``code_truncated`` set, and the snippet has
+    to be fetched by ID for its code.
+    """
+
+    code_truncated: bool = False
+
+    @classmethod
+    def code_fields(cls, snippet: Any) -> Dict[str, Any]:
+        """Code fields of a Snippet model, without inflating its body."""
+        preview = snippet.code_preview
+        return {"code": preview or "", "code_truncated": preview is None}
+
 
 # Schema for batch operations
 class BatchOperation(CamelModel):
@@ -87,6 +112,30 @@ class BatchOperation(CamelModel):
     snippetIds: List[str] = Field(..., description="List of snippet IDs to operate on")
 
 
+# Schema for a similar snippet
+class SimilarSnippet(SnippetSummary):
+    """Schema for a snippet with its similarity score."""
+
+    score: float
+
+
+# Schemas for facet counts
+class FacetCount(CamelModel):
+    """Schema for one facet bucket."""
+
+    value: str
+    label: str
+    count: int
+
+
+class SnippetFacets(CamelModel):
+    """Schema for facet counts over a filtered snippet set."""
+
+    language: List[FacetCount] = []
+    category: List[FacetCount] = []
+    tag: List[FacetCount] = []
+
+
 # Response schemas
 class SnippetResponse(CamelModel):
     """Schema for snippet response."""
@@ -97,7 +146,43 @@ class SnippetResponse(CamelModel):
 class SnippetsResponse(CamelModel):
     """Schema for snippets list response."""
 
-    snippets: List[Snippet]
+    snippets: List[SnippetSummary]
+    facets: Optional[SnippetFacets] = None
+    # Pass as ``cursor`` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class DuplicateMatch(CamelModel):
+    """Schema for a near-duplicate of a snippet."""
+
+    id: str
+    title: str
+    similarity: float
+
+
+class SnippetCreateResponse(SnippetResponse):
+    """Schema for snippet creation response."""
+
+    duplicates: Optional[List[DuplicateMatch]] = None
+
+
+class DuplicateGroup(CamelModel):
+    """Schema for a group of near-duplicate snippets."""
+
+    similarity: float
+    snippets: List[SnippetSummary]
+
+
+class DuplicateGroupsResponse(CamelModel):
+    """Schema for near-duplicate report response."""
+
+    groups: List[DuplicateGroup]
+
+
+class SimilarSnippetsResponse(CamelModel):
+    """Schema for similar snippets response."""
+
+    snippets: List[SimilarSnippet]
 
 
 class SuccessResponse(CamelModel):
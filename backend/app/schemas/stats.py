@@ -0,0 +1,26 @@
+from typing import List
+
+from app.schemas.camel_model import CamelModel
+from app.schemas.snippet import FacetCount
+
+
+class ActivityDay(CamelModel):
+    """Schema for the snippet writes of one day."""
+
+    day: str
+    created: int
+    updated: int
+    deleted: int
+
+
+class StatsResponse(CamelModel):
+    """Schema for the dashboard statistics response."""
+
+    total: int
+    favorites: int
+    recycle_bin: int
+    code_bytes: int
+    languages: List[FacetCount]
+    categories: List[FacetCount]
+    tags: List[FacetCount]
+    activity: List[ActivityDay]
@@ -0,0 +1,16 @@
+from typing import List
+
+from app.schemas.camel_model import CamelModel
+
+
+class Suggestion(CamelModel):
+    """Schema for one autocomplete suggestion."""
+
+    value: str
+    count: int
+
+
+class SuggestionsResponse(CamelModel):
+    """Schema for autocomplete suggestions response."""
+
+    suggestions: List[Suggestion]
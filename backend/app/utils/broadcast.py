@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from typing import Any, Optional, Set
+
+# Queued in place of messages when a subscriber is evicted
+_EVICTED = object()
+
+
+class Subscriber:
+    """One listener of a :class:`Broadcaster` with a bounded buffer."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size + 1)
+        self._buffer_size = buffer_size
+        self.evicted = False
+
+    def offer(self, message: Any) -> None:
+        """Queue a message from any thread."""
+        if self.evicted:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(message)
+        else:
+            self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Any) -> None:
+        if self.evicted:
+            return
+        if self._queue.qsize() >= self._buffer_size:
+            # Too slow to keep up: drop the backlog and tell the reader to stop
+            self.evicted = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(_EVICTED)
+            return
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the next message.
+
+        Returns:
+            The message, or None if ``timeout`` passed without one
+
+        Raises:
+            EOFError: If the subscriber was evicted
+        """
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is _EVICTED:
+            raise EOFError("subscriber evicted")
+        return message
+
+
+class Broadcaster:
+    """Fan-out of messages to asyncio subscribers.
+
+    Publishing never blocks: each subscriber gets the same message object,
+    typically already encoded, in its own bounded queue. A subscriber whose
+    queue fills up is evicted instead of slowing everyone else down, so idle
+    connections cost one parked coroutine each.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        """Initialize the broadcaster.
+
+        Args:
+            buffer_size: Messages a subscriber may lag behind before eviction
+        """
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber on the running event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber if still registered."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, message: Any) -> None:
+        """Send a message to every subscriber, from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(message)
+            if subscriber.evicted:
+                self.unsubscribe(subscriber)
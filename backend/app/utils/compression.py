@@ -0,0 +1,62 @@
+import zlib
+from collections import Counter
+from typing import Iterable, Optional
+
+# zlib can only reference the last 32 KB of a preset dictionary
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Build a zlib preset dictionary from sample code.
+
+    Lines that recur across samples (imports, boilerplate, common statements)
+    are ranked by how many samples contain them times their length. The best
+    ones go last, because zlib encodes nearer matches with shorter distances.
+
+    Args:
+        samples: Code bodies of one language
+        size: Maximum dictionary size in bytes
+
+    Returns:
+        Dictionary bytes, empty if the samples share nothing worth keeping
+    """
+    document_frequency: Counter = Counter()
+    for sample in samples:
+        lines = {line.rstrip() + "\n" for line in sample.splitlines()}
+        document_frequency.update(line for line in lines if len(line.strip()) > 3)
+
+    ranked = sorted(
+        (
+            (count * len(line), line)
+            for line, count in document_frequency.items()
+            if count > 1
+        ),
+        reverse=True,
+    )
+    chunks = []
+    total = 0
+    for _, line in ranked:
+        encoded = line.encode("utf-8")
+        if total + len(encoded) > size:
+            break
+        chunks.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chunks))
+
+
+def compress(text: str, dictionary: Optional[bytes] = None) -> bytes:
+    """Deflate text, optionally against a preset dictionary."""
+    if dictionary:
+        compressor = zlib.compressobj(level=9, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level=9)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompress(data: bytes, dictionary: Optional[bytes] = None) -> str:
+    """Inflate data produced by :func:`compress` with the same dictionary."""
+    if dictionary:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+    else:
+        decompressor = zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
@@ -0,0 +1,48 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+
+def make_delta(old: str, new: str) -> bytes:
+    """Encode ``new`` as a line-based delta against ``old``.
+
+    The delta is a deflated JSON list of operations: ``[start, end]`` copies
+    lines ``start:end`` of the old text, a string inserts literal text.
+
+    Args:
+        old: Base text
+        new: Target text
+
+    Returns:
+        Compressed delta
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    """Rebuild the target text of a delta from its base text.
+
+    Args:
+        old: Base text the delta was made against
+        delta: Delta from :func:`make_delta`
+
+    Returns:
+        Target text
+    """
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts)
@@ -42,6 +42,7 @@ class BadRequestError(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"message": message, "details": details},
         )
+        self.message = message
 
 
 class ConflictError(HTTPException):
@@ -0,0 +1,249 @@
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, cast
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from app.config import settings
+
+logger = logging.getLogger("app.requests")
+
+
+class RequestMetrics:
+    """SQL and serialization figures collected while handling one request."""
+
+    __slots__ = (
+        "started",
+        "query_count",
+        "sql_time",
+        "rows",
+        "endpoint_done",
+        "serialize_time",
+    )
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.rows = 0
+        self.endpoint_done: Optional[float] = None
+        self.serialize_time = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """Format the figures as a ``Server-Timing`` header value."""
+        return (
+            f'sql;dur={self.sql_time * 1000:.2f};desc="{self.query_count} queries", '
+            f'rows;desc="{self.rows}", '
+            f"serialize;dur={self.serialize_time * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+# Metrics of the request being handled; copied into threadpool workers
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Get the metrics of the request being handled, if it is instrumented."""
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics() -> Iterator[RequestMetrics]:
+    """Collect query figures for the enclosed code, e.g. in benchmarks."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count queries, SQL time and rows of instrumented requests on an engine.
+
+    Safe to call more than once. Queries outside an instrumented request only
+    pay for one context variable lookup.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+class _RowCountingCursor:
+    """DB-API cursor that counts the rows fetched through it.
+
+    Rows are counted as they are fetched, so streamed results stay streamed.
+    """
+
+    __slots__ = ("_cursor", "_metrics")
+
+    def __init__(self, cursor: Any, metrics: RequestMetrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def fetchone(self) -> Any:
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._metrics.rows += 1
+        return row
+
+    def fetchmany(self, *args: Any) -> List[Any]:
+        rows: List[Any] = self._cursor.fetchmany(*args)
+        self._metrics.rows += len(rows)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        rows: List[Any] = self._cursor.fetchall()
+        self._metrics.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    metrics = _current.get()
+    if metrics is None or not conn.info.get("query_started"):
+        return
+    metrics.sql_time += time.perf_counter() - conn.info["query_started"].pop()
+    metrics.query_count += 1
+    if cursor.description is None:
+        if cursor.rowcount > 0:
+            metrics.rows += cursor.rowcount
+    elif context is not None:
+        # The result reads its rows from the context's cursor
+        context.cursor = cast(DBAPICursor, _RowCountingCursor(cursor, metrics))
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an endpoint to note when it returns, keeping it sync or async."""
+    if getattr(endpoint, "_timed", False):
+        return endpoint
+
+    def mark() -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.endpoint_done = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark()
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                mark()
+
+    setattr(wrapper, "_timed", True)
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Route that lets :class:`RequestMetricsMiddleware` time serialization.
+
+    Serialization time is measured from the endpoint returning until the
+    response starts, which covers response model validation, JSON encoding
+    and any lazy loads they trigger.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
+        if settings.REQUEST_METRICS_ENABLED:
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware reporting per-request SQL and serialization metrics.
+
+    The figures are sent as a ``Server-Timing`` header and logged to the
+    ``app.requests`` logger with one ``extra`` field per figure.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status_code = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status_code = message["status"]
+                if metrics.endpoint_done is not None:
+                    metrics.serialize_time = now - metrics.endpoint_done
+                header = metrics.server_timing(now - metrics.started)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - metrics.started
+            logger.info(
+                "%s %s %s %.1fms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                total * 1000,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(total * 1000, 2),
+                    "query_count": metrics.query_count,
+                    "sql_ms": round(metrics.sql_time * 1000, 2),
+                    "rows": metrics.rows,
+                    "serialize_ms": round(metrics.serialize_time * 1000, 2),
+                },
+            )
@@ -0,0 +1,344 @@
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS, DefaultExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor, ExceptionContext
+from sqlalchemy.pool import Pool
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow pages
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        return "".join(metric.render() for metric in self._metrics)
+
+
+registry = Registry()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Metric whose samples live in one shard per writing thread.
+
+    Each thread only ever writes its own shard, so updates take no lock and
+    never contend; rendering merges the shards.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        registry: Registry = registry,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, Any]] = []
+        self._shards_lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        shard: Dict[LabelValues, Any]
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _snapshot(self) -> List[Dict[LabelValues, Any]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+    def _header(self) -> str:
+        return (
+            f"# HELP {self.name} {self.documentation}\n"
+            f"# TYPE {self.name} {self.kind}\n"
+        )
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Get the current totals by label values."""
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> str:
+        lines = [self._header()]
+        for labels, value in sorted(self.values().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labels, labels)} "
+                f"{_format_value(value)}\n"
+            )
+        return "".join(lines)
+
+
+class Gauge(Counter):
+    """Value that goes up and down, such as requests in flight."""
+
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Registry = registry,
+    ):
+        super().__init__(name, documentation, labels, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # Per-bucket counts (last one is +Inf), then the sum of values
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def render(self) -> str:
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in self._snapshot():
+            for labels, entry in shard.items():
+                entry = list(entry)
+                total = merged.get(labels)
+                merged[labels] = (
+                    entry if total is None else [a + b for a, b in zip(total, entry)]
+                )
+
+        lines = [self._header()]
+        bounds = self.buckets + (float("inf"),)
+        for labels, entry in sorted(merged.items()):
+            cumulative: float = 0
+            for bound, count in zip(bounds, entry):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.labels + ("le",), labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}\n")
+            series = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{series} {_format_value(entry[-1])}\n")
+            lines.append(f"{self.name}_count{series} {cumulative}\n")
+        return "".join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle HTTP requests by route.",
+    ("method", "route"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "HTTP responses by route and status code.",
+    ("method", "route", "status"),
+)
+DB_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+)
+DB_LOCK_TIMEOUTS = Counter(
+    "db_lock_timeouts_total",
+    "Statements that gave up waiting for a SQLite lock.",
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count one lookup of an in-process cache."""
+    CACHE_LOOKUPS.inc((cache, "hit" if hit else "miss"))
+
+
+def observe_engine(engine: Engine) -> None:
+    """Feed pool waits, lock timeouts and statement cache hits of an engine.
+
+    Safe to call more than once.
+    """
+    if event.contains(engine, "handle_error", _count_lock_timeouts):
+        return
+    event.listen(engine, "handle_error", _count_lock_timeouts)
+    event.listen(engine, "after_cursor_execute", _count_statement_cache)
+    event.listen(engine, "engine_disposed", _time_new_pool)
+    _time_pool_checkouts(engine.pool)
+
+
+def _time_new_pool(engine: Engine) -> None:
+    # Engine.dispose() replaces the pool
+    _time_pool_checkouts(engine.pool)
+
+
+def _time_pool_checkouts(pool: Pool) -> None:
+    # The pool has no event before a checkout starts waiting, so wrap the
+    # method that waits for a free connection
+    if getattr(pool, "_checkout_timed", False):
+        return
+    do_get = pool._do_get
+
+    def timed_do_get() -> Any:
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            DB_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    setattr(pool, "_do_get", timed_do_get)
+    setattr(pool, "_checkout_timed", True)
+
+
+def _count_lock_timeouts(exception_context: ExceptionContext) -> None:
+    # sqlite3 waits out a busy lock inside the statement without telling us;
+    # only statements still locked when the busy timeout ends are seen here
+    message = str(exception_context.original_exception)
+    if "database is locked" in message or "database table is locked" in message:
+        DB_LOCK_TIMEOUTS.inc()
+
+
+def _count_statement_cache(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[DefaultExecutionContext],
+    executemany: bool,
+) -> None:
+    if context is None:
+        return
+    if context.cache_hit == CACHE_HIT:
+        record_cache_lookup("sql_compiled", True)
+    elif context.cache_hit == CACHE_MISS:
+        record_cache_lookup("sql_compiled", False)
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Get the path template of the matched route, e.g. ``/api/tags/{tag_id}``.
+
+    Requests are labelled by template rather than raw path to bound the number
+    of series. The matched route only knows its path relative to the router it
+    was included in, so the prefix is taken from the request path.
+    """
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path"):
+        return "unmatched"
+    template: str = route.path
+    path: str = scope["path"]
+    depth = template.count("/")
+    prefix = path.rsplit("/", depth)[0] if depth else path
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and statuses."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = _route_template(scope)
+            method = scope["method"]
+            REQUEST_DURATION.observe(time.perf_counter() - started, (method, route))
+            RESPONSES.inc((method, route, str(status_code)))
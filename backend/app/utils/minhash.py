@@ -0,0 +1,231 @@
+import re
+import zlib
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Split code into overlapping token n-grams.
+
+    Tokenising first makes the shingles insensitive to indentation and other
+    whitespace edits.
+
+    Args:
+        text: Source text
+        size: Tokens per shingle
+
+    Returns:
+        Set of shingles
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHashLSH:
+    """MinHash signatures with banded locality-sensitive hashing.
+
+    Each document is reduced to ``num_perm`` min-hashes; the signature is cut
+    into ``bands`` bands and documents sharing any band land in the same
+    bucket. Only bucket mates are compared, so lookups touch a handful of
+    candidates instead of every stored document. With the default 16 bands of
+    8 rows, pairs above roughly 0.7 Jaccard similarity become candidates.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        """Initialize the index.
+
+        Args:
+            num_perm: Signature length
+            bands: Number of LSH bands, must divide ``num_perm``
+            seed: Seed of the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._signatures
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._by_signature: Dict[bytes, Set[str]] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        self._groups_cache: Dict[float, List[Tuple[List[str], float]]] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text.
+
+        Args:
+            text: Source text
+
+        Returns:
+            ``num_perm`` min-hashes
+        """
+        hashed = np.fromiter(
+            (zlib.crc32(shingle.encode()) % _PRIME for shingle in shingles(text)),
+            dtype=np.uint64,
+        )
+        if not len(hashed):
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        permuted = (self._a[:, None] * hashed[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Insert or replace a document.
+
+        Args:
+            doc_id: Document ID
+            text: Source text
+        """
+        self.remove(doc_id)
+        signature = self.signature(text)
+        self._signatures[doc_id] = signature
+        self._by_signature.setdefault(signature.tobytes(), set()).add(doc_id)
+        self._groups_cache = {}
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+
+    def load(self, documents: Iterable[Tuple[str, str]]) -> None:
+        """Bulk insert ``(doc_id, text)`` pairs."""
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if present."""
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        key = signature.tobytes()
+        self._by_signature[key].discard(doc_id)
+        if not self._by_signature[key]:
+            del self._by_signature[key]
+        self._groups_cache = {}
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(
+        self, text: str, threshold: float = 0.8, exclude: str = ""
+    ) -> List[Tuple[str, float]]:
+        """Find stored documents that are near-duplicates of a text.
+
+        Args:
+            text: Source text
+            threshold: Minimum estimated Jaccard similarity
+            exclude: Document ID to leave out, usually the text's own
+
+        Returns:
+            ``(doc_id, similarity)`` pairs, most similar first
+        """
+        signature = self.signature(text)
+        candidates: Set[str] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates |= self._buckets[band].get(key, set())
+        candidates.discard(exclude)
+
+        matches = []
+        for doc_id in candidates:
+            similarity = float(np.mean(self._signatures[doc_id] == signature))
+            if similarity >= threshold:
+                matches.append((doc_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def groups(self, threshold: float = 0.8) -> List[Tuple[List[str], float]]:
+        """Cluster all stored documents into near-duplicate groups.
+
+        Documents with identical signatures are grouped without comparing
+        them, so a large cluster of copies costs no more than one document.
+        Only distinct signatures that share an LSH bucket are compared, and
+        verified pairs are merged with union-find. The result is kept until
+        the index changes.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of linked pairs
+
+        Returns:
+            ``(doc_ids, min_linked_similarity)`` per group of two or more,
+            largest groups first
+        """
+        cached = self._groups_cache.get(threshold)
+        if cached is not None:
+            return list(cached)
+
+        parent: Dict[bytes, bytes] = {}
+        weakest: Dict[bytes, float] = {}
+        checked: Set[Tuple[bytes, bytes]] = set()
+
+        def find(key: bytes) -> bytes:
+            root = parent.setdefault(key, key)
+            while parent[root] != root:
+                root = parent[root]
+            while parent[key] != root:
+                parent[key], key = root, parent[key]
+            return root
+
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                if len(bucket) < 2:
+                    continue
+                keys = sorted({self._signatures[doc_id].tobytes() for doc_id in bucket})
+                for i, first in enumerate(keys):
+                    for second in keys[i + 1 :]:
+                        if (first, second) in checked:
+                            continue
+                        checked.add((first, second))
+                        similarity = float(
+                            np.mean(
+                                np.frombuffer(first, dtype=np.uint32)
+                                == np.frombuffer(second, dtype=np.uint32)
+                            )
+                        )
+                        if similarity < threshold:
+                            continue
+                        root_a, root_b = find(first), find(second)
+                        low = min(
+                            similarity,
+                            weakest.get(root_a, 1.0),
+                            weakest.get(root_b, 1.0),
+                        )
+                        if root_a != root_b:
+                            parent[root_b] = root_a
+                        weakest[root_a] = low
+
+        clusters: Dict[bytes, List[str]] = {}
+        for key, doc_ids in self._by_signature.items():
+            root = find(key) if key in parent else key
+            clusters.setdefault(root, []).extend(doc_ids)
+        result = [
+            (sorted(members), weakest.get(root, 1.0))
+            for root, members in clusters.items()
+            if len(members) > 1
+        ]
+        result.sort(key=lambda group: (-len(group[0]), group[0]))
+        # Only the latest threshold is kept, so the cache stays bounded
+        self._groups_cache = {threshold: result}
+        return list(result)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
@@ -0,0 +1,136 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+# Sorts after every character, closing the key range of a prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Case-insensitive prefix index ranked by weight.
+
+    Keys are kept in a sorted array of ``(folded_key, key)`` pairs, so the keys
+    sharing a prefix form one contiguous range found with two bisections. The
+    ranked head of the most recently queried prefixes is memoised in an LRU
+    and only the prefixes of a key are invalidated when that key changes, so
+    repeated lookups while the user types are dictionary hits.
+    """
+
+    def __init__(
+        self, keep_empty: bool = False, cache_size: int = 50, max_prefixes: int = 1024
+    ):
+        """Initialize the index.
+
+        Args:
+            keep_empty: Keep keys whose weight drops to zero
+            cache_size: Number of ranked entries memoised per prefix
+            max_prefixes: Number of prefixes memoised, least recently used
+                are dropped first
+        """
+        self.keep_empty = keep_empty
+        self.cache_size = cache_size
+        self.max_prefixes = max_prefixes
+        self._sorted: List[Tuple[str, str]] = []
+        self._weights: Dict[str, int] = {}
+        self._cache: OrderedDict[str, List[Tuple[str, int]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._weights
+
+    def weight(self, key: str) -> int:
+        """Get the weight of a key, 0 if absent."""
+        return self._weights.get(key, 0)
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        self._sorted.clear()
+        self._weights.clear()
+        self._cache.clear()
+
+    def set(self, key: str, weight: int) -> None:
+        """Insert a key or replace its weight.
+
+        Args:
+            key: Key to index
+            weight: Ranking weight, higher ranks first
+        """
+        if weight <= 0 and not self.keep_empty:
+            self.remove(key)
+            return
+        if key not in self._weights:
+            insort(self._sorted, (key.casefold(), key))
+        self._weights[key] = max(weight, 0)
+        self._invalidate(key)
+
+    def add(self, key: str, delta: int = 1) -> int:
+        """Adjust the weight of a key, inserting it if needed.
+
+        Args:
+            key: Key to index
+            delta: Weight change
+
+        Returns:
+            The new weight
+        """
+        weight = self._weights.get(key, 0) + delta
+        self.set(key, weight)
+        return max(weight, 0)
+
+    def remove(self, key: str) -> None:
+        """Remove a key if present."""
+        if key not in self._weights:
+            return
+        entry = (key.casefold(), key)
+        position = bisect_left(self._sorted, entry)
+        if position < len(self._sorted) and self._sorted[position] == entry:
+            del self._sorted[position]
+        del self._weights[key]
+        self._invalidate(key)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Get the highest weighted keys starting with a prefix.
+
+        Args:
+            prefix: Case-insensitive key prefix
+            limit: Maximum number of keys to return
+
+        Returns:
+            ``(key, weight)`` pairs, by descending weight then key
+        """
+        folded = prefix.casefold()
+        if limit > self.cache_size:
+            return self._rank(folded, limit)
+
+        cache = self._cache
+        ranked = cache.get(folded)
+        if ranked is None:
+            ranked = self._rank(folded, self.cache_size)
+            cache[folded] = ranked
+            if len(cache) > self.max_prefixes:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(folded)
+        return ranked[:limit]
+
+    def _rank(self, folded: str, limit: int) -> List[Tuple[str, int]]:
+        start = bisect_left(self._sorted, (folded,))
+        end = bisect_left(self._sorted, (folded + _MAX_CHAR,))
+        weights = self._weights
+        best = heapq.nsmallest(
+            limit,
+            (key for _, key in self._sorted[start:end]),
+            key=lambda key: (-weights[key], key),
+        )
+        return [(key, weights[key]) for key in best]
+
+    def _invalidate(self, key: str) -> None:
+        folded = key.casefold()
+        cache = self._cache
+        if not cache:
+            return
+        for length in range(len(folded) + 1):
+            cache.pop(folded[:length], None)
@@ -0,0 +1,130 @@
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from types import FrameType
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+from app.config import settings
+
+_FLAG_VALUES = {"1", "true", "yes"}
+
+
+class SamplingProfiler:
+    """Samples the stack of one request from a background thread.
+
+    Only samples whose stack passes through ``root`` are kept, so work the
+    event loop does for other requests in between is left out.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, root: FrameType) -> None:
+        """Start sampling the current thread below the ``root`` frame."""
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(threading.get_ident(), root),
+            name="request-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, thread_id: int, root: FrameType) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and frame is not root:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if frame is root:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Render the samples in the collapsed-stack format of flamegraph.pl."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common() if stack
+        )
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_qualname}".replace(";", ",")
+
+
+# Most recent profiles by ID, oldest dropped first
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def save_profile(profile_id: str, collapsed: str) -> None:
+    with _profiles_lock:
+        _profiles[profile_id] = collapsed
+        while len(_profiles) > settings.PROFILER_KEEP:
+            _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """Get a saved profile in collapsed-stack format."""
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def _profiling_requested(scope: Dict[str, Any]) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            return value.decode("latin-1").lower() in _FLAG_VALUES
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.lower() in _FLAG_VALUES for value in query.get("profile", []))
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling requests that ask for it.
+
+    A request with an ``X-Profile: 1`` header or a ``profile=1`` query
+    parameter is sampled while it is handled. The response carries an
+    ``X-Profile-Id`` header; the profile is downloaded from
+    ``/api/debug/profiles/{id}`` once the response has finished.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_profile_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("ascii"))
+                ]
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILER_INTERVAL_MS / 1000)
+        profiler.start(sys._getframe())
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            save_profile(profile_id, profiler.collapsed())
@@ -0,0 +1,181 @@
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_queries")
+
+# Modules whose frames are skipped when looking for the caller of a query
+_INFRASTRUCTURE = ("app.utils.", "app.database")
+
+
+class SlowQueryLog:
+    """Ring buffer of the most recent queries slower than a threshold."""
+
+    def __init__(self, threshold_ms: Optional[float], size: int = 100):
+        """Initialize the log.
+
+        Args:
+            threshold_ms: Minimum duration to record; None records nothing
+            size: Number of entries kept, oldest dropped first
+        """
+        self.threshold_ms = threshold_ms
+        self._entries: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Get the recorded queries, most recent first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS, size=settings.SLOW_QUERY_LOG_SIZE
+)
+
+
+def watch_slow_queries(engine: Engine) -> None:
+    """Record the queries on an engine that exceed the log's threshold.
+
+    Safe to call more than once.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    started = conn.info.get("slow_query_started")
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    threshold_ms = slow_query_log.threshold_ms
+    if threshold_ms is None or duration_ms < threshold_ms:
+        return
+
+    entry = {
+        "sql": statement,
+        "parameters": parameter_shape(parameters, executemany),
+        "duration_ms": round(duration_ms, 3),
+        "caller": _find_caller(),
+        "plan": (
+            [] if executemany else explain_query_plan(conn, statement, parameters)
+        ),
+        "recorded_at": datetime.utcnow(),
+    }
+    slow_query_log.record(entry)
+    logger.warning(
+        "slow query (%.1fms) from %s: %s",
+        duration_ms,
+        entry["caller"],
+        statement,
+        extra={key: entry[key] for key in ("duration_ms", "caller", "parameters")},
+    )
+
+
+def parameter_shape(parameters: Any, many: bool = False) -> Any:
+    """Describe bound parameters by type only, so no values are recorded.
+
+    ``("python", 10)`` becomes ``["str", "int"]``; for ``executemany`` only
+    the first parameter set is described, along with the number of sets.
+    """
+    if many:
+        sets = list(parameters or [])
+        return {
+            "executemany": len(sets),
+            "first": parameter_shape(sets[0]) if sets else None,
+        }
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters]
+
+
+def explain_query_plan(conn: Connection, statement: str, parameters: Any) -> List[str]:
+    """Get SQLite's query plan for a statement, indented as a tree.
+
+    Only SELECT statements are explained, on a separate raw cursor so the
+    original result and the SQLAlchemy events are left untouched.
+    """
+    if conn.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(
+        ("SELECT", "WITH")
+    ):
+        return []
+    dbapi_connection = conn.connection.dbapi_connection
+    if dbapi_connection is None:
+        return []
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        rows = cursor.fetchall()
+    except Exception as e:
+        return [f"(plan unavailable: {e})"]
+    finally:
+        cursor.close()
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _find_caller() -> str:
+    """Name the innermost application function on the stack.
+
+    CRUD functions are preferred; queries run lazily, e.g. while serializing,
+    fall back to the endpoint or other application code that triggered them.
+    """
+    frame: Optional[FrameType] = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.crud."):
+            return f"{module}.{frame.f_code.co_name}"
+        if (
+            fallback is None
+            and module.startswith("app.")
+            and not module.startswith(_INFRASTRUCTURE)
+        ):
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "unknown"
@@ -0,0 +1,164 @@
+import re
+from typing import List, Tuple, Union
+
+from app.utils.error_handling import BadRequestError
+
+# Parsed tag expression nodes:
+#   ("tag", name) | ("not", node) | ("and", [nodes]) | ("or", [nodes])
+TagExpression = Tuple[str, Union[str, "TagExpression", List["TagExpression"]]]
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|(,)|"([^"]*)"|([^\s(),"]+))')
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+# Limits that keep the parser's recursion and the generated SQL small
+MAX_TAG_TERMS = 50
+MAX_NESTING = 20
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Split a tag expression into ``(kind, value)`` tokens."""
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match or match.end() == position:
+            raise BadRequestError(
+                f"Invalid tag expression near '{expression[position:]}'"
+            )
+        position = match.end()
+        lparen, rparen, comma, quoted, word = match.groups()
+        if lparen:
+            tokens.append(("(", lparen))
+        elif rparen:
+            tokens.append((")", rparen))
+        elif comma:
+            tokens.append(("AND", comma))
+        elif quoted is not None:
+            tokens.append(("TAG", quoted))
+        elif word.upper() in _KEYWORDS:
+            tokens.append((word.upper(), word))
+        else:
+            tokens.append(("TAG", word))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser for tag expressions.
+
+    Grammar (``NOT`` binds tighter than ``AND``, which binds tighter than
+    ``OR``; a comma is a shorthand for ``AND``)::
+
+        or_expr  := and_expr ("OR" and_expr)*
+        and_expr := not_expr ("AND" not_expr)*
+        not_expr := "NOT" not_expr | "(" or_expr ")" | TAG
+
+    Each ``NOT`` and each pair of parentheses nests one level deeper; more
+    than ``MAX_NESTING`` levels are rejected before Python's recursion limit
+    is reached.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def _peek(self) -> str:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][0]
+        return ""
+
+    def _next(self) -> Tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> TagExpression:
+        node = self._or_expr()
+        if self.position != len(self.tokens):
+            raise BadRequestError(
+                f"Unexpected '{self.tokens[self.position][1]}' in tag expression"
+            )
+        return node
+
+    def _or_expr(self) -> TagExpression:
+        children = [self._and_expr()]
+        while self._peek() == "OR":
+            self._next()
+            children.append(self._and_expr())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def _and_expr(self) -> TagExpression:
+        children = [self._not_expr()]
+        while self._peek() == "AND":
+            self._next()
+            children.append(self._not_expr())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def _not_expr(self) -> TagExpression:
+        kind = self._peek()
+        if kind in ("NOT", "("):
+            self._next()
+            self.depth += 1
+            if self.depth > MAX_NESTING:
+                raise BadRequestError(
+                    f"Tag expression nested more than {MAX_NESTING} levels deep"
+                )
+            if kind == "NOT":
+                node: TagExpression = ("not", self._not_expr())
+            else:
+                node = self._or_expr()
+                if self._peek() != ")":
+                    raise BadRequestError("Unbalanced parentheses in tag expression")
+                self._next()
+            self.depth -= 1
+            return node
+        if kind == "TAG":
+            return ("tag", self._next()[1])
+        raise BadRequestError("Incomplete tag expression")
+
+
+def parse_tag_expression(expression: str) -> TagExpression:
+    """Parse a boolean tag expression.
+
+    Examples: ``python AND asyncio AND NOT deprecated``,
+    ``(go OR rust), cli`` or ``"machine learning" OR ml``.
+
+    Args:
+        expression: Tag expression
+
+    Returns:
+        Parsed expression tree
+
+    Raises:
+        BadRequestError: If the expression is malformed, has more than
+            ``MAX_TAG_TERMS`` tags or nests deeper than ``MAX_NESTING``
+    """
+    tokens = _tokenize(expression)
+    if not tokens:
+        raise BadRequestError("Empty tag expression")
+    if sum(1 for kind, _ in tokens if kind == "TAG") > MAX_TAG_TERMS:
+        raise BadRequestError(f"Tag expression has more than {MAX_TAG_TERMS} tags")
+    return _Parser(tokens).parse()
+
+
+def tag_names(node: TagExpression) -> List[str]:
+    """Collect all tag names referenced by an expression.
+
+    Args:
+        node: Parsed expression tree
+
+    Returns:
+        Tag names in order of first appearance
+    """
+    kind, value = node
+    if kind == "tag":
+        return [value]
+    if kind == "not":
+        return tag_names(value)
+    names: List[str] = []
+    for child in value:
+        for name in tag_names(child):
+            if name not in names:
+                names.append(name)
+    return names
@@ -0,0 +1,290 @@
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split source text into lowercase identifier tokens.
+
+    Compound identifiers also contribute their parts, so ``parseJsonBody``
+    and ``parse_json_body`` share the ``parse``, ``json`` and ``body`` terms.
+    """
+    tokens = []
+    for word in _TOKEN_RE.findall(text):
+        tokens.append(word.lower())
+        parts = [part for chunk in word.split("_") for part in _CAMEL_RE.findall(chunk)]
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+class TfidfIndex:
+    """Hashed TF-IDF vectors with cosine top-k queries.
+
+    Terms are hashed into ``n_features`` columns, so the vocabulary never has
+    to be stored. Documents are kept as sparse rows and compiled into a
+    column-major (CSC) matrix; a query gathers the posting slices of its own
+    columns and scores every document with a single ``np.bincount``.
+
+    Writes go to a small pending set that is scored directly and folded into
+    the compiled matrix once it grows past ``merge_threshold`` rows.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 1 << 18,
+        title_weight: int = 3,
+        merge_threshold: int = 256,
+    ):
+        """Initialize the index.
+
+        Args:
+            n_features: Number of hashed term columns, a power of two
+            title_weight: How many times title terms are counted
+            merge_threshold: Pending rows that trigger a matrix rebuild
+        """
+        self.n_features = n_features
+        self.title_weight = title_weight
+        self.merge_threshold = merge_threshold
+        self._mask = n_features - 1
+        self._feature_cache: Dict[str, int] = {}
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._df = np.zeros(self.n_features, dtype=np.int32)
+        # doc_id -> row; rows are never reused until the next rebuild
+        self._rows: Dict[str, int] = {}
+        self._doc_ids: List[Optional[str]] = []
+        self._terms: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+        self._pending: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._pending_cache: Optional[Tuple[np.ndarray, ...]] = None
+        # Compiled rows whose document was replaced or removed since compile()
+        self._dead: Set[int] = set()
+        self._indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+
+    def vectorize(self, title: str, code: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn a document into sorted hashed features and log-scaled counts.
+
+        Args:
+            title: Snippet title
+            code: Snippet code
+
+        Returns:
+            ``(features, term_frequencies)`` arrays
+        """
+        cache = self._feature_cache
+        features = []
+        for token in tokenize(title) * self.title_weight + tokenize(code):
+            feature = cache.get(token)
+            if feature is None:
+                feature = zlib.crc32(token.encode()) & self._mask
+                if len(cache) < 1_000_000:
+                    cache[token] = feature
+            features.append(feature)
+        if not features:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        unique, counts = np.unique(
+            np.asarray(features, dtype=np.int32), return_counts=True
+        )
+        return unique, (1.0 + np.log(counts)).astype(np.float32)
+
+    def add(self, doc_id: str, title: str, code: str) -> None:
+        """Insert or replace a document.
+
+        Args:
+            doc_id: Document ID
+            title: Snippet title
+            code: Snippet code
+        """
+        self.remove(doc_id)
+        features, tf = self.vectorize(title, code)
+        row = len(self._doc_ids)
+        self._rows[doc_id] = row
+        self._doc_ids.append(doc_id)
+        self._terms.append((features, tf))
+        self._df[features] += 1
+        self._pending[row] = (features, self._weigh(features, tf))
+        self._pending_cache = None
+        if len(self._pending) > max(self.merge_threshold, len(self._rows) // 20):
+            self.compile()
+
+    def load(self, documents: Iterable[Tuple[str, str, str]]) -> None:
+        """Bulk insert documents and compile the matrix once.
+
+        Args:
+            documents: ``(doc_id, title, code)`` tuples
+        """
+        for doc_id, title, code in documents:
+            self.remove(doc_id)
+            features, tf = self.vectorize(title, code)
+            self._rows[doc_id] = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._terms.append((features, tf))
+            self._df[features] += 1
+        self.compile()
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if present."""
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        features, _ = self._terms[row]
+        self._df[features] -= 1
+        self._doc_ids[row] = None
+        self._terms[row] = None
+        if self._pending.pop(row, None) is None:
+            self._dead.add(row)
+        else:
+            self._pending_cache = None
+
+    def compile(self) -> None:
+        """Rebuild the CSC matrix from all live rows with current IDF weights."""
+        live = [
+            (doc_id, terms)
+            for doc_id, terms in zip(self._doc_ids, self._terms)
+            if terms is not None
+        ]
+        self._doc_ids = [doc_id for doc_id, _ in live]
+        self._terms = [terms for _, terms in live]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._doc_ids)}
+        self._pending = {}
+        self._pending_cache = None
+        self._dead = set()
+
+        if not live:
+            self._indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+            self._indices = np.zeros(0, dtype=np.int32)
+            self._data = np.zeros(0, dtype=np.float32)
+            return
+
+        lengths = np.fromiter(
+            (len(features) for features, _ in self._terms),
+            dtype=np.int64,
+            count=len(live),
+        )
+        rows = np.repeat(np.arange(len(live), dtype=np.int32), lengths)
+        columns = np.concatenate([features for features, _ in self._terms])
+        values = np.concatenate(
+            [self._weigh(features, tf) for features, tf in self._terms]
+        )
+
+        order = np.argsort(columns, kind="stable")
+        self._indices = rows[order]
+        self._data = values[order]
+        self._indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=self.n_features), out=self._indptr[1:])
+
+    def similar(
+        self, title: str, code: str, limit: int = 10, exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Find the documents most similar to some content.
+
+        Args:
+            title: Query title
+            code: Query code
+            limit: Maximum number of results
+            exclude: Document ID to leave out, usually the query itself
+
+        Returns:
+            ``(doc_id, cosine_similarity)`` pairs, most similar first
+        """
+        features, tf = self.vectorize(title, code)
+        if not len(features) or not self._rows:
+            return []
+        weights = self._weigh(features, tf)
+        n_rows = len(self._doc_ids)
+
+        # Compiled rows: posting slices come straight from the CSC index pointer
+        starts = self._indptr[features]
+        scores = _gather_scores(
+            weights,
+            starts,
+            self._indptr[features + 1] - starts,
+            self._indices,
+            self._data,
+            n_rows,
+        )
+
+        # Pending rows: same gather over their column-sorted triplets
+        if self._pending:
+            columns, rows, values = self._pending_matrix()
+            starts = np.searchsorted(columns, features, side="left")
+            ends = np.searchsorted(columns, features, side="right")
+            scores += _gather_scores(
+                weights, starts, ends - starts, rows, values, n_rows
+            )
+
+        if exclude is not None and exclude in self._rows:
+            scores[self._rows[exclude]] = 0.0
+        if self._dead:
+            scores[list(self._dead)] = 0.0
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (self._doc_ids[row], float(scores[row]))
+            for row in top
+            if scores[row] > 0 and self._doc_ids[row] is not None
+        ]
+
+    def _pending_matrix(self) -> Tuple[np.ndarray, ...]:
+        """Column-sorted ``(columns, rows, values)`` triplets of pending rows."""
+        if self._pending_cache is None:
+            rows = list(self._pending)
+            lengths = [len(self._pending[row][0]) for row in rows]
+            columns = np.concatenate([self._pending[row][0] for row in rows])
+            values = np.concatenate([self._pending[row][1] for row in rows])
+            row_ids = np.repeat(np.asarray(rows, dtype=np.int32), lengths)
+            order = np.argsort(columns, kind="stable")
+            self._pending_cache = (columns[order], row_ids[order], values[order])
+        return self._pending_cache
+
+    def _weigh(self, features: np.ndarray, tf: np.ndarray) -> np.ndarray:
+        """L2-normalised TF-IDF weights for a document's features."""
+        n_docs = max(len(self._rows), 1)
+        idf = np.log((1.0 + n_docs) / (1.0 + self._df[features])) + 1.0
+        weights = (tf * idf).astype(np.float32)
+        norm = float(np.linalg.norm(weights))
+        return weights / norm if norm else weights
+
+
+def _gather_scores(
+    weights: np.ndarray,
+    starts: np.ndarray,
+    lengths: np.ndarray,
+    rows: np.ndarray,
+    values: np.ndarray,
+    n_rows: int,
+) -> np.ndarray:
+    """Accumulate query-weighted posting slices into per-row dot products.
+
+    Slice ``i`` covers ``rows[starts[i]:starts[i] + lengths[i]]`` and is scaled
+    by ``weights[i]``; all slices are gathered with one fancy index instead of
+    a Python loop.
+    """
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(n_rows, dtype=np.float64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    positions = offsets + np.arange(total)
+    return np.bincount(
+        rows[positions],
+        weights=values[positions] * np.repeat(weights, lengths),
+        minlength=n_rows,
+    )
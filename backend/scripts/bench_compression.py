@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark database size and snippet detail latency with and without
+code compression.
+
+Usage: python -m scripts.bench_compression [--snippets N] [--reads N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.crud import snippet as snippet_crud
+from app.database import Base
+from app.models import Snippet
+
+
+def generate_code(language: str, rng: random.Random) -> str:
+    """Generate a large, realistic-looking code body."""
+    if language == "sql":
+        lines = ["BEGIN;"]
+        for i in range(rng.randint(200, 2000)):
+            table = f"table_{rng.randint(1, 40)}"
+            lines.append(
+                f"ALTER TABLE {table} ADD COLUMN column_{i} VARCHAR(255) NOT NULL "
+                f"DEFAULT '';"
+            )
+            lines.append(
+                f"UPDATE {table} SET column_{i} = 'value_{rng.randint(1, 999)}' "
+                f"WHERE id > {rng.randint(1, 10_000)};"
+            )
+        lines.append("COMMIT;")
+    else:
+        lines = [f"import module_{i}" for i in range(rng.randint(5, 30))]
+        for i in range(rng.randint(100, 800)):
+            lines.extend(
+                [
+                    "",
+                    f"def generated_function_{i}(value, *args, **kwargs):",
+                    f'    """Generated function number {i}."""',
+                    f"    result = module_{rng.randint(0, 4)}.process(value, {i})",
+                    "    if result is None:",
+                    "        raise ValueError('unexpected result')",
+                    "    return result",
+                ]
+            )
+    return "\n".join(lines) + "\n"
+
+
+def run(threshold: int, snippets: int, reads: int, seed: int) -> dict:
+    """Populate a fresh database and measure it."""
+    settings.CODE_COMPRESSION_THRESHOLD = threshold
+    rng = random.Random(seed)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = SessionLocal()
+        ids = []
+        raw_bytes = 0
+        for i in range(snippets):
+            language = rng.choice(["python", "sql"])
+            code = generate_code(language, rng)
+            raw_bytes += len(code.encode("utf-8"))
+            snippet = Snippet(title=f"Generated {i}", code=code, language=language)
+            db.add(snippet)
+            db.commit()
+            ids.append(snippet.id)
+        db.close()
+
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        size = os.path.getsize(path)
+
+        timings = []
+        for _ in range(reads):
+            db = SessionLocal()
+            start = time.perf_counter()
+            len(snippet_crud.get_snippet(db, rng.choice(ids)).code)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.close()
+
+        return {
+            "raw_mb": raw_bytes / 1e6,
+            "db_mb": size / 1e6,
+            "p50_ms": statistics.median(timings),
+            "p95_ms": statistics.quantiles(timings, n=20)[-1],
+        }
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snippets", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    configured = settings.CODE_COMPRESSION_THRESHOLD
+    print(f"{'mode':<24}{'code MB':>10}{'db MB':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, threshold in [
+        ("uncompressed", 2**62),
+        (f"compressed (>{configured} B)", configured),
+    ]:
+        result = run(threshold, args.snippets, args.reads, args.seed)
+        print(
+            f"{label:<24}{result['raw_mb']:>10.2f}{result['db_mb']:>10.2f}"
+            f"{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+        )
+    settings.CODE_COMPRESSION_THRESHOLD = configured
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CRUD hot paths against generated datasets.
+
+Each case runs against a fresh copy of a dataset made by
+``scripts.generate_data``, one session per operation as in a request, and
+records latency percentiles and the number of queries per operation. The
+results are compared with a baseline file; the run fails when a case got
+slower than the threshold allows or runs more queries than before. The
+baseline records the machine it ran on, since timings only compare there.
+
+Usage: python -m scripts.benchmark [--sizes 1000,10000] [--iterations N]
+           [--baseline FILE] [--update-baseline] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.crud import bootstrap as bootstrap_crud
+from app.crud import category as category_crud
+from app.crud import collection as collection_crud
+from app.crud import duplicates as duplicates_crud
+from app.crud import similar as similar_crud
+from app.crud import snippet as snippet_crud
+from app.crud import suggest as suggest_crud
+from app.crud import tag as tag_crud
+from app.database import upgrade_schema
+from app.models import Category, Collection, Snippet, Tag, snippet_tag
+from app.schemas.snippet import SnippetCreate, SnippetUpdate
+from app.utils.instrumentation import collect_metrics, instrument_engine
+from scripts.generate_data import generate
+
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+# Machine fields that decide whether timings compare with the baseline
+_CPU_KEYS = ("cpu", "cpu_count")
+
+
+class Dataset:
+    """IDs and names the cases draw their inputs from, most used first."""
+
+    def __init__(self, db: Session, seed: int):
+        self.rng = random.Random(seed)
+        live = Snippet.is_deleted == False
+        self.snippet_ids = [
+            row.id for row in db.query(Snippet.id).filter(live).order_by(Snippet.id)
+        ]
+        # Most and least used, as the planner treats them differently
+        self.tags = self._tag_names(db, func.count().desc())
+        self.rare_tags = self._tag_names(db, func.count())
+        self.category_ids = self._category_ids(db, func.count().desc())
+        self.rare_category_ids = self._category_ids(db, func.count())
+        self.root_category_ids = [
+            row.id
+            for row in db.query(Category.id)
+            .filter(Category.parent_id.is_(None))
+            .order_by(Category.id)
+            .limit(20)
+        ]
+        self.collection_ids = [
+            row.id for row in db.query(Collection.id).order_by(Collection.id).limit(20)
+        ]
+        self.languages = ["python", "javascript", "sql", "go"]
+        self.terms = ["session", "cache", "retry", "invoice"]
+
+    @staticmethod
+    def _tag_names(db: Session, order: Any) -> List[str]:
+        return [
+            row.name
+            for row in db.query(Tag.name)
+            .join(snippet_tag, snippet_tag.c.tag_id == Tag.id)
+            .group_by(Tag.id)
+            .order_by(order, Tag.name)
+            .limit(20)
+        ]
+
+    @staticmethod
+    def _category_ids(db: Session, order: Any) -> List[str]:
+        return [
+            row.id
+            for row in db.query(Category.id)
+            .join(Snippet, Snippet.category_id == Category.id)
+            .group_by(Category.id)
+            .order_by(order, Category.id)
+            .limit(20)
+        ]
+
+    def pick(self, items: List[Any]) -> Any:
+        return self.rng.choice(items)
+
+
+def _list(snippets) -> None:
+    # Endpoints serialize tag names, so touch them like the endpoint would
+    for snippet in snippets:
+        list(snippet.tags)
+
+
+def _get_snippets(**filters: Callable[[Dataset], Any]):
+    def case(db: Session, data: Dataset) -> None:
+        _list(
+            snippet_crud.get_snippets(
+                db, **{name: pick(data) for name, pick in filters.items()}, limit=50
+            )
+        )
+
+    return case
+
+
+def _create_snippet(db: Session, data: Dataset) -> None:
+    n = data.rng.getrandbits(32)
+    snippet_crud.create_snippet(
+        db,
+        SnippetCreate(
+            title=f"Benchmark snippet {n}",
+            code=f"def benchmark_{n}(value):\n    return value * {n}\n",
+            language="python",
+            category_id=data.pick(data.category_ids),
+            tags=data.rng.sample(data.tags, 2),
+        ),
+    )
+
+
+def _update_snippet(db: Session, data: Dataset) -> None:
+    n = data.rng.getrandbits(32)
+    snippet_crud.update_snippet(
+        db,
+        data.pick(data.snippet_ids),
+        SnippetUpdate(
+            title=f"Updated snippet {n}",
+            code=f"print({n})\n",
+            tags=[data.pick(data.tags)],
+        ),
+    )
+
+
+def _toggle_membership(db: Session, data: Dataset) -> None:
+    collection_id = data.pick(data.collection_ids)
+    snippet_id = data.pick(data.snippet_ids)
+    if not collection_crud.add_snippet_to_collection(db, collection_id, snippet_id):
+        collection_crud.remove_snippet_from_collection(db, collection_id, snippet_id)
+
+
+def _batch_favorite(db: Session, data: Dataset) -> None:
+    snippet_crud.batch_operation(
+        db,
+        data.rng.choice(["favorite", "unfavorite"]),
+        data.rng.sample(data.snippet_ids, 20),
+    )
+
+
+CASES: Dict[str, Callable[[Session, Dataset], None]] = {
+    "get_snippets": _get_snippets(),
+    "get_snippets[category]": _get_snippets(
+        category_id=lambda d: d.pick(d.category_ids)
+    ),
+    "get_snippets[category_tree]": _get_snippets(
+        category_id=lambda d: d.pick(d.root_category_ids),
+        include_descendants=lambda d: True,
+    ),
+    "get_snippets[rare_category]": _get_snippets(
+        category_id=lambda d: d.pick(d.rare_category_ids)
+    ),
+    "get_snippets[tag]": _get_snippets(tag=lambda d: d.pick(d.tags)),
+    "get_snippets[rare_tag]": _get_snippets(tag=lambda d: d.pick(d.rare_tags)),
+    "get_snippets[tags_expression]": _get_snippets(
+        tags=lambda d: "{} AND NOT {}".format(*d.rng.sample(d.tags, 2))
+    ),
+    "get_snippets[language]": _get_snippets(language=lambda d: d.pick(d.languages)),
+    "get_snippets[favorite]": _get_snippets(favorite=lambda d: True),
+    "get_snippets[deleted]": _get_snippets(deleted=lambda d: True),
+    "get_snippets[sort=title]": _get_snippets(sort=lambda d: "title"),
+    "get_snippets[sort=usage]": _get_snippets(sort=lambda d: "usage"),
+    "get_snippets[category,sort=title]": _get_snippets(
+        category_id=lambda d: d.pick(d.category_ids), sort=lambda d: "title"
+    ),
+    "get_snippets[rare_category,sort=title]": _get_snippets(
+        category_id=lambda d: d.pick(d.rare_category_ids), sort=lambda d: "title"
+    ),
+    "get_snippets[category+tag+language]": _get_snippets(
+        category_id=lambda d: d.pick(d.category_ids),
+        tag=lambda d: d.pick(d.tags),
+        language=lambda d: d.pick(d.languages),
+    ),
+    "search": _get_snippets(search=lambda d: d.pick(d.terms)),
+    "search[tag+language]": _get_snippets(
+        search=lambda d: d.pick(d.terms),
+        tag=lambda d: d.pick(d.tags),
+        language=lambda d: d.pick(d.languages),
+    ),
+    "search_facets": lambda db, d: snippet_crud.get_snippet_facets(
+        db, deleted=False, search=d.pick(d.terms)
+    ),
+    "get_snippet": lambda db, d: _list(
+        [snippet_crud.get_snippet(db, d.pick(d.snippet_ids))]
+    ),
+    "get_tags": lambda db, d: tag_crud.get_tags(db),
+    "get_categories": lambda db, d: category_crud.get_categories(db),
+    "get_category_tree": lambda db, d: category_crud.get_category_tree(db),
+    "get_collections": lambda db, d: collection_crud.get_collections(db),
+    "get_snippets_in_collection": lambda db, d: _list(
+        collection_crud.get_snippets_in_collection(db, d.pick(d.collection_ids))
+    ),
+    "toggle_collection_membership": _toggle_membership,
+    "batch_favorite[20]": _batch_favorite,
+    "create_snippet": _create_snippet,
+    "update_snippet": _update_snippet,
+}
+
+
+def _reset_caches() -> None:
+    category_crud.invalidate_category_tree()
+    suggest_crud.reset_suggestions()
+    similar_crud.reset_similarity_index()
+    duplicates_crud.reset_duplicate_index()
+    bootstrap_crud.reset_bootstrap_cache()
+
+
+def _percentile(timings: List[float], pct: int) -> float:
+    return statistics.quantiles(timings, n=100, method="inclusive")[pct - 1]
+
+
+def machine_info() -> Dict[str, Any]:
+    """Describe the machine, as timings only compare on the same one."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            cpu = next(
+                line.split(":", 1)[1].strip()
+                for line in cpuinfo
+                if line.startswith("model name")
+            )
+    except (OSError, StopIteration):
+        pass
+    return {
+        "cpu": cpu or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def run_size(
+    size: int, seed: int, iterations: int, warmup: int, data_dir: str
+) -> Dict[str, Dict[str, float]]:
+    """Run every case against a fresh copy of the dataset of one size."""
+    source = os.path.join(data_dir, f"bench-{size}-seed{seed}.db")
+    if not os.path.exists(source):
+        generate(source, size, seed=seed)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    shutil.copyfile(source, path)
+
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    # Upgrade and analyze the copy as the server does on startup
+    upgrade_schema(engine)
+    instrument_engine(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _reset_caches()
+    results = {}
+    try:
+        with SessionLocal() as db:
+            data = Dataset(db, seed)
+        for name, case in CASES.items():
+            timings, queries = [], []
+            for i in range(warmup + iterations):
+                with SessionLocal() as db, collect_metrics() as metrics:
+                    started = time.perf_counter()
+                    case(db, data)
+                    elapsed = time.perf_counter() - started
+                if i >= warmup:
+                    timings.append(elapsed * 1000)
+                    queries.append(metrics.query_count)
+            results[name] = {
+                "p50_ms": round(_percentile(timings, 50), 3),
+                "p95_ms": round(_percentile(timings, 95), 3),
+                "p99_ms": round(_percentile(timings, 99), 3),
+                "queries": round(statistics.mean(queries), 2),
+            }
+    finally:
+        engine.dispose()
+        os.remove(path)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    threshold: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """List the regressions of ``results`` against ``baseline``.
+
+    A case regresses when its p95 grew by more than ``threshold`` (a
+    fraction) and by more than ``min_delta_ms``, or when it runs more
+    queries. Cases missing from the baseline are not compared.
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, current in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            if current["queries"] > base["queries"]:
+                regressions.append(
+                    f"{name} @ {size}: {current['queries']} queries "
+                    f"(baseline {base['queries']})"
+                )
+            growth = current["p95_ms"] - base["p95_ms"]
+            if growth > min_delta_ms and growth > base["p95_ms"] * threshold:
+                regressions.append(
+                    f"{name} @ {size}: p95 {current['p95_ms']:.2f} ms "
+                    f"(baseline {base['p95_ms']:.2f} ms, "
+                    f"+{growth / base['p95_ms']:.0%})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--data-dir",
+        default=None,
+        help="Directory to keep generated datasets in between runs",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed p95 growth"
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="p95 growth below this is treated as noise",
+    )
+    parser.add_argument("--output", type=Path, help="Also write results here")
+    args = parser.parse_args()
+
+    data_dir: Optional[str] = args.data_dir
+    cleanup = data_dir is None
+    if cleanup:
+        data_dir = tempfile.mkdtemp(prefix="snippet-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+
+    results = {}
+    try:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            print(f"== {size} snippets")
+            print(
+                f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+            )
+            results[str(size)] = run_size(
+                size, args.seed, args.iterations, args.warmup, data_dir
+            )
+            for name, result in results[str(size)].items():
+                print(
+                    f"{name:<40}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+                    f"{result['p99_ms']:>10.3f}{result['queries']:>9g}"
+                )
+    finally:
+        if cleanup:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    document = {
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "machine": machine_info(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if (baseline["seed"], baseline["iterations"]) != (args.seed, args.iterations):
+        # Inputs are drawn from a seeded RNG, so query counts are only
+        # comparable between runs drawing the same sequence
+        print(
+            f"Baseline was recorded with --seed {baseline['seed']} "
+            f"--iterations {baseline['iterations']}; rerun with those"
+        )
+        return 2
+    recorded_on = baseline.get("machine", {})
+    if any(recorded_on.get(key) != document["machine"][key] for key in _CPU_KEYS):
+        print(
+            f"Baseline was recorded on another CPU "
+            f"({recorded_on.get('cpu', 'unknown')}); timings may not compare"
+        )
+    regressions = compare(
+        results, baseline["results"], args.threshold, args.min_delta_ms
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic database for performance work.
+
+Snippet code sizes follow a log-normal distribution, languages a fixed mix
+and tag, category and collection usage a Zipf distribution over a category
+tree of bounded depth. The same seed always produces the same database.
+
+Rows are generated by worker processes and bulk-inserted by the parent,
+bypassing the ORM: code blobs are written with their final reference counts,
+while revisions and the change log are left empty.
+
+Usage: python -m scripts.generate_data OUTPUT.db [--snippets N] [--seed N]
+           [--workers N] [--force]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud.stats import rebuild_stats
+from app.database import Base
+from app.models import Category, CodeBlob, Collection, Snippet, Tag, snippet_tag
+from app.models.blob import hash_code
+from app.models.collection import collection_snippet
+from app.utils.compression import compress
+
+CHUNK_SIZE = 5000
+
+# Relative frequency of each language
+LANGUAGES = [
+    ("python", 30),
+    ("javascript", 22),
+    ("typescript", 12),
+    ("sql", 10),
+    ("bash", 10),
+    ("go", 6),
+    ("java", 5),
+    ("rust", 3),
+    ("html", 2),
+]
+
+WORDS = [
+    "user", "order", "cache", "request", "response", "config", "item", "value",
+    "index", "buffer", "token", "session", "query", "result", "file", "path",
+    "event", "handler", "record", "payload", "stream", "batch", "client",
+    "server", "retry", "timeout", "schema", "report", "invoice", "account",
+]  # fmt: skip
+VERBS = [
+    "parse", "load", "save", "fetch", "merge", "sort", "filter", "validate",
+    "format", "render", "retry", "sync", "hash", "encode", "decode", "migrate",
+]  # fmt: skip
+
+LINE_TEMPLATES = {
+    "python": [
+        "def {verb}_{a}({b}, {c}=None):",
+        "    {a} = {b}.get('{c}', {n})",
+        "    for {a} in {b}:",
+        "        {c}.append({a} * {n})",
+        "    if not {a}:",
+        "        raise ValueError('invalid {a}')",
+        "    return {verb}_{b}({a})",
+        "import {a}",
+        "",
+    ],
+    "javascript": [
+        "function {verb}{A}({b}, {c}) {{",
+        "  const {a} = {b}.{c} ?? {n};",
+        "  for (const {a} of {b}) {{",
+        "    {c}.push({a} * {n});",
+        "  }}",
+        "  return await {verb}{B}({a});",
+        "}}",
+        "",
+    ],
+    "typescript": [
+        "export function {verb}{A}({b}: {B}, {c}?: number): {A} {{",
+        "  const {a}: {A} = {{ ...{b}, {c}: {n} }};",
+        "  if (!{a}) throw new Error('invalid {a}');",
+        "  return {a};",
+        "}}",
+        "interface {A} {{ {b}: string; {c}: number }}",
+        "",
+    ],
+    "sql": [
+        "SELECT {a}.id, {a}.{b} FROM {a}s {a}",
+        "JOIN {b}s {b} ON {b}.{a}_id = {a}.id",
+        "WHERE {a}.{c} > {n}",
+        "GROUP BY {a}.id ORDER BY {a}.{b} DESC LIMIT {n};",
+        "UPDATE {a}s SET {b} = {n} WHERE {c} IS NULL;",
+        "",
+    ],
+    "bash": [
+        'for {a} in "${b}[@]"; do',
+        '  {verb}_{a} "${a}" || exit {n}',
+        "done",
+        "if [ -z \"${a}\" ]; then echo 'missing {a}'; fi",
+        '{a}=$(curl -s "$URL/{b}/{n}")',
+        "",
+    ],
+    "go": [
+        "func {Verb}{A}({b} *{B}) (*{A}, error) {{",
+        "\t{a}, err := {b}.{Verb}({n})",
+        "\tif err != nil {{ return nil, err }}",
+        "\treturn {a}, nil",
+        "}}",
+        "",
+    ],
+    "java": [
+        "public {A} {verb}{A}({B} {b}) {{",
+        "    {A} {a} = {b}.get{C}({n});",
+        '    if ({a} == null) throw new IllegalStateException("{a}");',
+        "    return {a};",
+        "}}",
+        "",
+    ],
+    "rust": [
+        "pub fn {verb}_{a}({b}: &{B}) -> Result<{A}, Error> {{",
+        "    let {a} = {b}.{c}.get({n}).ok_or(Error::Missing)?;",
+        "    Ok({a}.clone())",
+        "}}",
+        "",
+    ],
+    "html": [
+        '<div class="{a}-{b}">',
+        '  <span data-{c}="{n}">{A} {B}</span>',
+        "</div>",
+        "",
+    ],
+}
+
+# Dates are spread over the three years before this fixed point, not "now",
+# so the output does not depend on when it was generated
+EPOCH = datetime(2025, 1, 1)
+SPAN_SECONDS = 3 * 365 * 24 * 3600
+
+
+def zipf_cum_weights(n: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights for ``random.choices`` over ``n`` ranked items."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _pick(rng: random.Random, items: Sequence, cum_weights: List[float]):
+    return items[bisect_left(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def build_catalog(seed: int, snippets: int, max_depth: int = 4) -> Dict[str, Any]:
+    """Generate the categories, tags and collections snippets refer to."""
+    rng = random.Random(f"{seed}:catalog")
+
+    categories: List[Dict[str, Any]] = []
+    depths: List[int] = []
+    for i in range(min(5000, max(10, snippets // 200))):
+        nestable = [j for j, depth in enumerate(depths) if depth < max_depth - 1]
+        parent = rng.choice(nestable) if nestable and rng.random() < 0.7 else None
+        depths.append(0 if parent is None else depths[parent] + 1)
+        categories.append(
+            {
+                "id": _uuid(rng),
+                "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+                "description": f"{rng.choice(VERBS).title()} {rng.choice(WORDS)}s",
+                "parent_id": categories[parent]["id"] if parent is not None else None,
+                "created_at": EPOCH - timedelta(seconds=SPAN_SECONDS),
+            }
+        )
+
+    tag_names = list(WORDS) + [f"{a}-{b}" for a in WORDS for b in WORDS if a != b]
+    tag_count = min(20000, max(50, snippets // 100))
+    tag_names += [f"{rng.choice(WORDS)}-{i}" for i in range(tag_count - len(tag_names))]
+    rng.shuffle(tag_names)
+    tags = [
+        {"id": _uuid(rng), "name": name, "created_at": EPOCH}
+        for name in tag_names[:tag_count]
+    ]
+
+    collections = [
+        {
+            "id": _uuid(rng),
+            "name": f"{rng.choice(WORDS).title()} collection {i}",
+            "description": None,
+            "created_at": EPOCH,
+        }
+        for i in range(min(2000, max(5, snippets // 1000)))
+    ]
+    return {"categories": categories, "tags": tags, "collections": collections}
+
+
+def generate_code(rng: random.Random, language: str) -> str:
+    """Generate a code body with a log-normal number of lines (median ~20)."""
+    templates = LINE_TEMPLATES[language]
+    lines = []
+    for _ in range(min(4000, max(1, int(rng.lognormvariate(3.0, 1.1))))):
+        a, b, c = rng.sample(WORDS, 3)
+        verb = rng.choice(VERBS)
+        lines.append(
+            rng.choice(templates).format(
+                a=a,
+                b=b,
+                c=c,
+                A=a.title(),
+                B=b.title(),
+                C=c.title(),
+                verb=verb,
+                Verb=verb.title(),
+                n=rng.randint(0, 999),
+            )
+        )
+    return "\n".join(lines) + "\n"
+
+
+_catalog: Dict[str, Any] = {}
+
+
+def _init_worker(catalog: Dict[str, Any]) -> None:
+    _catalog.clear()
+    _catalog.update(catalog)
+    _catalog["category_ids"] = [category["id"] for category in catalog["categories"]]
+    _catalog["tag_ids"] = [tag["id"] for tag in catalog["tags"]]
+    _catalog["collection_ids"] = [c["id"] for c in catalog["collections"]]
+    _catalog["category_weights"] = zipf_cum_weights(len(catalog["categories"]), 0.8)
+    _catalog["tag_weights"] = zipf_cum_weights(len(catalog["tags"]))
+    _catalog["collection_weights"] = zipf_cum_weights(len(catalog["collections"]))
+
+
+def generate_chunk(task: Tuple[int, int, int]) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate the rows of snippets ``start`` to ``start + count``."""
+    seed, start, count = task
+    rng = random.Random(f"{seed}:snippets:{start}")
+    languages = [language for language, _ in LANGUAGES]
+    language_weights = list(accumulate(weight for _, weight in LANGUAGES))
+    threshold = settings.CODE_COMPRESSION_THRESHOLD
+
+    blobs: Dict[str, Dict[str, Any]] = {}
+    snippets, snippet_tags, memberships = [], [], []
+    recent: List[Tuple[str, str]] = []
+    for i in range(start, start + count):
+        if recent and rng.random() < 0.03:
+            # Copied snippets share one blob
+            language, code = rng.choice(recent)
+        else:
+            language = _pick(rng, languages, language_weights)
+            code = generate_code(rng, language)
+            recent.append((language, code))
+            if len(recent) > 100:
+                recent.pop(0)
+
+        code_hash = hash_code(code)
+        blob = blobs.get(code_hash)
+        if blob is None:
+            size = len(code.encode("utf-8"))
+            data = compress(code) if size > threshold else None
+            if data is not None and len(data) >= size:
+                data = None
+            blob = blobs[code_hash] = {
+                "hash": code_hash,
+                "code": None if data is not None else code,
+                "data": data,
+                "dictionary_id": None,
+                "size": size,
+                "ref_count": 0,
+            }
+        blob["ref_count"] += 1
+
+        snippet_id = _uuid(rng)
+        created_at = EPOCH - timedelta(seconds=rng.uniform(0, SPAN_SECONDS))
+        words = rng.sample(WORDS, 2)
+        snippets.append(
+            {
+                "id": snippet_id,
+                "title": f"{rng.choice(VERBS).title()} {words[0]} {words[1]} #{i}",
+                "description": (
+                    f"Shows how to {rng.choice(VERBS)} a {words[0]} in {language}"
+                    if rng.random() < 0.6
+                    else None
+                ),
+                "code_hash": code_hash,
+                "language": language,
+                "category_id": (
+                    _pick(rng, _catalog["category_ids"], _catalog["category_weights"])
+                    if rng.random() < 0.8
+                    else None
+                ),
+                "is_favorite": rng.random() < 0.05,
+                "is_deleted": rng.random() < 0.02,
+                # Most snippets are rarely opened, a few very often
+                "access_count": int(rng.paretovariate(1.2)) - 1,
+                "created_at": created_at,
+                "updated_at": created_at
+                + timedelta(
+                    seconds=rng.uniform(0, (EPOCH - created_at).total_seconds())
+                ),
+            }
+        )
+
+        tag_count = rng.choices(range(7), weights=[10, 20, 25, 20, 12, 8, 5])[0]
+        # dict.fromkeys drops repeats in draw order; set order varies by process
+        for tag_id in dict.fromkeys(
+            _pick(rng, _catalog["tag_ids"], _catalog["tag_weights"])
+            for _ in range(tag_count)
+        ):
+            snippet_tags.append({"snippet_id": snippet_id, "tag_id": tag_id})
+
+        if rng.random() < 0.15:
+            for collection_id in dict.fromkeys(
+                _pick(rng, _catalog["collection_ids"], _catalog["collection_weights"])
+                for _ in range(rng.randint(1, 3))
+            ):
+                memberships.append(
+                    {"collection_id": collection_id, "snippet_id": snippet_id}
+                )
+
+    return {
+        "blobs": list(blobs.values()),
+        "snippets": snippets,
+        "snippet_tags": snippet_tags,
+        "memberships": memberships,
+    }
+
+
+def generate(
+    path: str, snippets: int, seed: int = 1, workers: Optional[int] = None
+) -> None:
+    """Create a new SQLite database at ``path`` filled with synthetic data."""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _fast_bulk_load(dbapi_connection, connection_record):
+        # Nothing to lose if generation is interrupted; the file is rebuilt
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    catalog = build_catalog(seed, snippets)
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), catalog["categories"])
+        conn.execute(Tag.__table__.insert(), catalog["tags"])
+        conn.execute(Collection.__table__.insert(), catalog["collections"])
+
+    blob_insert = insert(CodeBlob.__table__)
+    blob_insert = blob_insert.on_conflict_do_update(
+        index_elements=["hash"],
+        set_={
+            "ref_count": CodeBlob.__table__.c.ref_count + blob_insert.excluded.ref_count
+        },
+    )
+    tasks = [
+        (seed, start, min(CHUNK_SIZE, snippets - start))
+        for start in range(0, snippets, CHUNK_SIZE)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    def insert_chunk(rows: Dict[str, List[Dict[str, Any]]]) -> None:
+        with engine.begin() as conn:
+            conn.execute(blob_insert, rows["blobs"])
+            conn.execute(Snippet.__table__.insert(), rows["snippets"])
+            if rows["snippet_tags"]:
+                conn.execute(snippet_tag.insert(), rows["snippet_tags"])
+            if rows["memberships"]:
+                conn.execute(collection_snippet.insert(), rows["memberships"])
+
+    started = time.perf_counter()
+    done = 0
+    if workers == 1:
+        _init_worker(catalog)
+        chunks = map(generate_chunk, tasks)
+        for rows in chunks:
+            insert_chunk(rows)
+            done += len(rows["snippets"])
+    else:
+        # Workers only generate; SQLite has a single writer, the parent.
+        # imap keeps chunk order, so inserts happen in the same order each run
+        with multiprocessing.Pool(workers, _init_worker, (catalog,)) as pool:
+            for rows in pool.imap(generate_chunk, tasks):
+                insert_chunk(rows)
+                done += len(rows["snippets"])
+                print(
+                    f"\r{done}/{snippets} snippets "
+                    f"({time.perf_counter() - started:.0f}s)",
+                    end="",
+                    flush=True,
+                )
+            print()
+
+    # Rows were inserted directly, so the dashboard counters start from scratch
+    with Session(engine) as db:
+        rebuild_stats(db)
+        db.commit()
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="Path of the SQLite database to create")
+    parser.add_argument("--snippets", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="Overwrite the output if it exists"
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        if not args.force:
+            parser.error(f"{args.output} exists; pass --force to overwrite it")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.output + suffix):
+                os.remove(args.output + suffix)
+
+    started = time.perf_counter()
+    generate(args.output, args.snippets, seed=args.seed, workers=args.workers)
+    print(
+        f"Generated {args.snippets} snippets in {args.output} "
+        f"in {time.perf_counter() - started:.1f}s "
+        f"({os.path.getsize(args.output) / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Load-test the API with a mix of requests modelled on the frontend.
+
+By default a single uvicorn worker is started on localhost against a copy
+of a generated dataset; ``--url`` targets a server that is already running
+and ``--in-process`` drives ``app.main.app`` directly through ASGI without
+a network hop. A number of virtual users each send one request at a time,
+picking the next operation by weight, and throughput, latency percentiles
+and error rates are reported per route.
+
+Usage: python -m scripts.loadtest [--snippets 10000] [--concurrency 16]
+           [--duration 30] [--mix list=35,search=20,...] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_MIX = (
+    "list=35,search=20,detail=15,tags=5,categories=5,favorite=10,edit=7,batch=3"
+)
+
+
+class Workload:
+    """Requests the virtual users pick from, built from the served data."""
+
+    def __init__(self, snippets: List[Dict[str, Any]], tags: List[str], seed: int):
+        self.rng = random.Random(seed)
+        self.snippet_ids = [snippet["id"] for snippet in snippets]
+        self.languages = sorted({snippet["language"] for snippet in snippets})
+        self.category_ids = sorted(
+            {snippet["categoryId"] for snippet in snippets if snippet["categoryId"]}
+        )
+        self.tags = tags or ["python"]
+        self.terms = ["session", "cache", "retry", "invoice", "parse"]
+
+    def list(self) -> Tuple[str, str, Dict[str, Any]]:
+        params: Dict[str, Any] = {"limit": 20}
+        choice = self.rng.random()
+        if choice < 0.2 and self.languages:
+            params["language"] = self.rng.choice(self.languages)
+        elif choice < 0.4:
+            params["tag"] = self.rng.choice(self.tags)
+        elif choice < 0.6 and self.category_ids:
+            params["categoryId"] = self.rng.choice(self.category_ids)
+            params["includeDescendants"] = "true"
+        elif choice < 0.7:
+            params["favorite"] = "true"
+        return "GET", "/api/snippets", {"params": params}
+
+    def search(self):
+        params = {"q": self.rng.choice(self.terms), "limit": 20}
+        return "GET", "/api/snippets/search", {"params": params}
+
+    def detail(self):
+        return "GET", f"/api/snippets/{self.rng.choice(self.snippet_ids)}", {}
+
+    def tags_list(self):
+        return "GET", "/api/tags", {}
+
+    def categories(self):
+        return "GET", "/api/categories/tree", {}
+
+    def favorite(self):
+        body = {"isFavorite": self.rng.random() < 0.5}
+        snippet_id = self.rng.choice(self.snippet_ids)
+        return "POST", f"/api/snippets/{snippet_id}/favorite", {"json": body}
+
+    def edit(self):
+        n = self.rng.getrandbits(32)
+        body = {
+            "title": f"Edited under load {n}",
+            "code": f"def handler_{n}(event):\n    return event\n",
+            "tags": self.rng.sample(self.tags, min(2, len(self.tags))),
+        }
+        snippet_id = self.rng.choice(self.snippet_ids)
+        return "PUT", f"/api/snippets/{snippet_id}", {"json": body}
+
+    def batch(self):
+        body = {
+            "operation": self.rng.choice(["favorite", "unfavorite"]),
+            "snippetIds": self.rng.sample(
+                self.snippet_ids, min(10, len(self.snippet_ids))
+            ),
+        }
+        return "POST", "/api/snippets/batch", {"json": body}
+
+
+# Operation name -> (route reported, request builder)
+OPERATIONS: Dict[str, Tuple[str, Callable[[Workload], Tuple[str, str, dict]]]] = {
+    "list": ("GET /api/snippets", Workload.list),
+    "search": ("GET /api/snippets/search", Workload.search),
+    "detail": ("GET /api/snippets/{id}", Workload.detail),
+    "tags": ("GET /api/tags", Workload.tags_list),
+    "categories": ("GET /api/categories/tree", Workload.categories),
+    "favorite": ("POST /api/snippets/{id}/favorite", Workload.favorite),
+    "edit": ("PUT /api/snippets/{id}", Workload.edit),
+    "batch": ("POST /api/snippets/batch", Workload.batch),
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse ``list=35,search=20`` into operation weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(
+                f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}"
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def build_workload(client: httpx.AsyncClient, seed: int) -> Workload:
+    """Collect snippet IDs, languages, categories and tags through the API."""
+    snippets: List[Dict[str, Any]] = []
+    for skip in range(0, 500, 100):
+        response = await client.get(
+            "/api/snippets", params={"skip": skip, "limit": 100}
+        )
+        response.raise_for_status()
+        page = response.json()["snippets"]
+        snippets.extend(page)
+        if len(page) < 100:
+            break
+    if not snippets:
+        raise SystemExit("The server has no snippets to load-test against")
+    response = await client.get("/api/tags")
+    response.raise_for_status()
+    tags = [tag["name"] for tag in response.json()["tags"]]
+    return Workload(snippets, tags, seed)
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    weights: Dict[str, float],
+    deadline: float,
+    measure_from: float,
+    samples: Dict[str, List[Tuple[float, bool]]],
+) -> None:
+    names, cum_weights = list(weights), []
+    total = 0.0
+    for weight in weights.values():
+        total += weight
+        cum_weights.append(total)
+
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        name = workload.rng.choices(names, cum_weights=cum_weights)[0]
+        route, build = OPERATIONS[name]
+        method, path, kwargs = build(workload)
+        try:
+            response = await client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if started >= measure_from:
+            samples[route].append((time.perf_counter() - started, ok))
+
+
+def summarize(
+    samples: Dict[str, List[Tuple[float, bool]]], duration: float
+) -> Dict[str, Dict[str, float]]:
+    """Compute throughput, latency percentiles and error rate per route."""
+    report = {}
+    everything = [sample for route in samples.values() for sample in route]
+    for route, route_samples in sorted(samples.items()) + [("all", everything)]:
+        if not route_samples:
+            continue
+        latencies = [latency * 1000 for latency, _ in route_samples]
+        errors = sum(1 for _, ok in route_samples if not ok)
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+        report[route] = {
+            "requests": len(route_samples),
+            "rps": round(len(route_samples) / duration, 2),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+            "p99_ms": round(p99, 3),
+            "error_rate": round(errors / len(route_samples), 4),
+        }
+    return report
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    weights: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+) -> Dict[str, Dict[str, float]]:
+    workload = await build_workload(client, seed)
+    samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+    await asyncio.gather(
+        *(
+            virtual_user(client, workload, weights, deadline, measure_from, samples)
+            for _ in range(concurrency)
+        )
+    )
+    return summarize(samples, duration)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database: str, port: int) -> subprocess.Popen:
+    """Start one uvicorn worker serving ``database`` on localhost."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            "1",
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("The server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("The server did not start within 30 seconds")
+
+
+def prepare_database(args: argparse.Namespace, path: str) -> None:
+    """Copy the dataset to load-test against, generating it if needed."""
+    # Imported here as it loads the settings, which --in-process has to
+    # point at the copy first
+    from scripts.generate_data import generate
+
+    source = args.database
+    if source is None:
+        source = os.path.join(os.path.dirname(path), "source.db")
+        print(f"Generating {args.snippets} snippets...")
+        generate(source, args.snippets, seed=args.seed)
+    shutil.copyfile(source, path)
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'route':<36}{'requests':>9}{'req/s':>9}{'p50 ms':>9}"
+        f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    )
+    for route, row in report.items():
+        print(
+            f"{route:<36}{row['requests']:>9}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}"
+            f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['error_rate']:>8.2%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Load-test a server that is already running")
+    target.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Call app.main.app through ASGI instead of over HTTP",
+    )
+    parser.add_argument(
+        "--database", help="Dataset to copy and serve (default: generate one)"
+    )
+    parser.add_argument("--snippets", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=3.0, help="Seconds not measured"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+    weights = parse_mix(args.mix)
+
+    workdir = tempfile.mkdtemp(prefix="snippet-load-")
+    server: Optional[subprocess.Popen] = None
+    try:
+        if args.url:
+            base_url, transport = args.url, None
+        else:
+            database = os.path.join(workdir, "loadtest.db")
+            if args.in_process:
+                os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+            prepare_database(args, database)
+            if args.in_process:
+                from app.main import app
+
+                base_url, transport = "http://loadtest", httpx.ASGITransport(app)
+            else:
+                port = _free_port()
+                server = start_server(database, port)
+                base_url, transport = f"http://127.0.0.1:{port}", None
+
+        async def run() -> Dict[str, Dict[str, float]]:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(
+                base_url=base_url, transport=transport, limits=limits, timeout=60
+            ) as client:
+                return await run_load(
+                    client,
+                    weights,
+                    args.concurrency,
+                    args.duration,
+                    args.warmup,
+                    args.seed,
+                )
+
+        print(
+            f"{args.concurrency} users for {args.duration:g}s against {base_url} "
+            f"({args.mix})"
+        )
+        report = asyncio.run(run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+    if args.output:
+        document = {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": weights,
+            "routes": report,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Script to move inline snippet code of an existing database into code blobs.
+"""
+
+from collections import Counter
+
+from sqlalchemy import Engine, inspect, text
+
+import app.models  # noqa: F401 registers the tables
+from app.database import Base, engine, upgrade_schema
+from app.models.blob import hash_code
+
+
+def migrate_code_blobs(bind: Engine = engine) -> None:
+    """Replace ``snippets.code`` with ``snippets.code_hash`` and shared blobs.
+
+    Runs before the generic schema upgrade, which cannot add the required
+    ``code_hash`` column itself, and can be run again after a failure.
+    """
+    columns = {column["name"] for column in inspect(bind).get_columns("snippets")}
+    if "code" not in columns:
+        print("Nothing to migrate")
+        return
+
+    # Only creates the tables that are missing, such as code_blobs
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        # Left behind by an earlier run that failed after adding it
+        if "code_hash" not in columns:
+            conn.execute(text("ALTER TABLE snippets ADD COLUMN code_hash VARCHAR(64)"))
+
+        rows = conn.execute(text("SELECT id, code FROM snippets")).all()
+        refs = Counter()
+        bodies = {}
+        for snippet_id, code in rows:
+            code_hash = hash_code(code)
+            refs[code_hash] += 1
+            bodies[code_hash] = code
+            conn.execute(
+                text("UPDATE snippets SET code_hash = :hash WHERE id = :id"),
+                {"hash": code_hash, "id": snippet_id},
+            )
+        for code_hash, count in refs.items():
+            code = bodies[code_hash]
+            conn.execute(
+                text(
+                    "INSERT INTO code_blobs (hash, code, size, ref_count) "
+                    "VALUES (:hash, :code, :size, :refs)"
+                ),
+                {
+                    "hash": code_hash,
+                    "code": code,
+                    "size": len(code.encode("utf-8")),
+                    "refs": count,
+                },
+            )
+        # Needs SQLite 3.35+
+        conn.execute(text("ALTER TABLE snippets DROP COLUMN code"))
+    # Adds the remaining new columns and indexes, ix_snippets_code_hash included
+    upgrade_schema(bind)
+
+    print(f"Moved {len(rows)} snippets into {len(refs)} code blobs")
+
+
+if __name__ == "__main__":
+    migrate_code_blobs()
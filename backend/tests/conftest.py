@@ -1,56 +1,91 @@
 import os
+from contextlib import contextmanager
+from typing import Iterator, List
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
-
-from app.database import Base
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+# Each pytest-xdist worker gets its own database file so the suite can run
+# in parallel (``pytest -n auto``). The app's own engine is pointed at it as
+# well, so tests never touch the development database.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEST_DATABASE_PATH = f"./test-{WORKER}.db"
+TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["DEBUG_ENDPOINTS_ENABLED"] = "true"
+
+from app.crud import bootstrap as bootstrap_crud
+from app.crud import category as category_crud
+from app.crud import duplicates as duplicates_crud
+from app.crud import similar as similar_crud
+from app.crud import snippet as snippet_crud
+from app.crud import suggest as suggest_crud
+from app.database import Base, upgrade_schema
 from app.main import app
 
 
-# Use an in-memory SQLite database for testing
-TEST_DATABASE_URL = "sqlite:///./test.db"
-
-
 @pytest.fixture(scope="session")
 def test_db_engine():
     """Create a test database engine."""
+    if os.path.exists(TEST_DATABASE_PATH):
+        os.remove(TEST_DATABASE_PATH)
     engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+
+    # pysqlite begins and commits transactions on its own, which breaks
+    # SAVEPOINT; let SQLAlchemy emit BEGIN instead
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
     # Remove the test database file
-    if os.path.exists("./test.db"):
-        os.remove("./test.db")
+    if os.path.exists(TEST_DATABASE_PATH):
+        os.remove(TEST_DATABASE_PATH)
 
 
 @pytest.fixture(scope="function")
 def db_session(test_db_engine):
-    """Create a test database session."""
-    # 创建一个临时会话来清除所有表中的数据
-    TestingSessionLocal = sessionmaker(
-        autocommit=False, autoflush=False, bind=test_db_engine
-    )
-    temp_session = TestingSessionLocal()
+    """Create a test database session.
+
+    The session runs inside a transaction that is rolled back after the
+    test; its commits only release SAVEPOINTs, so nothing reaches the file.
+    """
+    connection = test_db_engine.connect()
+    transaction = connection.begin()
 
-    # 清除所有表中的数据
-    for table in reversed(Base.metadata.sorted_tables):
-        temp_session.execute(table.delete())
-    temp_session.commit()
-    temp_session.close()
+    # 清除依赖于数据库内容的进程内缓存
+    category_crud.invalidate_category_tree()
+    suggest_crud.reset_suggestions()
+    similar_crud.reset_similarity_index()
+    duplicates_crud.reset_duplicate_index()
+    bootstrap_crud.reset_bootstrap_cache()
 
     # 创建测试会话
-    session = TestingSessionLocal()
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
     try:
         yield session
     finally:
-        session.rollback()
         session.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, monkeypatch):
     """Create a test client with a test database session."""
 
     def override_get_db():
@@ -63,6 +98,57 @@ def client(db_session):
     from app.database import get_db
 
     app.dependency_overrides = {get_db: override_get_db}
+    # Work done after a response, such as counting snippet openings, opens
+    # sessions of its own; keep them inside the test transaction as well
+    monkeypatch.setattr(
+        snippet_crud,
+        "SessionLocal",
+        sessionmaker(
+            bind=db_session.bind,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        ),
+    )
 
     with TestClient(app) as test_client:
         yield test_client
+
+
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryCounter:
+    """Records the SQL statements run on the test database."""
+
+    def __init__(self, session):
+        self.session = session
+        self.statements: List[str] = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINTs only exist because of the test transaction
+        if not statement.startswith(_SAVEPOINT_STATEMENTS):
+            self.statements.append(statement)
+
+    @contextmanager
+    def assert_max(self, limit: int) -> Iterator[None]:
+        """Fail if the enclosed code runs more than ``limit`` statements.
+
+        The session is expired first, so objects created by fixtures are
+        loaded again as they would be in a fresh request.
+        """
+        self.session.expire_all()
+        start = len(self.statements)
+        yield
+        executed = self.statements[start:]
+        assert (
+            len(executed) <= limit
+        ), f"{len(executed)} queries, expected at most {limit}:\n" + "\n".join(executed)
+
+
+@pytest.fixture(scope="function")
+def query_counter(test_db_engine, db_session):
+    """Count queries per API call, e.g. ``with query_counter.assert_max(3):``."""
+    counter = QueryCounter(db_session)
+    event.listen(test_db_engine, "before_cursor_execute", counter.record)
+    yield counter
+    event.remove(test_db_engine, "before_cursor_execute", counter.record)
@@ -5,6 +5,7 @@ Script to run all tests for the Code Snippet Manager backend.
 
 import os
 import sys
+
 import pytest
 
 
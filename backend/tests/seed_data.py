@@ -6,6 +6,7 @@ import uuid
 
 from sqlalchemy.orm import Session
 
+from app.crud.stats import rebuild_stats
 from app.models import Snippet, Category, Tag, Collection
 from app.database import SessionLocal
 
@@ -295,6 +296,9 @@ def seed_database():
         tags = seed_tags(db)
         collections = seed_collections(db)
         snippets = seed_snippets(db, categories, tags, collections)
+        # Rows were added directly, so recount the dashboard statistics
+        rebuild_stats(db)
+        db.commit()
         print(
             f"Seeded {len(categories)} categories, {len(tags)} tags, {len(collections)} collections, and {len(snippets)} snippets."
         )
@@ -0,0 +1,74 @@
+"""
+Tests for the batch API endpoint.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.crud import tag as tag_crud
+
+
+def test_run_batch(client: TestClient):
+    """Test POST /api/batch endpoint."""
+    response = client.post(
+        "/api/batch",
+        json={
+            "requests": [
+                {"method": "POST", "path": "/tags", "body": {"name": "shell"}},
+                {
+                    "method": "POST",
+                    "path": "/snippets",
+                    "body": {
+                        "title": "List files",
+                        "code": "ls -la",
+                        "language": "bash",
+                        "tags": ["shell"],
+                    },
+                },
+                {"path": "/tags"},
+                {"path": "/snippets", "query": {"tag": "shell", "page": 1}},
+                {"path": "/snippets/missing"},
+                {"path": "/events"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [r["status"] for r in responses] == [201, 201, 200, 200, 404, 400]
+
+    snippet = responses[1]["body"]["snippet"]
+    assert snippet["tags"] == ["shell"]
+    assert [t["name"] for t in responses[2]["body"]["tags"]] == ["shell"]
+    assert [s["id"] for s in responses[3]["body"]["snippets"]] == [snippet["id"]]
+
+    # Writes made inside the batch are committed
+    response = client.get(f"/api/snippets/{snippet['id']}")
+    assert response.status_code == 200
+
+
+def test_run_batch_server_error(client: TestClient, monkeypatch):
+    """A sub-request that fails with a 500 does not stop the batch."""
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(tag_crud, "get_tags", broken)
+    response = client.post(
+        "/api/batch",
+        json={
+            "requests": [
+                {"method": "POST", "path": "/tags", "body": {"name": "shell"}},
+                {"path": "/tags"},
+                {"method": "POST", "path": "/tags", "body": {"name": "python"}},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [r["status"] for r in responses] == [201, 500, 201]
+    assert responses[2]["body"]["tag"]["name"] == "python"
+
+
+def test_run_batch_too_large(client: TestClient):
+    """Test that oversized batches are rejected."""
+    response = client.post("/api/batch", json={"requests": [{"path": "/tags"}] * 51})
+    assert response.status_code == 422
@@ -0,0 +1,69 @@
+"""
+Tests for the bootstrap API endpoint.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.crud import bootstrap as bootstrap_crud
+
+
+def test_get_bootstrap(client: TestClient):
+    """Test GET /api/bootstrap endpoint."""
+    category = client.post("/api/categories", json={"name": "Scripts"}).json()[
+        "category"
+    ]
+    client.post("/api/collections", json={"name": "Daily"})
+    for title in ["One", "Two"]:
+        client.post(
+            "/api/snippets",
+            json={
+                "title": title,
+                "code": f"print('{title}')",
+                "language": "python",
+                "categoryId": category["id"],
+                "tags": ["shell"],
+            },
+        )
+
+    response = client.get("/api/bootstrap")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    data = response.json()
+    assert data["categories"][0]["snippetCount"] == 2
+    assert [(t["name"], t["snippetCount"]) for t in data["tags"]] == [("shell", 2)]
+    assert [c["name"] for c in data["collections"]] == ["Daily"]
+    assert {s["title"] for s in data["snippets"]} == {"One", "Two"}
+    assert data["snippets"][0]["tags"] == ["shell"]
+
+    etag = response.headers["etag"]
+    response = client.get("/api/bootstrap", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/bootstrap", params={"snippetLimit": 1})
+    assert len(response.json()["snippets"]) == 1
+    assert response.headers["etag"] != etag
+
+    # Any write moves the ETag on
+    client.post("/api/tags", json={"name": "new"})
+    response = client.get("/api/bootstrap", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()["tags"]) == 2
+
+
+def test_get_bootstrap_during_writes(client: TestClient, db_session, monkeypatch):
+    """A payload read while writes keep landing keeps the seq it started at."""
+    client.post("/api/tags", json={"name": "shell"})
+    seqs = iter(range(100, 200))
+    monkeypatch.setattr(bootstrap_crud, "get_latest_seq", lambda db: next(seqs))
+    bootstrap_crud.reset_bootstrap_cache()
+
+    # Every snapshot attempt sees a newer seq after it: 100, 101, 102, 103
+    seq, body, _ = bootstrap_crud.get_bootstrap(db_session)
+    assert seq == 102
+    assert json.loads(body)["seq"] == 102
+    assert [t["name"] for t in json.loads(body)["tags"]] == ["shell"]
+    # It is not what seq 102 stands for, so it is not cached
+    assert bootstrap_crud._cache == {}
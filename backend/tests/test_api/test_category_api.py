@@ -0,0 +1,129 @@
+"""
+Tests for category API endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.crud import category as category_crud
+from app.crud import snippet as snippet_crud
+from app.schemas.category import CategoryCreate
+from app.schemas.snippet import SnippetCreate
+
+
+def test_get_category_tree(client: TestClient, db_session: Session):
+    """Test GET /api/categories/tree endpoint."""
+    root = category_crud.create_category(db_session, CategoryCreate(name="Root"))
+    child = category_crud.create_category(
+        db_session, CategoryCreate(name="Child", parent_id=root.id)
+    )
+
+    response = client.get("/api/categories/tree")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["categories"]) == 1
+    assert data["categories"][0]["id"] == root.id
+    assert data["categories"][0]["subtreeSnippetCount"] == 0
+    assert data["categories"][0]["children"][0]["id"] == child.id
+
+    # Snippet writes invalidate the cached tree
+    response = client.post(
+        "/api/snippets",
+        json={
+            "title": "Tree snippet",
+            "code": "print('tree')",
+            "language": "python",
+            "categoryId": child.id,
+        },
+    )
+    assert response.status_code == 201
+
+    response = client.get("/api/categories/tree")
+    root_node = response.json()["categories"][0]
+    assert root_node["snippetCount"] == 0
+    assert root_node["subtreeSnippetCount"] == 1
+    assert root_node["children"][0]["snippetCount"] == 1
+
+
+def test_get_category_snippets(client: TestClient, db_session: Session):
+    """Test GET /api/categories/{id}/snippets endpoint."""
+    category = category_crud.create_category(db_session, CategoryCreate(name="Lang"))
+    response = client.post(
+        "/api/snippets",
+        json={
+            "title": "Tagged snippet",
+            "code": "print('tagged')",
+            "language": "python",
+            "categoryId": category.id,
+            "tags": ["demo"],
+        },
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"/api/categories/{category.id}/snippets")
+    assert response.status_code == 200
+    snippets = response.json()["snippets"]
+    assert [s["code"] for s in snippets] == ["print('tagged')"]
+    assert snippets[0]["tags"] == ["demo"]
+
+
+@pytest.fixture
+def categories_with_snippets(db_session: Session):
+    """Create six categories; category i holds i + 1 tagged snippets."""
+    categories = []
+    for i in range(6):
+        category = category_crud.create_category(
+            db_session, CategoryCreate(name=f"Category {i}")
+        )
+        for n in range(i + 1):
+            snippet_crud.create_snippet(
+                db_session,
+                SnippetCreate(
+                    title=f"Snippet {i}.{n}",
+                    code=f"print({i}, {n})",
+                    language="python",
+                    category_id=category.id,
+                    tags=["sorted"],
+                ),
+            )
+        categories.append(category)
+    return categories
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_get_categories(
+    client: TestClient, query_counter, categories_with_snippets, limit
+):
+    """Test GET /api/categories returns counts with the same queries for any page."""
+    with query_counter.assert_max(2):
+        response = client.get(f"/api/categories?limit={limit}")
+    assert response.status_code == 200
+    categories = response.json()["categories"]
+    assert len(categories) == limit
+    for category in categories:
+        assert category["snippetCount"] == int(category["name"].split()[1]) + 1
+
+
+def test_get_category_tree_query_count(
+    client: TestClient, query_counter, categories_with_snippets
+):
+    """Test GET /api/categories/tree query count."""
+    with query_counter.assert_max(2):
+        response = client.get("/api/categories/tree")
+    assert response.status_code == 200
+    assert len(response.json()["categories"]) == 6
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_get_category_snippets_query_count(
+    client: TestClient, query_counter, categories_with_snippets, limit
+):
+    """Test GET /api/categories/{id}/snippets query count."""
+    url = f"/api/categories/{categories_with_snippets[-1].id}/snippets?limit={limit}"
+    with query_counter.assert_max(5):
+        response = client.get(url)
+    assert response.status_code == 200
+    snippets = response.json()["snippets"]
+    assert len(snippets) == limit
+    assert all(snippet["tags"] == ["sorted"] for snippet in snippets)
@@ -0,0 +1,112 @@
+"""
+Tests for the change feed API endpoint.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+
+
+def test_get_changes(client: TestClient):
+    """Test GET /api/changes endpoint."""
+    response = client.post(
+        "/api/snippets",
+        json={
+            "title": "Synced",
+            "code": "print('sync')",
+            "language": "python",
+            "tags": ["sync"],
+        },
+    )
+    snippet_id = response.json()["snippet"]["id"]
+    collection_id = client.post("/api/collections", json={"name": "Mine"}).json()[
+        "collection"
+    ]["id"]
+    client.post(f"/api/collections/{collection_id}/snippets/{snippet_id}")
+
+    response = client.get("/api/changes")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hasMore"] is False
+    feed = {(c["entity"], c["id"]): c for c in data["changes"]}
+    assert feed[("snippet", snippet_id)]["data"]["tags"] == ["sync"]
+    assert feed[("collection", collection_id)]["op"] == "upsert"
+    membership = feed[("collection_snippet", f"{collection_id}/{snippet_id}")]
+    assert membership["data"] == {
+        "collectionId": collection_id,
+        "snippetId": snippet_id,
+    }
+    tag_id = next(c["id"] for c in data["changes"] if c["entity"] == "tag")
+
+    # Only what changed after the cursor comes back, collapsed per entity
+    cursor = data["cursor"]
+    client.put(f"/api/snippets/{snippet_id}", json={"title": "Renamed"})
+    client.put(f"/api/snippets/{snippet_id}", json={"title": "Renamed again"})
+    client.put(f"/api/tags/{tag_id}", json={"name": "synced"})
+    client.delete(f"/api/collections/{collection_id}/snippets/{snippet_id}")
+
+    changes = client.get("/api/changes", params={"since": cursor}).json()["changes"]
+    assert [(c["entity"], c["op"]) for c in changes] == [
+        ("snippet", "upsert"),
+        ("tag", "upsert"),
+        ("collection_snippet", "delete"),
+    ]
+    assert changes[0]["data"]["title"] == "Renamed again"
+    assert changes[0]["data"]["tags"] == ["synced"]
+
+    # Deletes come back as tombstones
+    cursor = client.get("/api/changes", params={"since": cursor}).json()["cursor"]
+    client.delete(f"/api/snippets/{snippet_id}/permanent")
+    changes = client.get("/api/changes", params={"since": cursor}).json()["changes"]
+    assert changes == [
+        {
+            "seq": changes[0]["seq"],
+            "entity": "snippet",
+            "id": snippet_id,
+            "op": "delete",
+            "data": None,
+        }
+    ]
+
+
+def test_get_changes_paging(client: TestClient):
+    """Test paging through the change feed with limit and cursor."""
+    for name in ["a", "b", "c"]:
+        client.post("/api/tags", json={"name": name})
+
+    first = client.get("/api/changes", params={"limit": 2}).json()
+    assert len(first["changes"]) == 2
+    assert first["hasMore"] is True
+
+    rest = client.get(
+        "/api/changes", params={"since": first["cursor"], "limit": 2}
+    ).json()
+    assert [c["data"]["name"] for c in rest["changes"]] == ["c"]
+    assert rest["hasMore"] is False
+
+
+@pytest.mark.parametrize("count", [2, 20])
+def test_get_changes_query_count(client: TestClient, query_counter, monkeypatch, count):
+    """The feed runs the same few queries whatever the number of snippets."""
+    monkeypatch.setattr(settings, "CODE_COMPRESSION_THRESHOLD", 256)
+    for n in range(count):
+        code = "".join(f"value_{n}_{i} = compute({i})\n" for i in range(40))
+        client.post(
+            "/api/snippets",
+            json={
+                "title": f"Synced {n}",
+                "code": code,
+                "language": "python",
+                "tags": ["sync", f"tag-{n}"],
+            },
+        )
+
+    # The log, then snippets, their tags and code bodies, and the tags
+    with query_counter.assert_max(5):
+        response = client.get("/api/changes")
+    changes = response.json()["changes"]
+    snippets = [c["data"] for c in changes if c["entity"] == "snippet"]
+    assert len(snippets) == count
+    assert all(len(snippet["tags"]) == 2 for snippet in snippets)
+    assert all(snippet["code"].startswith("value_") for snippet in snippets)
@@ -0,0 +1,95 @@
+"""
+Tests for collection API endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.crud import collection as collection_crud
+from app.crud import snippet as snippet_crud
+from app.schemas.collection import CollectionCreate
+from app.schemas.snippet import SnippetCreate
+
+
+@pytest.fixture
+def collection_with_snippets(db_session: Session):
+    """Create a collection holding six tagged snippets."""
+    collection = collection_crud.create_collection(
+        db_session, CollectionCreate(name="Favorites of the week")
+    )
+    for i in range(6):
+        snippet = snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=f"Collected snippet {i}",
+                code=f"print({i})",
+                language="python",
+                tags=["collected", f"item-{i}"],
+            ),
+        )
+        collection_crud.add_snippet_to_collection(db_session, collection.id, snippet.id)
+    return collection
+
+
+def test_get_collections(client: TestClient, query_counter, db_session: Session):
+    """Test GET /api/collections endpoint."""
+    for i in range(3):
+        collection_crud.create_collection(
+            db_session, CollectionCreate(name=f"Collection {i}")
+        )
+
+    with query_counter.assert_max(1):
+        response = client.get("/api/collections")
+    assert response.status_code == 200
+    assert len(response.json()["collections"]) == 3
+
+
+def test_create_and_get_collection(client: TestClient, query_counter):
+    """Test POST and GET /api/collections/{collection_id} endpoints."""
+    response = client.post("/api/collections", json={"name": "Snippets to review"})
+    assert response.status_code == 201
+    collection_id = response.json()["collection"]["id"]
+
+    with query_counter.assert_max(1):
+        response = client.get(f"/api/collections/{collection_id}")
+    assert response.status_code == 200
+    assert response.json()["collection"]["name"] == "Snippets to review"
+
+    response = client.get("/api/collections/non-existent-id")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_get_snippets_in_collection(
+    client: TestClient, query_counter, collection_with_snippets, limit
+):
+    """Test GET /api/collections/{collection_id}/snippets endpoint."""
+    url = f"/api/collections/{collection_with_snippets.id}/snippets?limit={limit}"
+    with query_counter.assert_max(4):
+        response = client.get(url)
+    assert response.status_code == 200
+    snippets = response.json()["snippets"]
+    assert len(snippets) == limit
+    assert all("collected" in snippet["tags"] for snippet in snippets)
+
+
+def test_add_and_remove_snippet(
+    client: TestClient, db_session: Session, collection_with_snippets
+):
+    """Test adding and removing a snippet through the API."""
+    snippet = snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(title="Loose snippet", code="pass", language="python"),
+    )
+    base = f"/api/collections/{collection_with_snippets.id}/snippets"
+
+    response = client.post(f"{base}/{snippet.id}")
+    assert response.status_code == 200
+    response = client.get(base)
+    assert len(response.json()["snippets"]) == 7
+
+    response = client.delete(f"{base}/{snippet.id}")
+    assert response.status_code == 200
+    response = client.get(base)
+    assert len(response.json()["snippets"]) == 6
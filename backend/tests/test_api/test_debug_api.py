@@ -0,0 +1,74 @@
+"""
+Tests for the debug API endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.utils.slow_queries import slow_query_log, watch_slow_queries
+
+
+@pytest.fixture
+def log_all_queries(test_db_engine):
+    """Record every query on the test engine in the slow-query log."""
+    watch_slow_queries(test_db_engine)
+    threshold_ms = slow_query_log.threshold_ms
+    slow_query_log.threshold_ms = 0
+    slow_query_log.clear()
+    yield slow_query_log
+    slow_query_log.threshold_ms = threshold_ms
+    slow_query_log.clear()
+
+
+def test_get_slow_queries(client: TestClient, log_all_queries):
+    """Test GET /api/debug/slow-queries endpoint."""
+    client.post("/api/tags", json={"name": "secret-tag"})
+    client.get("/api/tags/suggest", params={"prefix": "secret"})
+
+    response = client.get("/api/debug/slow-queries")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["thresholdMs"] == 0
+
+    query = next(
+        q for q in data["queries"] if q["caller"] == "app.crud.tag.get_tag_by_name"
+    )
+    assert query["durationMs"] >= 0
+    assert query["plan"]
+    # Parameter values are never recorded, only their types
+    assert "secret-tag" not in str(query["parameters"])
+    assert "str" in query["parameters"]
+
+    response = client.delete("/api/debug/slow-queries")
+    assert response.json() == {"success": True}
+    assert client.get("/api/debug/slow-queries").json()["queries"] == []
+
+
+def test_profile_request(client: TestClient):
+    """Test profiling a request and downloading its collapsed stacks."""
+    client.post(
+        "/api/snippets",
+        json={"title": "Slow", "code": "print(1)", "language": "python"},
+    )
+
+    response = client.get("/api/snippets/search", params={"q": "slow", "profile": 1})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    response = client.get(f"/api/debug/profiles/{profile_id}")
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) >= 1
+        assert "app.utils.profiler:ProfilerMiddleware.__call__" not in stack
+
+    assert "x-profile-id" not in client.get("/api/tags").headers
+    assert client.get("/api/debug/profiles/missing").status_code == 404
+
+
+def test_debug_endpoints_are_off_by_default(monkeypatch):
+    """The debug endpoints are only served when explicitly enabled."""
+    monkeypatch.delenv("DEBUG_ENDPOINTS_ENABLED")
+    assert Settings().DEBUG_ENDPOINTS_ENABLED is False
@@ -0,0 +1,55 @@
+"""
+Tests for the server-sent events API endpoint.
+"""
+
+import asyncio
+
+from app.database import engine
+from app.main import app
+
+
+def test_open_streams_hold_no_connections(test_db_engine, monkeypatch):
+    """Test that streams replaying a backlog return their connection to the pool."""
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/events",
+        "raw_path": b"/api/events",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"last-event-id", b"0")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def open_stream(disconnected: asyncio.Event):
+        sent: asyncio.Queue = asyncio.Queue()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        task = asyncio.create_task(app(scope, receive, sent.put))
+        assert (await sent.get())["type"] == "http.response.start"
+        assert (await sent.get())["body"] == b"retry: 3000\n\n"
+        return task
+
+    async def scenario():
+        disconnected = asyncio.Event()
+        streams = [await open_stream(disconnected) for _ in range(8)]
+        try:
+            assert engine.pool.checkedout() == 0
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(asyncio.gather(*streams), timeout=5)
+
+    asyncio.run(scenario())
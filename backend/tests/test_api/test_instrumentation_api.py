@@ -0,0 +1,49 @@
+"""
+Tests for per-request query counting and timing.
+"""
+
+import re
+
+from fastapi.testclient import TestClient
+
+from app.models import Tag
+from app.utils.instrumentation import collect_metrics, instrument_engine
+
+
+def parse_server_timing(header: str) -> dict:
+    """Map each Server-Timing metric name to its parameters."""
+    metrics = {}
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header(client: TestClient, test_db_engine):
+    """Test that responses report their SQL and serialization figures."""
+    instrument_engine(test_db_engine)
+    for name in ["python", "bash"]:
+        client.post("/api/tags", json={"name": name})
+
+    response = client.get("/api/tags")
+    assert response.status_code == 200
+    metrics = parse_server_timing(response.headers["server-timing"])
+    assert set(metrics) == {"sql", "rows", "serialize", "total"}
+    assert int(re.match(r'"(\d+) queries"', metrics["sql"]["desc"]).group(1)) >= 1
+    assert int(metrics["rows"]["desc"].strip('"')) >= 2
+    assert float(metrics["sql"]["dur"]) <= float(metrics["total"]["dur"])
+    assert float(metrics["serialize"]["dur"]) >= 0
+
+
+def test_rows_counted_while_streaming(test_db_engine, db_session):
+    """Rows of streamed results are counted as they are fetched."""
+    instrument_engine(test_db_engine)
+    db_session.add_all([Tag(name=f"tag-{n}") for n in range(5)])
+    db_session.commit()
+
+    with collect_metrics() as metrics:
+        tags = iter(db_session.query(Tag).yield_per(2))
+        next(tags)
+        assert metrics.rows == 2
+        assert len(list(tags)) == 4
+    assert metrics.rows == 5
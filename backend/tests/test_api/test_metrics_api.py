@@ -0,0 +1,76 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+
+import re
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import Counter, Histogram, Registry, observe_engine
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Return the value of one sample in Prometheus text output."""
+    for line in text.splitlines():
+        match = re.match(r"([a-z_]+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ""))
+        if found == labels:
+            return float(match.group(3))
+    return 0.0
+
+
+def test_get_metrics(client: TestClient, test_db_engine):
+    """Test GET /metrics endpoint."""
+    observe_engine(test_db_engine)
+    before = client.get("/metrics").text
+
+    client.get("/api/categories/tree")
+    client.get("/api/categories/tree")
+    client.get("/api/snippets/missing")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    route = "/api/snippets/{snippet_id}"
+    assert delta("http_responses_total", method="GET", route=route, status="404") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route=route) == 1
+    assert delta("cache_lookups_total", cache="category_tree", result="miss") == 1
+    assert delta("cache_lookups_total", cache="category_tree", result="hit") == 1
+    # The scrape itself is the only request in flight
+    assert sample(after, "http_requests_in_flight") == 1
+    assert "db_pool_checkout_wait_seconds_bucket" in after
+
+
+def test_metrics_merge_thread_shards():
+    """Test that updates from several threads are all counted."""
+    registry = Registry()
+    counter = Counter("jobs_total", "Jobs.", ("kind",), registry=registry)
+    histogram = Histogram(
+        "job_seconds", "Job time.", buckets=(0.1, 1), registry=registry
+    )
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("build",))
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert sample(text, "jobs_total", kind="build") == 4000
+    assert sample(text, "job_seconds_bucket", le="0.1") == 0
+    assert sample(text, "job_seconds_bucket", le="1") == 4000
+    assert sample(text, "job_seconds_bucket", le="+Inf") == 4000
+    assert sample(text, "job_seconds_sum") == 2000
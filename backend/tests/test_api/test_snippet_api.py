@@ -4,14 +4,18 @@ Tests for snippet API endpoints.
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.config import settings
 from app.crud import snippet as snippet_crud
 from app.crud import category as category_crud
 from app.crud import tag as tag_crud
 from app.schemas.category import CategoryCreate
 from app.schemas.tag import TagCreate
 from app.schemas.snippet import SnippetCreate
+from app.models import blob as blob_module
+from app.utils.compression import decompress
 import uuid
 
 
@@ -280,3 +284,292 @@ def test_batch_operations(client: TestClient, db_session: Session, test_category
     data = response.json()
     assert data["success"] is True
     assert data["count"] == 2
+
+
+def test_get_snippets_by_tag_expression(client: TestClient, test_snippet, test_tags):
+    """Test GET /api/snippets with a tag expression."""
+    response = client.get(
+        "/api/snippets",
+        params={"tags": f"{test_tags[0].name} AND NOT {test_tags[1].name}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["snippets"] == []
+
+    response = client.get(
+        "/api/snippets",
+        params={"tags": f"{test_tags[0].name} AND {test_tags[1].name}"},
+    )
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()["snippets"]] == [test_snippet.id]
+
+    # Malformed expressions are rejected
+    response = client.get("/api/snippets", params={"tags": "(python AND"})
+    assert response.status_code == 400
+
+    # So are expressions too large to parse or query safely
+    for expression in [
+        "NOT " * 5000 + "python",
+        "(" * 5000 + "python" + ")" * 5000,
+        " AND ".join(f"tag-{i}" for i in range(51)),
+    ]:
+        response = client.get("/api/snippets", params={"tags": expression})
+        assert response.status_code == 400
+
+    # The largest allowed expression still runs
+    expression = " OR ".join(f"tag-{i}" for i in range(30))
+    expression = "(" * 20 + expression + ")" * 20
+    expression += " AND " + " AND ".join(f"NOT tag-{i}" for i in range(20))
+    response = client.get("/api/snippets", params={"tags": expression})
+    assert response.status_code == 200
+
+
+def test_search_snippets_with_facets(client: TestClient, test_snippet, test_tags):
+    """Test GET /api/snippets/search with facet counts."""
+    response = client.get("/api/snippets/search", params={"q": "Test"})
+    assert response.json()["facets"] is None
+
+    response = client.get("/api/snippets/search", params={"q": "Test", "facets": True})
+    assert response.status_code == 200
+    facets = response.json()["facets"]
+    assert facets["language"] == [{"value": "python", "label": "python", "count": 1}]
+    assert facets["category"][0]["value"] == test_snippet.category_id
+    assert len(facets["tag"]) == 2
+
+
+def test_list_snippets_leave_out_compressed_code(
+    client: TestClient, db_session: Session, monkeypatch
+):
+    """Lists never inflate compressed code; the snippet itself has it."""
+    monkeypatch.setattr(settings, "CODE_COMPRESSION_THRESHOLD", 256)
+    code = "".join(f"value_{i} = compute({i})\n" for i in range(40))
+    snippet = snippet_crud.create_snippet(
+        db_session, SnippetCreate(title="Large", code=code, language="python")
+    )
+
+    inflated = []
+    monkeypatch.setattr(
+        blob_module,
+        "decompress",
+        lambda data, dictionary: inflated.append(data) or decompress(data, dictionary),
+    )
+    for url in ["/api/snippets", "/api/snippets/search?q=Large"]:
+        listed = client.get(url).json()["snippets"]
+        assert [(s["code"], s["codeTruncated"]) for s in listed] == [("", True)]
+    assert inflated == []
+
+    # Code matches are still found, by inflating only the rows they need
+    listed = client.get("/api/snippets/search?q=value_39").json()["snippets"]
+    assert [s["id"] for s in listed] == [snippet.id]
+    assert len(inflated) == 1
+
+    response = client.get(f"/api/snippets/{snippet.id}")
+    assert response.json()["snippet"]["code"] == code
+
+
+def test_suggest_titles(client: TestClient, test_snippet):
+    """Test GET /api/snippets/suggest endpoint."""
+    response = client.get("/api/snippets/suggest", params={"prefix": "test sn"})
+    assert response.status_code == 200
+    assert response.json()["suggestions"] == [{"value": "Test Snippet", "count": 1}]
+
+
+def test_get_similar_snippets(client: TestClient, db_session: Session, test_snippet):
+    """Test GET /api/snippets/{snippet_id}/similar endpoint."""
+    similar = snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(
+            title="Test Snippet copy",
+            code="print('Hello, World!')",
+            language="python",
+        ),
+    )
+
+    response = client.get(f"/api/snippets/{test_snippet.id}/similar")
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["id"] for s in data["snippets"]] == [similar.id]
+    assert data["snippets"][0]["score"] > 0
+
+    response = client.get("/api/snippets/non-existent-id/similar")
+    assert response.status_code == 404
+
+
+def test_create_snippet_with_duplicate_check(client: TestClient, test_snippet):
+    """Test POST /api/snippets?checkDuplicates=true and duplicate report."""
+    snippet_data = {
+        "title": "Copied Snippet",
+        "code": test_snippet.code,
+        "language": "python",
+    }
+    response = client.post(
+        "/api/snippets", json=snippet_data, params={"checkDuplicates": True}
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["duplicates"] == [
+        {"id": test_snippet.id, "title": test_snippet.title, "similarity": 1.0}
+    ]
+
+    response = client.get("/api/snippets/duplicates")
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert len(groups) == 1
+    assert {s["id"] for s in groups[0]["snippets"]} == {
+        test_snippet.id,
+        data["snippet"]["id"],
+    }
+
+
+def test_snippet_revisions(client: TestClient, test_snippet):
+    """Test GET /api/snippets/{id}/revisions and /revisions/{n}."""
+    client.put(
+        f"/api/snippets/{test_snippet.id}",
+        json={"code": "print('Hello, World!')\nprint('again')"},
+    )
+    client.put(f"/api/snippets/{test_snippet.id}", json={"title": "Renamed"})
+
+    response = client.get(f"/api/snippets/{test_snippet.id}/revisions")
+    assert response.status_code == 200
+    revisions = response.json()["revisions"]
+    assert [r["number"] for r in revisions] == [3, 2, 1]
+    assert revisions[0]["title"] == "Renamed"
+    assert revisions[-1]["isKeyframe"] is True
+
+    response = client.get(f"/api/snippets/{test_snippet.id}/revisions/1")
+    assert response.status_code == 200
+    assert response.json()["revision"]["code"] == "print('Hello, World!')"
+
+    response = client.get(f"/api/snippets/{test_snippet.id}/revisions/3")
+    assert response.json()["revision"]["code"] == (
+        "print('Hello, World!')\nprint('again')"
+    )
+
+    response = client.get(f"/api/snippets/{test_snippet.id}/revisions/4")
+    assert response.status_code == 404
+    response = client.get("/api/snippets/non-existent-id/revisions")
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def many_snippets(db_session: Session, test_category, test_tags):
+    """Create more snippets than the smallest page, half of them favorites."""
+    snippets = []
+    for i in range(12):
+        snippet = snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=f"Listed snippet {i}",
+                code=f"print({i})",
+                language="python",
+                category_id=test_category.id,
+                tags=[tag.name for tag in test_tags],
+            ),
+        )
+        snippet.is_favorite = i % 2 == 0
+        snippets.append(snippet)
+    db_session.commit()
+    return snippets
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/snippets",
+        "/api/snippets/search?q=Listed",
+        "/api/snippets/favorites",
+    ],
+)
+def test_list_snippets_query_count(
+    client: TestClient, query_counter, many_snippets, url, limit
+):
+    """Listing snippets runs the same few queries whatever the page size."""
+    separator = "&" if "?" in url else "?"
+    with query_counter.assert_max(3):
+        response = client.get(f"{url}{separator}limit={limit}")
+    assert response.status_code == 200
+    snippets = response.json()["snippets"]
+    assert len(snippets) == limit
+    assert all(len(snippet["tags"]) == 2 for snippet in snippets)
+
+
+def test_get_snippet_query_count(client: TestClient, query_counter, test_snippet):
+    """Test GET /api/snippets/{snippet_id} query count."""
+    url = f"/api/snippets/{test_snippet.id}"
+    # Three reads, then the UPDATE counting the access after the response
+    with query_counter.assert_max(4):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_get_snippet_counts_access(
+    client: TestClient, db_session: Session, test_snippet, monkeypatch
+):
+    """Opening a snippet counts towards the "usage" sort order."""
+    url = f"/api/snippets/{test_snippet.id}"
+    updated_at = test_snippet.updated_at.isoformat()
+    assert client.get(url).json()["snippet"]["accessCount"] == 0
+    client.get(url)
+    # The count is made after the response, outside the request's session
+    db_session.expire_all()
+    snippet = client.get(url).json()["snippet"]
+    assert snippet["accessCount"] == 2
+    assert snippet["updatedAt"] == updated_at
+
+    # It is best-effort: a failing count does not fail the request
+    broken = create_engine("sqlite://")
+    monkeypatch.setattr(snippet_crud, "SessionLocal", sessionmaker(bind=broken))
+    assert client.get(url).status_code == 200
+
+
+@pytest.mark.parametrize(
+    "sort, key, reverse",
+    [
+        ("updated", "updatedAt", True),
+        ("created", "createdAt", True),
+        ("title", "title", False),
+        ("usage", "accessCount", True),
+    ],
+)
+def test_list_snippets_sorted_with_cursor(
+    client: TestClient,
+    db_session: Session,
+    many_snippets,
+    test_category,
+    sort,
+    key,
+    reverse,
+):
+    """Following nextCursor walks every snippet once, in the sort order."""
+    for i, snippet in enumerate(many_snippets):
+        snippet.access_count = i % 3
+        snippet.title = f"{'abc'[i % 3]}{'' if i % 2 else 'X'} snippet"
+    db_session.commit()
+
+    url = f"/api/snippets?categoryId={test_category.id}&sort={sort}&limit=5"
+    listed = []
+    cursor = None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        data = response.json()
+        listed.extend(data["snippets"])
+        cursor = data["nextCursor"]
+        if cursor is None:
+            break
+
+    assert sorted(snippet["id"] for snippet in listed) == sorted(
+        snippet.id for snippet in many_snippets
+    )
+    values = [
+        snippet[key].lower() if sort == "title" else snippet[key] for snippet in listed
+    ]
+    assert values == sorted(values, reverse=reverse)
+
+
+def test_list_snippets_invalid_sort(client: TestClient):
+    """Unknown sort orders and malformed cursors are rejected."""
+    response = client.get("/api/snippets?sort=random")
+    assert response.status_code == 400
+    response = client.get("/api/snippets/favorites?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+"""
+Tests for the statistics API endpoint.
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_get_stats(client: TestClient, query_counter):
+    """Test GET /api/stats endpoint."""
+    for i in range(5):
+        response = client.post(
+            "/api/snippets",
+            json={
+                "title": f"Stats snippet {i}",
+                "code": "x = 1",
+                "language": "python" if i else "go",
+                "tags": ["stats"],
+            },
+        )
+        assert response.status_code == 201
+    snippet_id = response.json()["snippet"]["id"]
+    client.post(f"/api/snippets/{snippet_id}/favorite", json={"isFavorite": True})
+    client.delete(f"/api/snippets/{snippet_id}")
+
+    # Served from the counters, however many snippets there are
+    with query_counter.assert_max(3):
+        response = client.get("/api/stats?limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["favorites"] == 0
+    assert data["recycleBin"] == 1
+    assert data["codeBytes"] == 4 * len("x = 1")
+    assert data["languages"] == [{"value": "python", "label": "python", "count": 3}]
+    assert data["tags"] == [{"value": "stats", "label": "stats", "count": 4}]
+    assert data["activity"][-1]["created"] == 5
+    assert data["activity"][-1]["deleted"] == 1
@@ -0,0 +1,76 @@
+"""
+Tests for tag API endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.crud import snippet as snippet_crud
+from app.schemas.snippet import SnippetCreate
+
+
+@pytest.fixture
+def tagged_snippets(db_session: Session):
+    """Create snippets spread over several tags; snippet i has tags 0..i."""
+    return [
+        snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=f"Tagged snippet {i}",
+                code=f"print({i})",
+                language="python",
+                tags=[f"tag-{n}" for n in range(i + 1)],
+            ),
+        )
+        for i in range(6)
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_get_tags(client: TestClient, query_counter, tagged_snippets, limit):
+    """Test GET /api/tags returns counts with the same queries for any page."""
+    with query_counter.assert_max(2):
+        response = client.get(f"/api/tags?limit={limit}")
+    assert response.status_code == 200
+    tags = response.json()["tags"]
+    assert len(tags) == limit
+    counts = {tag["name"]: tag["snippetCount"] for tag in tags}
+    for name, count in counts.items():
+        assert count == 6 - int(name.split("-")[1])
+
+
+def test_get_tags_skips_deleted_snippets(
+    client: TestClient, db_session: Session, tagged_snippets
+):
+    """Snippets in the recycle bin are not counted."""
+    snippet_crud.delete_snippet(db_session, tagged_snippets[-1].id)
+
+    response = client.get("/api/tags")
+    counts = {tag["name"]: tag["snippetCount"] for tag in response.json()["tags"]}
+    assert counts["tag-0"] == 5
+    assert counts["tag-5"] == 0
+
+
+def test_get_tag(client: TestClient, query_counter, tagged_snippets):
+    """Test GET /api/tags/{tag_id} endpoint."""
+    tag_id = tagged_snippets[0].tags[0].id
+    with query_counter.assert_max(2):
+        response = client.get(f"/api/tags/{tag_id}")
+    assert response.status_code == 200
+    assert response.json()["tag"]["snippetCount"] == 6
+
+    response = client.get("/api/tags/non-existent-id")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("limit", [1, 6])
+def test_get_tag_snippets(client: TestClient, query_counter, tagged_snippets, limit):
+    """Test GET /api/tags/{tag_id}/snippets endpoint."""
+    tag_id = tagged_snippets[0].tags[0].id
+    with query_counter.assert_max(5):
+        response = client.get(f"/api/tags/{tag_id}/snippets?limit={limit}")
+    assert response.status_code == 200
+    snippets = response.json()["snippets"]
+    assert len(snippets) == limit
+    assert all("tag-0" in snippet["tags"] for snippet in snippets)
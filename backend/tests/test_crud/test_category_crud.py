@@ -0,0 +1,84 @@
+"""
+Tests for category CRUD operations.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud import category as category_crud
+from app.crud import snippet as snippet_crud
+from app.schemas.category import CategoryCreate
+from app.schemas.snippet import SnippetCreate
+
+
+@pytest.fixture
+def category_tree(db_session: Session):
+    """Create a three-level category tree: root > child > grandchild."""
+    root = category_crud.create_category(db_session, CategoryCreate(name="Root"))
+    child = category_crud.create_category(
+        db_session, CategoryCreate(name="Child", parent_id=root.id)
+    )
+    grandchild = category_crud.create_category(
+        db_session, CategoryCreate(name="Grandchild", parent_id=child.id)
+    )
+    return root, child, grandchild
+
+
+def _create_snippet(db_session: Session, title: str, category_id: str):
+    return snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(
+            title=title,
+            code="print('tree')",
+            language="python",
+            category_id=category_id,
+        ),
+    )
+
+
+def test_get_snippets_by_category_with_descendants(db_session: Session, category_tree):
+    """Test fetching snippets of a whole category subtree."""
+    root, child, grandchild = category_tree
+    _create_snippet(db_session, "Root snippet", root.id)
+    _create_snippet(db_session, "Child snippet", child.id)
+    _create_snippet(db_session, "Grandchild snippet", grandchild.id)
+
+    direct = category_crud.get_snippets_by_category(db_session, root.id)
+    assert [s.title for s in direct] == ["Root snippet"]
+
+    subtree = category_crud.get_snippets_by_category(
+        db_session, child.id, include_descendants=True
+    )
+    assert {s.title for s in subtree} == {"Child snippet", "Grandchild snippet"}
+
+    filtered = snippet_crud.get_snippets(
+        db_session, category_id=root.id, include_descendants=True
+    )
+    assert len(filtered) == 3
+
+
+def test_get_category_tree(db_session: Session, category_tree):
+    """Test building the category tree with subtree counts."""
+    root, child, grandchild = category_tree
+    _create_snippet(db_session, "Root snippet", root.id)
+    _create_snippet(db_session, "Grandchild snippet 1", grandchild.id)
+    deleted = _create_snippet(db_session, "Grandchild snippet 2", grandchild.id)
+    snippet_crud.delete_snippet(db_session, deleted.id)
+
+    tree = category_crud.get_category_tree(db_session)
+
+    assert len(tree) == 1
+    root_node = tree[0]
+    assert root_node["id"] == root.id
+    assert root_node["snippet_count"] == 1
+    assert root_node["subtree_snippet_count"] == 2
+
+    child_node = root_node["children"][0]
+    assert child_node["id"] == child.id
+    assert child_node["snippet_count"] == 0
+    assert child_node["subtree_snippet_count"] == 1
+
+    grandchild_node = child_node["children"][0]
+    assert grandchild_node["id"] == grandchild.id
+    assert grandchild_node["snippet_count"] == 1
+    assert grandchild_node["children"] == []
@@ -0,0 +1,78 @@
+"""
+Tests for near-duplicate detection.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.crud import duplicates as duplicates_crud
+from app.crud import snippet as snippet_crud
+from app.schemas.snippet import SnippetCreate
+
+HELPER = """
+def chunked(items, size):
+    result = []
+    for start in range(0, len(items), size):
+        result.append(items[start:start + size])
+    return result
+"""
+
+
+def _create_snippet(db_session: Session, title: str, code: str):
+    return snippet_crud.create_snippet(
+        db_session, SnippetCreate(title=title, code=code, language="python")
+    )
+
+
+def test_find_duplicates(db_session: Session):
+    """Test near-duplicate lookups and grouping."""
+    original = _create_snippet(db_session, "Chunked", HELPER)
+    reindented = _create_snippet(
+        db_session, "Chunked copy", HELPER.replace("    ", "  ")
+    )
+    _create_snippet(db_session, "Other", "SELECT id, name FROM users WHERE active")
+
+    matches = duplicates_crud.find_duplicates(db_session, HELPER, exclude=original.id)
+    assert matches == [(reindented.id, 1.0)]
+
+    # Snippets written after the index was built are found as well
+    edited = _create_snippet(
+        db_session, "Chunked edit", HELPER + "\n\nprint(chunked([1, 2, 3], 2))\n"
+    )
+    groups = duplicates_crud.get_duplicate_groups(db_session, threshold=0.7)
+    assert len(groups) == 1
+    assert set(groups[0][0]) == {original.id, reindented.id, edited.id}
+
+    snippet_crud.permanently_delete_snippet(db_session, reindented.id)
+    matches = duplicates_crud.find_duplicates(db_session, HELPER, exclude=original.id)
+    assert reindented.id not in [snippet_id for snippet_id, _ in matches]
+
+
+def test_writes_during_index_load_are_kept(db_session: Session, monkeypatch):
+    """A write committed while the index loads is applied after the load."""
+    original = _create_snippet(db_session, "Chunked", HELPER)
+    load = duplicates_crud._index.load
+    written = []
+
+    def load_then_write(rows):
+        load(rows)
+        # Committed after the load read the table
+        written.append(_create_snippet(db_session, "Chunked copy", HELPER))
+
+    monkeypatch.setattr(duplicates_crud._index, "load", load_then_write)
+    matches = duplicates_crud.find_duplicates(db_session, HELPER, exclude=original.id)
+
+    assert matches == [(written[0].id, 1.0)]
+
+
+def test_duplicate_groups_of_identical_copies(db_session: Session):
+    """Identical copies form one group, kept until the index changes."""
+    copies = [_create_snippet(db_session, f"Copy {i}", HELPER) for i in range(20)]
+    _create_snippet(db_session, "Other", "SELECT id, name FROM users WHERE active")
+
+    groups = duplicates_crud.get_duplicate_groups(db_session)
+    assert groups == [(sorted(copy.id for copy in copies), 1.0)]
+    assert duplicates_crud.get_duplicate_groups(db_session) == groups
+
+    snippet_crud.permanently_delete_snippet(db_session, copies[0].id)
+    groups = duplicates_crud.get_duplicate_groups(db_session)
+    assert groups == [(sorted(copy.id for copy in copies[1:]), 1.0)]
@@ -0,0 +1,93 @@
+"""
+Tests for change notifications pushed to event stream subscribers.
+"""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.events import _event_stream
+from app.crud import events as events_crud
+from app.crud import tag as tag_crud
+from app.models import Tag
+from app.schemas.tag import TagCreate
+from app.utils.broadcast import Broadcaster
+
+
+def parse_event(message: bytes) -> dict:
+    """Return the JSON data of an encoded server-sent event."""
+    data_line = next(
+        line for line in message.decode().splitlines() if line.startswith("data: ")
+    )
+    return json.loads(data_line[len("data: ") :])
+
+
+def test_commit_publishes_changes(db_session: Session):
+    """Test that committed writes reach subscribers and rolled back ones do not."""
+
+    async def scenario():
+        subscriber = events_crud.broadcaster.subscribe()
+        try:
+            db_session.add(Tag(name="rolled-back"))
+            db_session.flush()
+            db_session.rollback()
+
+            tag = tag_crud.create_tag(db_session, TagCreate(name="live"))
+            seq, message = await subscriber.get(timeout=1)
+            assert parse_event(message) == {
+                "entity": "tag",
+                "id": tag.id,
+                "op": "upsert",
+                "revision": seq,
+            }
+            assert message.startswith(f"id: {seq}\n".encode())
+            assert await subscriber.get(timeout=0.05) is None
+        finally:
+            events_crud.broadcaster.unsubscribe(subscriber)
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_evicted():
+    """Test that a subscriber whose buffer fills up is dropped."""
+
+    async def scenario():
+        broadcaster = Broadcaster(buffer_size=2)
+        slow = broadcaster.subscribe()
+        for i in range(3):
+            broadcaster.publish(i)
+        assert len(broadcaster) == 0
+        with pytest.raises(EOFError):
+            await slow.get(timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_replays_missed_events(db_session: Session):
+    """Test that a reconnecting client first gets what it missed."""
+    first = tag_crud.create_tag(db_session, TagCreate(name="first"))
+    second = tag_crud.create_tag(db_session, TagCreate(name="second"))
+
+    backlog = events_crud.get_missed_events(db_session, 0)
+    assert [parse_event(message)["id"] for _, message in backlog] == [
+        first.id,
+        second.id,
+    ]
+    last_seq = backlog[0][0]
+
+    async def scenario():
+        subscriber = events_crud.broadcaster.subscribe()
+        stream = _event_stream(
+            subscriber, events_crud.get_missed_events(db_session, last_seq)
+        )
+        assert await stream.__anext__() == b"retry: 3000\n\n"
+        assert parse_event(await stream.__anext__())["id"] == second.id
+
+        third = tag_crud.create_tag(db_session, TagCreate(name="third"))
+        assert parse_event(await stream.__anext__())["id"] == third.id
+        await stream.aclose()
+        assert subscriber not in events_crud.broadcaster._subscribers
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+"""
+Tests for snippet revision CRUD operations.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import revision as revision_crud
+from app.crud import snippet as snippet_crud
+from app.models import CodeBlob, Snippet, SnippetRevision
+from app.schemas.snippet import SnippetCreate, SnippetUpdate
+from app.utils.error_handling import NotFoundError
+
+
+def make_code(version: int) -> str:
+    """A long body where each version edits a couple of lines."""
+    lines = [f"line_{i} = {i}\n" for i in range(200)]
+    for i in range(version):
+        lines[(i * 7) % 200] = f"line_{(i * 7) % 200} = 'edited in {i}'\n"
+    return "".join(lines)
+
+
+def test_revisions_keyframes_and_deltas(db_session: Session, monkeypatch):
+    """Test that every version can be rebuilt from keyframes and deltas."""
+    monkeypatch.setattr(settings, "REVISION_KEYFRAME_INTERVAL", 5)
+    snippet = snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(title="Versioned", code=make_code(0), language="python"),
+    )
+    for version in range(1, 12):
+        snippet_crud.update_snippet(
+            db_session, snippet.id, SnippetUpdate(code=make_code(version))
+        )
+    # Saves that change no versioned field do not add a revision
+    snippet_crud.update_snippet(db_session, snippet.id, SnippetUpdate(tags=["x"]))
+
+    revisions = revision_crud.get_revisions(db_session, snippet.id)
+    assert [r.number for r in revisions] == list(range(12, 0, -1))
+    assert sorted(r.number for r in revisions if r.is_keyframe) == [1, 6, 11]
+    assert all(len(r.delta) < 200 for r in revisions if not r.is_keyframe)
+
+    for number in range(1, 13):
+        revision, code = revision_crud.get_revision(db_session, snippet.id, number)
+        assert revision.number == number
+        assert code == make_code(number - 1)
+
+    with pytest.raises(NotFoundError):
+        revision_crud.get_revision(db_session, snippet.id, 13)
+
+
+def test_revisions_of_snippet_without_history(db_session: Session):
+    """Test that the first edit of an unversioned snippet keeps its old state."""
+    snippet = Snippet(title="Old", code="a = 1\n", language="python")
+    db_session.add(snippet)
+    db_session.commit()
+
+    snippet_crud.update_snippet(
+        db_session, snippet.id, SnippetUpdate(title="New", code="a = 2\n")
+    )
+
+    _, code = revision_crud.get_revision(db_session, snippet.id, 1)
+    assert code == "a = 1\n"
+    revision, code = revision_crud.get_revision(db_session, snippet.id, 2)
+    assert (revision.title, code) == ("New", "a = 2\n")
+
+
+def test_permanent_delete_drops_revisions(db_session: Session):
+    """Test that revisions and their code blobs go with the snippet."""
+    snippet = snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(title="Doomed", code=make_code(0), language="python"),
+    )
+    snippet_crud.update_snippet(
+        db_session, snippet.id, SnippetUpdate(code=make_code(30))
+    )
+    assert db_session.query(CodeBlob).count() == 2
+
+    snippet_crud.permanently_delete_snippet(db_session, snippet.id)
+    assert db_session.query(SnippetRevision).count() == 0
+    assert db_session.query(CodeBlob).count() == 0
@@ -0,0 +1,64 @@
+"""
+Tests for similar-snippet recommendations.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.crud import similar as similar_crud
+from app.crud import snippet as snippet_crud
+from app.schemas.snippet import SnippetCreate, SnippetUpdate
+
+
+def _create_snippet(db_session: Session, title: str, code: str):
+    return snippet_crud.create_snippet(
+        db_session, SnippetCreate(title=title, code=code, language="python")
+    )
+
+
+def test_get_similar_snippets(db_session: Session):
+    """Test similar snippets are ranked by content and kept up to date."""
+    query = _create_snippet(
+        db_session, "Merge sort", "def merge_sort(items):\n    return merge(items)"
+    )
+    close = _create_snippet(
+        db_session, "Merge sort in place", "def merge_sort(values): merge(values)"
+    )
+    far = _create_snippet(db_session, "Fetch JSON", "fetch(url).then(r => r.json())")
+
+    matches = similar_crud.get_similar_snippets(db_session, query)
+    assert [snippet_id for snippet_id, _ in matches] == [close.id]
+    assert 0 < matches[0][1] <= 1
+
+    # Writes after the index was built are applied incrementally
+    snippet_crud.update_snippet(
+        db_session, far.id, SnippetUpdate(title="Merge sort", code="merge_sort()")
+    )
+    matches = similar_crud.get_similar_snippets(db_session, query)
+    assert {snippet_id for snippet_id, _ in matches} == {close.id, far.id}
+
+    snippet_crud.delete_snippet(db_session, close.id)
+    matches = similar_crud.get_similar_snippets(db_session, query)
+    assert [snippet_id for snippet_id, _ in matches] == [far.id]
+
+
+def test_writes_during_index_load_are_kept(db_session: Session, monkeypatch):
+    """A write committed while the index loads is applied after the load."""
+    query = _create_snippet(
+        db_session, "Merge sort", "def merge_sort(items):\n    return merge(items)"
+    )
+    load = similar_crud._index.load
+    written = []
+
+    def load_then_write(rows):
+        load(rows)
+        # Committed after the load read the table
+        written.append(
+            _create_snippet(
+                db_session, "Merge sort in place", "def merge_sort(values): merge()"
+            )
+        )
+
+    monkeypatch.setattr(similar_crud._index, "load", load_then_write)
+    matches = similar_crud.get_similar_snippets(db_session, query)
+
+    assert [snippet_id for snippet_id, _ in matches] == [written[0].id]
@@ -321,3 +321,72 @@ def test_batch_operation(db_session: Session, test_category):
         s for s in recycle_bin_snippets if s.id in [snippet1.id, snippet2.id]
     ]
     assert len(our_deleted) == 2
+
+
+def test_get_snippets_by_tag_expression(db_session: Session):
+    """Test filtering snippets by a boolean tag expression."""
+    unique_suffix = str(uuid.uuid4())[:8]
+    python, asyncio, deprecated = (
+        f"python-{unique_suffix}",
+        f"asyncio-{unique_suffix}",
+        f"deprecated-{unique_suffix}",
+    )
+    tag_sets = {
+        "Async current": [python, asyncio],
+        "Async legacy": [python, asyncio, deprecated],
+        "Plain python": [python],
+        "Other": [],
+    }
+    for title, tags in tag_sets.items():
+        snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(title=title, code="pass", language="python", tags=tags),
+        )
+
+    def titles(expression):
+        snippets = snippet_crud.get_snippets(db_session, tags=expression)
+        return {snippet.title for snippet in snippets}
+
+    assert titles(f"{python} AND {asyncio} AND NOT {deprecated}") == {"Async current"}
+    assert titles(f"{asyncio} OR NOT {python}") == {
+        "Async current",
+        "Async legacy",
+        "Other",
+    }
+    assert titles(f"{python}, NOT ({asyncio} OR {deprecated})") == {"Plain python"}
+    assert titles(f"{python} AND unknown-{unique_suffix}") == set()
+    assert titles(f"NOT unknown-{unique_suffix}") == set(tag_sets)
+
+
+def test_get_snippet_facets(db_session: Session, test_category, test_tags):
+    """Test facet counts over a filtered snippet set."""
+    for title, language, category_id, tags in [
+        ("Facet one", "python", test_category.id, [test_tags[0].name]),
+        ("Facet two", "python", None, [test_tags[0].name, test_tags[1].name]),
+        ("Facet three", "go", test_category.id, []),
+        ("Unrelated", "go", test_category.id, [test_tags[1].name]),
+    ]:
+        snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=title,
+                code="pass",
+                language=language,
+                category_id=category_id,
+                tags=tags,
+            ),
+        )
+
+    facets = snippet_crud.get_snippet_facets(db_session, search="Facet")
+
+    assert facets["language"] == [
+        {"value": "python", "label": "python", "count": 2},
+        {"value": "go", "label": "go", "count": 1},
+    ]
+    assert facets["category"] == [
+        {"value": test_category.id, "label": test_category.name, "count": 2}
+    ]
+    assert {bucket["value"]: bucket["count"] for bucket in facets["tag"]} == {
+        test_tags[0].name: 2,
+        test_tags[1].name: 1,
+    }
@@ -0,0 +1,197 @@
+"""
+Tests for the index-backed sort orders of snippet lists.
+"""
+
+from typing import Dict, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.crud import category as category_crud
+from app.crud import collection as collection_crud
+from app.crud import snippet as snippet_crud
+from app.crud import tag as tag_crud
+from app.crud.sorting import SORTS, next_cursor
+from app.models import SnippetStat
+from app.schemas.category import CategoryCreate
+from app.schemas.collection import CollectionCreate
+from app.schemas.snippet import SnippetCreate
+from app.utils.error_handling import BadRequestError
+
+
+@pytest.fixture
+def listed(db_session: Session):
+    """A category, tag and collection holding a few snippets."""
+    category = category_crud.create_category(db_session, CategoryCreate(name="Sorted"))
+    collection = collection_crud.create_collection(
+        db_session, CollectionCreate(name="Sorted")
+    )
+    snippets = []
+    for i in range(5):
+        snippet = snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=f"Sorted {i}",
+                code=f"print({i})",
+                language="python",
+                category_id=category.id,
+                tags=["sorted"],
+            ),
+        )
+        collection_crud.add_snippet_to_collection(db_session, collection.id, snippet.id)
+        snippets.append(snippet)
+    tag = tag_crud.get_tag_by_name(db_session, "sorted")
+    return {"category": category, "collection": collection, "tag": tag}
+
+
+def _plans(db: Session, engine, calls) -> List[str]:
+    """Query plans of the sorted list queries the calls run."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT snippets.") and "ORDER BY" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for call in calls:
+            call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements
+    connection = db.connection()
+    return [
+        " ".join(
+            row[-1]
+            for row in connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        )
+        for statement, parameters in statements
+    ]
+
+
+def _set_counters(db: Session, counters: Dict[Tuple[str, str], int]) -> None:
+    for (dimension, key), value in counters.items():
+        db.merge(SnippetStat(dimension=dimension, key=key, value=value))
+    db.flush()
+
+
+@pytest.fixture
+def large_library_stats(db_session: Session):
+    """Planner statistics of a large library with small categories and tags.
+
+    The snippet counters are those of the same library, all of whose
+    categories and tags are still as small as the ones of ``listed``.
+    """
+    _set_counters(db_session, {("total", ""): 20000})
+    connection = db_session.connection()
+    connection.exec_driver_sql("ANALYZE")
+    connection.exec_driver_sql(
+        "UPDATE sqlite_stat1 SET stat = '20000 1' WHERE tbl = 'snippets'"
+    )
+    connection.exec_driver_sql(
+        "UPDATE sqlite_stat1 SET stat = '20000 20' "
+        "WHERE idx = 'ix_snippets_category_id'"
+    )
+    connection.exec_driver_sql(
+        "UPDATE sqlite_stat1 SET stat = '20000 10000 1 1' "
+        "WHERE idx LIKE 'ix_snippets_sort_%'"
+    )
+    connection.exec_driver_sql(
+        "UPDATE sqlite_stat1 SET stat = '40000 20 1' "
+        "WHERE idx = 'ix_snippet_tags_tag_id'"
+    )
+    connection.exec_driver_sql(
+        "UPDATE sqlite_stat1 SET stat = '40000 2 1' "
+        "WHERE tbl = 'snippet_tags' AND idx LIKE 'sqlite_autoindex%'"
+    )
+    connection.exec_driver_sql("ANALYZE sqlite_schema")
+    yield
+    # The loaded statistics outlive the rolled back test transaction
+    connection.exec_driver_sql("DELETE FROM sqlite_stat1")
+    connection.exec_driver_sql("ANALYZE sqlite_schema")
+
+
+@pytest.mark.parametrize("sort", sorted(SORTS))
+def test_sorted_lists_read_the_sort_index(
+    db_session: Session, test_db_engine, listed, large_library_stats, sort
+):
+    """Unfiltered lists read rows in index order instead of sorting them."""
+
+    def next_page():
+        page = snippet_crud.get_snippets(db_session, sort=sort, limit=2)
+        # The page after a cursor is a range search on the same index
+        snippet_crud.get_snippets(
+            db_session, sort=sort, cursor=next_cursor(page, sort, 2), limit=2
+        )
+
+    calls = [
+        next_page,
+        lambda: snippet_crud.get_favorite_snippets(db_session, sort=sort, limit=2),
+        lambda: snippet_crud.get_recycle_bin_snippets(db_session, sort=sort, limit=2),
+    ]
+    for plan in _plans(db_session, test_db_engine, calls):
+        assert f"ix_snippets_sort_{sort}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.parametrize("sort", sorted(SORTS))
+def test_selective_filters_are_left_to_the_planner(
+    db_session: Session, test_db_engine, listed, large_library_stats, sort
+):
+    """A small category is read by its own index and its matches sorted."""
+    category = listed["category"]
+    calls = [
+        lambda: category_crud.get_snippets_by_category(
+            db_session, category.id, sort=sort, limit=2
+        ),
+    ]
+    for plan in _plans(db_session, test_db_engine, calls):
+        assert "ix_snippets_category_id" in plan, plan
+
+
+def test_invalid_sort_and_cursor(db_session: Session, listed):
+    """Unknown sort orders and cursors of another sort order are rejected."""
+    with pytest.raises(BadRequestError):
+        snippet_crud.get_snippets(db_session, sort="random")
+
+    page = snippet_crud.get_snippets(db_session, sort="title", limit=2)
+    cursor = next_cursor(page, "title", 2)
+    with pytest.raises(BadRequestError):
+        snippet_crud.get_snippets(db_session, sort="created", cursor=cursor)
+    with pytest.raises(BadRequestError):
+        snippet_crud.get_snippets(db_session, sort="title", cursor="!!")
+
+
+@pytest.mark.parametrize("sort", sorted(SORTS))
+def test_broad_filters_read_the_sort_index(
+    db_session: Session, test_db_engine, listed, large_library_stats, sort
+):
+    """A category or tag holding half the library is not sorted in memory.
+
+    The planner only knows average sizes, so it would look such a filter up
+    by its own index and sort every match to return the first page.
+    """
+    category, tag = listed["category"], listed["tag"]
+    _set_counters(
+        db_session, {("category", category.id): 10000, ("tag", tag.id): 10000}
+    )
+    calls = [
+        lambda: category_crud.get_snippets_by_category(
+            db_session, category.id, sort=sort, limit=2
+        ),
+        lambda: tag_crud.get_snippets_by_tag(db_session, tag.id, sort=sort, limit=2),
+        lambda: snippet_crud.get_snippets(
+            db_session, category_id=category.id, sort=sort, limit=2
+        ),
+        lambda: snippet_crud.get_snippets(db_session, tag="sorted", sort=sort, limit=2),
+        lambda: snippet_crud.get_snippets(
+            db_session, tags="sorted AND NOT other", sort=sort, limit=2
+        ),
+    ]
+    for plan in _plans(db_session, test_db_engine, calls):
+        assert f"ix_snippets_sort_{sort}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,100 @@
+"""
+Tests for the precomputed dashboard statistics.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.crud import category as category_crud
+from app.crud import snippet as snippet_crud
+from app.crud import stats as stats_crud
+from app.crud import tag as tag_crud
+from app.models import SnippetStat
+from app.schemas.category import CategoryCreate
+from app.schemas.snippet import SnippetCreate, SnippetUpdate
+
+
+def _counters(db_session: Session):
+    """Non-zero counters, without the activity history a rebuild cannot recover."""
+    return {
+        (dimension, key): value
+        for dimension, key, value in db_session.query(
+            SnippetStat.dimension, SnippetStat.key, SnippetStat.value
+        )
+        if value and dimension not in stats_crud.ACTIVITY
+    }
+
+
+def test_counters_match_a_rebuild(db_session: Session):
+    """Incremental updates by the CRUD functions agree with a full recount."""
+    python = category_crud.create_category(db_session, CategoryCreate(name="Py"))
+    shell = category_crud.create_category(db_session, CategoryCreate(name="Sh"))
+    snippets = [
+        snippet_crud.create_snippet(
+            db_session,
+            SnippetCreate(
+                title=f"Snippet {i}",
+                code="print('x')\n" * (i + 1),
+                language="python" if i % 2 else "bash",
+                category_id=python.id if i % 3 else shell.id,
+                tags=["common", f"only-{i}"],
+            ),
+        )
+        for i in range(6)
+    ]
+
+    snippet_crud.update_snippet(
+        db_session,
+        snippets[0].id,
+        SnippetUpdate(code="echo changed", language="sh", tags=["common", "new"]),
+    )
+    snippet_crud.toggle_favorite(db_session, snippets[1].id, True)
+    snippet_crud.toggle_favorite(db_session, snippets[2].id, True)
+    snippet_crud.delete_snippet(db_session, snippets[2].id)
+    snippet_crud.delete_snippet(db_session, snippets[3].id)
+    snippet_crud.restore_snippet(db_session, snippets[3].id)
+    snippet_crud.delete_snippet(db_session, snippets[4].id)
+    snippet_crud.permanently_delete_snippet(db_session, snippets[4].id)
+    snippet_crud.permanently_delete_snippet(db_session, snippets[5].id)
+    tag_crud.delete_tag(db_session, tag_crud.get_tag_by_name(db_session, "new").id)
+    category_crud.delete_category(db_session, shell.id)
+
+    incremental = _counters(db_session)
+    stats_crud.rebuild_stats(db_session)
+    assert incremental == _counters(db_session)
+    assert incremental[("total", "")] == 3
+    assert incremental[("recycle_bin", "")] == 1
+    assert incremental[("favorites", "")] == 1
+
+
+def test_get_stats(db_session: Session):
+    """Test the dashboard statistics and the activity histogram."""
+    category = category_crud.create_category(db_session, CategoryCreate(name="Web"))
+    first = snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(
+            title="One", code="fetch()", language="javascript", tags=["http"]
+        ),
+    )
+    snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(
+            title="Two",
+            code="requests.get()",
+            language="python",
+            category_id=category.id,
+            tags=["http", "python"],
+        ),
+    )
+    snippet_crud.update_snippet(db_session, first.id, SnippetUpdate(title="Uno"))
+
+    stats = stats_crud.get_stats(db_session, days=7)
+    assert stats["total"] == 2
+    assert stats["code_bytes"] == len("fetch()requests.get()")
+    assert stats["tags"][0] == {"value": "http", "label": "http", "count": 2}
+    assert {bucket["label"] for bucket in stats["categories"]} == {
+        "Web",
+        "Uncategorized",
+    }
+    assert len(stats["activity"]) == 7
+    assert stats["activity"][-1]["created"] == 2
+    assert stats["activity"][-1]["updated"] == 1
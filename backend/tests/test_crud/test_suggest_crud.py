@@ -0,0 +1,82 @@
+"""
+Tests for autocomplete suggestions.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.crud import snippet as snippet_crud
+from app.crud import suggest as suggest_crud
+from app.crud import tag as tag_crud
+from app.schemas.snippet import SnippetCreate, SnippetUpdate
+from app.schemas.tag import TagCreate, TagUpdate
+from app.utils.prefix_index import PrefixIndex
+
+
+def _create_snippet(db_session: Session, title: str, tags):
+    return snippet_crud.create_snippet(
+        db_session,
+        SnippetCreate(title=title, code="pass", language="python", tags=tags),
+    )
+
+
+def test_suggest_tags(db_session: Session):
+    """Test tag suggestions are ranked by usage and kept up to date."""
+    _create_snippet(db_session, "One", ["python", "pytest"])
+    _create_snippet(db_session, "Two", ["python"])
+    tag_crud.create_tag(db_session, TagCreate(name="pydantic"))
+
+    # Built from the database on first use
+    assert suggest_crud.suggest_tags(db_session, "PY") == [
+        ("python", 2),
+        ("pytest", 1),
+        ("pydantic", 0),
+    ]
+
+    # Maintained incrementally afterwards
+    third = _create_snippet(db_session, "Three", ["pydantic"])
+    snippet_crud.update_snippet(
+        db_session, third.id, SnippetUpdate(tags=["pydantic", "pytest"])
+    )
+    assert suggest_crud.suggest_tags(db_session, "py", limit=2) == [
+        ("pytest", 2),
+        ("python", 2),
+    ]
+
+    snippet_crud.delete_snippet(db_session, third.id)
+    pytest_tag = tag_crud.get_tag_by_name(db_session, "pytest")
+    tag_crud.update_tag(db_session, pytest_tag.id, TagUpdate(name="unittest"))
+    assert suggest_crud.suggest_tags(db_session, "py") == [
+        ("python", 2),
+        ("pydantic", 0),
+    ]
+    assert suggest_crud.suggest_tags(db_session, "unit") == [("unittest", 1)]
+
+
+def test_suggest_titles(db_session: Session):
+    """Test title suggestions are ranked by usage and kept up to date."""
+    first = _create_snippet(db_session, "Merge sort", [])
+    _create_snippet(db_session, "Merge dicts", [])
+    _create_snippet(db_session, "Merge dicts", [])
+
+    assert suggest_crud.suggest_titles(db_session, "merge") == [
+        ("Merge dicts", 2),
+        ("Merge sort", 1),
+    ]
+
+    snippet_crud.permanently_delete_snippet(db_session, first.id)
+    assert suggest_crud.suggest_titles(db_session, "merge") == [("Merge dicts", 2)]
+    assert suggest_crud.suggest_titles(db_session, "quick") == []
+
+
+def test_prefix_cache_is_bounded():
+    """Distinct queried prefixes evict the least recently used ones."""
+    index = PrefixIndex(max_prefixes=3)
+    index.set("python", 2)
+    index.set("pytest", 1)
+
+    for prefix in ["p", "py", "pyt", "p", "pyth"]:
+        index.suggest(prefix)
+
+    # "p" was used again, so "py" went first
+    assert list(index._cache) == ["pyt", "p", "pyth"]
+    assert index.suggest("py") == [("python", 2), ("pytest", 1)]
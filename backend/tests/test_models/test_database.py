@@ -0,0 +1,135 @@
+"""
+Tests for upgrading the schema of an existing database.
+"""
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from app import database
+from app.crud import stats as stats_crud
+from app.database import Base, upgrade_schema
+from app.models import Snippet
+from scripts.migrate_code_blobs import migrate_code_blobs
+
+
+def test_upgrade_schema_adds_missing_indexes(tmp_path):
+    """Indexes added to the models after a database was created are built."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_categories_parent_id")
+        conn.exec_driver_sql("DROP INDEX ix_snippets_category_id")
+
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert "ix_categories_parent_id" in {
+        index["name"] for index in inspector.get_indexes("categories")
+    }
+    assert "ix_snippets_category_id" in {
+        index["name"] for index in inspector.get_indexes("snippets")
+    }
+    engine.dispose()
+
+
+def test_upgrade_schema_adds_missing_columns(tmp_path):
+    """Columns added to the models later are added with their default."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_snippets_sort_usage")
+        conn.exec_driver_sql("ALTER TABLE snippets DROP COLUMN access_count")
+        conn.exec_driver_sql(
+            "INSERT INTO snippets (id, title, code_hash, language, is_deleted) "
+            "VALUES ('old', 'Old snippet', 'abc', 'python', 0)"
+        )
+
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert "access_count" in {
+        column["name"] for column in inspector.get_columns("snippets")
+    }
+    assert "ix_snippets_sort_usage" in {
+        index["name"] for index in inspector.get_indexes("snippets")
+    }
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT access_count FROM snippets").all() == [(0,)]
+        # The planner has statistics for the new index
+        assert conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_stat1 WHERE idx = 'ix_snippets_sort_usage'"
+        ).all()
+    engine.dispose()
+
+
+# The snippets table as it was before code moved into code blobs
+BASELINE_SNIPPETS = """
+CREATE TABLE snippets (
+    id VARCHAR NOT NULL,
+    title VARCHAR NOT NULL,
+    description VARCHAR,
+    code VARCHAR NOT NULL,
+    language VARCHAR NOT NULL,
+    category_id VARCHAR,
+    is_favorite BOOLEAN,
+    is_deleted BOOLEAN,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(category_id) REFERENCES categories (id)
+)
+"""
+
+
+def create_baseline_database(path):
+    """Create a database with the baseline snippets table and one snippet."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.tables["categories"].create(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(BASELINE_SNIPPETS)
+        conn.exec_driver_sql(
+            "INSERT INTO snippets (id, title, code, language, is_deleted) "
+            "VALUES ('old', 'Old snippet', 'print(1)', 'python', 0)"
+        )
+    return engine
+
+
+def test_upgrade_schema_skips_required_columns(tmp_path):
+    """Required columns without a server default are left to their migration."""
+    engine = create_baseline_database(tmp_path / "old.db")
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("snippets")}
+    assert "code_hash" not in columns
+    assert "access_count" in columns
+    indexes = {index["name"] for index in inspector.get_indexes("snippets")}
+    assert "ix_snippets_code_hash" not in indexes
+    assert "ix_snippets_sort_usage" in indexes
+    engine.dispose()
+
+
+def test_migrate_baseline_database_then_start(tmp_path, monkeypatch):
+    """A baseline database is migrated into code blobs and then starts up."""
+    engine = create_baseline_database(tmp_path / "old.db")
+
+    migrate_code_blobs(engine)
+    migrate_code_blobs(engine)  # a second run finds nothing left to do
+    monkeypatch.setattr(database, "engine", engine)
+    database.create_tables()
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("snippets")}
+    assert "code" not in columns
+    assert {"code_hash", "access_count"} <= columns
+    assert "ix_snippets_code_hash" in {
+        index["name"] for index in inspector.get_indexes("snippets")
+    }
+    with Session(engine) as db:
+        stats_crud.ensure_stats(db)
+        snippet = db.get(Snippet, "old")
+        assert snippet.code == "print(1)"
+        assert snippet.blob.ref_count == 1
+    engine.dispose()
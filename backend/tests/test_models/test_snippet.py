@@ -3,9 +3,13 @@ Tests for the Snippet model.
 """
 
 import uuid
+
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.models import Snippet, Category, Tag, Collection
+from app.config import settings
+from app.models import Category, CodeBlob, Collection, Snippet, Tag
+from app.models.blob import hash_code
 
 
 def test_create_snippet(db_session: Session):
@@ -157,3 +161,85 @@ def test_snippet_collection_relationship(db_session: Session):
     assert collection2 in snippet.collections
     assert snippet in collection1.snippets
     assert snippet in collection2.snippets
+
+
+def test_snippet_code_blob_dedup(db_session: Session):
+    """Test that identical code is stored once and reference counted."""
+    code = "print('shared')"
+    first = Snippet(title="First", code=code, language="python")
+    second = Snippet(title="Second", code=code, language="python")
+    db_session.add_all([first, second])
+    db_session.commit()
+
+    blob = db_session.get(CodeBlob, hash_code(code))
+    assert blob.ref_count == 2
+    assert first.code_hash == second.code_hash == blob.hash
+    assert db_session.query(Snippet).filter(Snippet.code == code).count() == 2
+
+    # Editing one snippet moves its reference to a new blob
+    second.code = "print('changed')"
+    db_session.commit()
+    db_session.refresh(blob)
+    assert blob.ref_count == 1
+    assert second.code == "print('changed')"
+
+    # Deleting the last reference drops the blob
+    db_session.delete(first)
+    db_session.commit()
+    assert db_session.get(CodeBlob, hash_code(code)) is None
+    assert db_session.get(CodeBlob, hash_code("print('changed')")).ref_count == 1
+
+
+def test_snippet_code_blob_counts_in_sql(db_session: Session):
+    """Reference counts are not computed from a stale in-memory blob."""
+    code = "print('counted')"
+    first = Snippet(title="First", code=code, language="python")
+    db_session.add(first)
+    db_session.commit()
+    blob = db_session.get(CodeBlob, hash_code(code))
+    assert blob.ref_count == 1
+
+    # Another session references the same blob behind this session's back
+    db_session.execute(
+        text("UPDATE code_blobs SET ref_count = ref_count + 1 WHERE hash = :hash"),
+        {"hash": blob.hash},
+    )
+    db_session.add(Snippet(title="Second", code=code, language="python"))
+    db_session.commit()
+    db_session.refresh(blob)
+    assert blob.ref_count == 3
+
+    # Releasing references keeps the blob while the other session uses it
+    db_session.delete(first)
+    db_session.commit()
+    db_session.refresh(blob)
+    assert blob.ref_count == 2
+
+
+def test_snippet_code_compression(db_session: Session, monkeypatch):
+    """Test that large code is compressed transparently."""
+    monkeypatch.setattr(settings, "CODE_COMPRESSION_THRESHOLD", 256)
+    header = "".join(f"import module_{i}\n" for i in range(20))
+    bodies = [
+        header + "".join(f"value_{n}_{i} = compute({i})\n" for i in range(40))
+        for n in range(6)
+    ]
+    for n, body in enumerate(bodies):
+        db_session.add(Snippet(title=f"Generated {n}", code=body, language="python"))
+        db_session.commit()
+
+    blobs = [db_session.get(CodeBlob, hash_code(body)) for body in bodies]
+    assert all(blob.code is None for blob in blobs)
+    assert all(len(blob.data) < blob.size for blob in blobs)
+    # Later bodies are compressed against a dictionary trained on earlier ones
+    assert blobs[0].dictionary_id is None
+    assert blobs[-1].dictionary is not None
+    assert blobs[-1].dictionary.language == "python"
+
+    db_session.expire_all()
+    snippet = db_session.query(Snippet).filter(Snippet.title == "Generated 5").one()
+    assert snippet.code == bodies[5]
+
+    # SQL filters read through the compression
+    matches = db_session.query(Snippet).filter(Snippet.code.ilike("%value_3_39%"))
+    assert [match.title for match in matches] == ["Generated 3"]
@@ -82,7 +82,18 @@ export const useAppStore = create<AppState>()(
       // UI actions
       setCurrentView: (view, id) => set({ currentView: view, currentViewId: id }),
       setSearchQuery: (query) => set({ searchQuery: query }),
-      setSelectedSnippetId: (id) => set({ selectedSnippetId: id }),
+      setSelectedSnippetId: (id) => {
+        set({ selectedSnippetId: id });
+        // 列表中的压缩代码被省略，选中时再获取完整代码
+        const selected = get().snippets.find((s) => s.id === id);
+        if (id && selected?.codeTruncated) {
+          api.snippets.getById(id)
+            .then((snippet) => set((state) => ({
+              snippets: state.snippets.map((s) => (s.id === id ? snippet : s))
+            })))
+            .catch((error) => logger.error('Error fetching snippet:', error));
+        }
+      },
       setEditorMode: (mode) => set({ editorMode: mode }),
       toggleSidebar: () => set((state) => ({ sidebarExpanded: !state.sidebarExpanded })),
       startCreateSnippet: () => set({
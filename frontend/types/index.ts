@@ -15,6 +15,8 @@ export interface Snippet {
   createdAt: string;
   updatedAt: string;
   tags: string[];
+  // Set on list rows whose code was left out; fetch the snippet by ID for it
+  codeTruncated?: boolean;
 }
 
 export type SnippetCreate = Omit<Snippet, 'id' | 'createdAt' | 'updatedAt' | 'isFavorite' | 'isDeleted'>;